@@ -0,0 +1,217 @@
+import locale
+import os
+from array import array
+from decimal import Decimal
+
+from BankAccount import BankAccount
+from FileHandler import FileHandler
+
+
+class AccountColumns:
+    """
+    Compact columnar form of the current bank accounts: one array per field instead of one BankAccount object per
+    account. Because every record in the accounts file has the same width, the file can be split into record-aligned
+    byte ranges that are parsed in parallel by a process pool and concatenated in file order.
+
+    Columns:
+        numbers (array 'I'): account numbers
+        names (list[str]): normalized holder names
+        statuses (bytearray): b'A' or b'D'
+        balances (array 'q'): balances in cents
+        plans (bytearray): b'S' (student) or b'N' (non-student)
+    """
+    RECORD_WIDTH = FileHandler.ACCOUNT_RECORD_LENGTH + 1
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self):
+        """Initialize empty columns."""
+        self.numbers = array('I')
+        self.names = []
+        self.statuses = bytearray()
+        self.balances = array('q')
+        self.plans = bytearray()
+
+    def __len__(self):
+        return len(self.numbers)
+
+    @classmethod
+    def from_file(cls, filename: str, workers: int = None):
+        """
+        Parse a current bank accounts file into columns, splitting it into record-aligned ranges parsed in parallel.
+        Files that are not fixed-width are parsed serially with FileHandler.read_file.
+
+        :param filename: Path to the account file.
+        :param workers: Number of worker processes (defaults to the CPU count). 1 parses in this process.
+        :return: AccountColumns holding the accounts up to the end-of-file record.
+        """
+        ranges = cls._ranges(filename, workers)
+        if ranges is None:
+            return cls.from_accounts(FileHandler.read_file(filename))
+        columns = cls()
+        for part in cls._map(_parse_range, ranges, workers):
+            columns.extend(part)
+        return columns
+
+    @classmethod
+    def read_accounts(cls, filename: str, workers: int = None):
+        """
+        Parse a current bank accounts file into BankAccount objects, splitting it into record-aligned ranges that
+        worker processes parse with FileHandler.parse_account_line. The accounts of each range are yielded as soon as
+        that range is parsed, in file order, so the caller can store them while the later ranges are still being
+        parsed. Files that are not fixed-width are parsed serially with FileHandler.read_file.
+
+        :param filename: Path to the account file.
+        :param workers: Number of worker processes (defaults to the CPU count). 1 parses in this process.
+        :return: Iterator over lists of BankAccount, one per range, up to the end-of-file record.
+        """
+        ranges = cls._ranges(filename, workers)
+        if ranges is None:
+            yield FileHandler.read_file(filename)
+            return
+        yield from cls._map(_read_range, ranges, workers)
+
+    @classmethod
+    def _ranges(cls, filename: str, workers: int = None):
+        """
+        Split a fixed-width accounts file into record-aligned ranges, several per worker.
+
+        :return: List of (filename, first record index, last record index), or None if the file is not fixed-width.
+        """
+        size = os.path.getsize(filename)
+        records = -(-size // cls.RECORD_WIDTH)
+        if size % cls.RECORD_WIDTH not in (0, cls.RECORD_WIDTH - 1):
+            return None
+        chunks = min(records, (workers or os.cpu_count() or 1) * cls.CHUNKS_PER_WORKER) or 1
+        bounds = [records * i // chunks for i in range(chunks + 1)]
+        return [(filename, first, last) for first, last in zip(bounds, bounds[1:])]
+
+    @staticmethod
+    def _map(parse, ranges: list, workers: int = None):
+        """
+        Parse ranges in a process pool (or in this process for a single worker or range) and yield the results in file
+        order, stopping after the range holding the end-of-file record.
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(ranges) == 1:
+            parts, pool = map(parse, ranges), None
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+            parts = pool.map(parse, ranges)
+        try:
+            for part, reached_end in parts:
+                yield part
+                if reached_end:
+                    return
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    @classmethod
+    def from_accounts(cls, accounts):
+        """
+        Build columns from BankAccount objects.
+
+        :param accounts: Iterable of BankAccount.
+        :return: New AccountColumns.
+        """
+        columns = cls()
+        for account in accounts:
+            columns.numbers.append(int(account.account_number))
+            columns.names.append(account.holder_name)
+            columns.statuses += account.status.encode('ascii')
+            columns.balances.append(int(account.balance * 100))
+            columns.plans += account.plan[:1].encode('ascii')
+        return columns
+
+    def extend(self, other: 'AccountColumns'):
+        """
+        Append the rows of another set of columns.
+
+        :param other: AccountColumns to append.
+        """
+        self.numbers.extend(other.numbers)
+        self.names.extend(other.names)
+        self.statuses += other.statuses
+        self.balances.extend(other.balances)
+        self.plans += other.plans
+
+    def account(self, row: int) -> BankAccount:
+        """
+        :param row: Row index.
+        :return: A new BankAccount built from that row.
+        """
+        return BankAccount(f"{self.numbers[row]:05d}", self.names[row], Decimal(self.balances[row]).scaleb(-2),
+                           chr(self.statuses[row]), 'SP' if self.plans[row] == ord('S') else 'NP')
+
+    def to_accounts(self) -> list[BankAccount]:
+        """
+        :return: List of BankAccount objects, one per row, in file order.
+        """
+        return [self.account(row) for row in range(len(self))]
+
+
+def _read_records(task: tuple) -> bytes:
+    """
+    :param task: (filename, first record index, last record index).
+    :return: The bytes of records [first, last) of an accounts file.
+    """
+    filename, first, last = task
+    width = AccountColumns.RECORD_WIDTH
+    with open(filename, 'rb') as f:
+        f.seek(first * width)
+        return f.read((last - first) * width)
+
+
+def _lines(task: tuple):
+    """
+    Split records [first, last) of an accounts file into lines, decoded with the default text encoding that
+    FileHandler.read_file reads the file with, and check that each is fixed-width.
+
+    :param task: (filename, first record index, last record index).
+    :return: Iterator over the lines, without newlines.
+    :raises ValueError: If a record is not fixed-width (see FileHandler.is_fixed_width), so the ranges are not aligned.
+    """
+    _, first, _ = task
+    width = AccountColumns.RECORD_WIDTH
+    encoding = locale.getpreferredencoding(False)
+    data = _read_records(task)
+    for offset in range(0, len(data), width):
+        line = data[offset:offset + width].decode(encoding).rstrip('\n')
+        if not FileHandler.is_fixed_width(line):
+            raise ValueError(f"record {first + offset // width} is not {FileHandler.ACCOUNT_RECORD_LENGTH} characters")
+        yield line
+
+
+def _read_range(task: tuple) -> tuple:
+    """
+    Parse records [first, last) of an accounts file into BankAccount objects in a worker process.
+
+    :param task: (filename, first record index, last record index).
+    :return: (list of BankAccount for the range, True if the end-of-file record was reached).
+    """
+    accounts = []
+    for line in _lines(task):
+        if FileHandler.is_end_of_file(line):
+            return accounts, True
+        accounts.append(FileHandler.parse_account_line(line))
+    return accounts, False
+
+
+def _parse_range(task: tuple) -> tuple:
+    """
+    Parse records [first, last) of an accounts file in a worker process.
+
+    :param task: (filename, first record index, last record index).
+    :return: (AccountColumns for the range, True if the end-of-file record was reached).
+    """
+    columns = AccountColumns()
+    for line in _lines(task):
+        if FileHandler.is_end_of_file(line):
+            return columns, True
+        columns.numbers.append(int(line[0:5]))
+        columns.names.append(FileHandler.normalize_name(line[6:26]))
+        columns.statuses += line[27].encode('ascii')
+        columns.balances.append(int(line[29:34]) * 100 + int(line[35:37]))
+        columns.plans += b'S'
+    return columns, False
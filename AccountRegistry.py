@@ -0,0 +1,151 @@
+import os
+import threading
+from decimal import Decimal
+
+from AccountsManager import AccountsManager
+from AccountsWatcher import AccountsWatcher
+from AttributeIndex import AttributeIndex
+from Ledger import Ledger
+from NameIndex import NameIndex
+
+
+class AccountRegistry:
+    """
+    The accounts of one current bank accounts file, together with everything derived from them: the AccountsManager,
+    its name/status/plan indexes, the Ledger and the AccountsWatcher. The indexes are built the first time a lookup
+    needs them (an admin name search or a select()), so sessions that never use them do not pay for them.
+
+    Given a database, the accounts are kept in an SQLiteAccountsManager instead, filled from the accounts file the
+    first time the database is used. Other processes may write the same database, so instead of watching the file the
+    registry picks up their changes to the total balance. Several BankingSystem instances in one process
+    (test harnesses, multi-session hosts) can attach to the same registry, so the accounts are loaded and held in
+    memory once per process instead of once per session. Registries are reference counted and dropped when the last
+    instance detaches.
+
+    Ownership of mutations is explicit: the registry alone loads and reloads the accounts and opens the ledger, while
+    sessions change accounts only through TransactionProcessor, which holds the manager's lock for the whole of each
+    transaction (validation, execution and ledger posting).
+    """
+    _shared = {}                # Real path of the accounts file -> AccountRegistry
+    _shared_lock = threading.Lock()
+
+    def __init__(self, filename: str, database: str = None):
+        """
+        Create a registry that is private to its creator (use attach() to share one).
+
+        :param filename: Path to the current bank accounts file.
+        :param database: Path to an SQLite database to keep the accounts in instead of memory (Optional).
+        """
+        self.filename = filename
+        self.database = database
+        if database:
+            from SQLiteAccountsManager import SQLiteAccountsManager    # Pulls in sqlite3, so only when asked for
+            self.account_manager = SQLiteAccountsManager(database)
+        else:
+            self.account_manager = AccountsManager()
+        self._name_index = None     # Built by the name_index property on first use
+        self.ledger = Ledger()
+        self.loaded = False
+        self.watcher = None         # Picks up a new accounts file once loaded (not used with a database)
+        self.references = 0
+
+    @property
+    def name_index(self) -> NameIndex:
+        """
+        Holder name search for admin lookups, built from the accounts and attached to the manager on first use (from
+        then on it also answers AccountsManager.find_account_by_name). None with a database, where SQLite indexes the
+        holder names for exact lookups only.
+        """
+        with self.account_manager.lock:
+            if self._name_index is None and not self.database:
+                self._name_index = NameIndex()
+                self.account_manager.add_index(self._name_index)
+            return self._name_index
+
+    def select(self, min_balance: Decimal = None, max_balance: Decimal = None, **attributes) -> list:
+        """
+        AccountsManager.select() for bulk admin operations, attaching an AttributeIndex for each filtered attribute on
+        first use so that repeated selections on it are answered from the index.
+
+        :param min_balance: Only accounts with at least this balance (Optional).
+        :param max_balance: Only accounts with at most this balance (Optional).
+        :param attributes: BankAccount attribute name -> required value, e.g. status='D'.
+        :return: Matching accounts in account number order.
+        """
+        manager = self.account_manager
+        if self.database:
+            return manager.select(min_balance, max_balance, **attributes)
+        with manager.lock:
+            for attribute in attributes.keys() - manager.attribute_indexes.keys():
+                manager.add_index(AttributeIndex(attribute))
+            return manager.select(min_balance, max_balance, **attributes)
+
+    @classmethod
+    def attach(cls, filename: str, database: str = None) -> 'AccountRegistry':
+        """
+        Get the process-wide registry for an accounts file (or database), creating it on first use, and take a
+        reference to it.
+
+        :param filename: Path to the current bank accounts file.
+        :param database: Path to an SQLite database to keep the accounts in instead of memory (Optional).
+        :return: The shared AccountRegistry.
+        """
+        key = os.path.realpath(database or filename)
+        with cls._shared_lock:
+            registry = cls._shared.get(key)
+            if registry is None:
+                registry = cls._shared[key] = cls(filename, database)
+            registry.references += 1
+            return registry
+
+    def detach(self):
+        """
+        Release a reference taken by attach(). The registry is dropped (and its database closed) when no instance is
+        attached any more.
+        """
+        with AccountRegistry._shared_lock:
+            self.references -= 1
+            key = os.path.realpath(self.database or self.filename)
+            if self.references <= 0 and AccountRegistry._shared.get(key) is self:
+                del AccountRegistry._shared[key]
+            if self.references <= 0 and self.database:
+                self.account_manager.close()
+
+    def load(self) -> bool:
+        """
+        Load the accounts the first time any attached instance needs them; later calls only pick up a newer file.
+
+        :return: True if the accounts are loaded, False if the file could not be read.
+        """
+        with self.account_manager.lock:
+            if self.loaded:
+                self.poll()
+                return True
+            if self.database:
+                if self.account_manager.is_empty() and not self.account_manager.load_accounts(self.filename):
+                    return False
+            elif not self.account_manager.load_accounts(self.filename):
+                return False
+            else:
+                self.watcher = AccountsWatcher(self.account_manager, self.filename)
+            self.ledger.open(self.account_manager.total_balance)
+            self.loaded = True
+            return True
+
+    def poll(self) -> int:
+        """
+        Apply any changes made to the accounts file since it was loaded, or with a database, pick up the changes other
+        processes have committed to it.
+
+        :return: Number of accounts created, changed or removed (with a database, 1 if another process wrote to it).
+        """
+        with self.account_manager.lock:
+            before = self.account_manager.total_balance
+            if self.database:
+                changes = int(self.account_manager.refresh())
+            else:
+                changes = self.watcher.poll() if self.watcher else 0
+            if changes:
+                # Balances changed outside of the sessions' transactions; the flows they posted still stand
+                self.ledger.rebase(self.account_manager.total_balance - before)
+            return changes
@@ -0,0 +1,86 @@
+import copy
+
+
+class AccountSnapshot:
+    """
+    Read‑only, point‑in‑time view of the accounts held by an AccountsManager, created by AccountsManager.snapshot().
+
+    The snapshot shares unchanged accounts with the live store. When the manager is about to change, create or remove
+    an account it first hands the snapshot the account's previous state (copy‑on‑write), so reads always see the
+    accounts exactly as they were when the snapshot was taken while sessions keep mutating balances.
+    """
+    def __init__(self, account_manager):
+        """
+        :param account_manager: The AccountsManager being viewed.
+        """
+        self.account_manager = account_manager
+        self.preserved = {}     # account number -> BankAccount as of the snapshot, or None if it did not exist yet
+        self.closed = False
+
+    def preserve(self, account_number: str, account):
+        """
+        Record the state of an account just before the live store changes it. Only the first change after the snapshot
+        is kept.
+
+        :param account_number: The account about to change.
+        :param account: Its current BankAccount, or None if it does not exist yet.
+        """
+        if account_number not in self.preserved:
+            self.preserved[account_number] = copy.copy(account) if account else None
+
+    def find_account(self, account_number: str):
+        """
+        Retrieve an account as it was when the snapshot was taken.
+
+        :param account_number: 5‑digit account number (zero‑padded).
+        :return: A copy of the BankAccount (if it existed) or None (otherwise).
+        """
+        self._check_open()
+        with self.account_manager.lock:
+            if account_number in self.preserved:
+                account = self.preserved[account_number]
+            else:
+                account = self.account_manager.accounts.get(account_number)
+            return copy.copy(account) if account else None
+
+    def account_numbers(self) -> list[str]:
+        """
+        :return: Sorted numbers of the accounts that existed when the snapshot was taken.
+        """
+        self._check_open()
+        with self.account_manager.lock:
+            numbers = set(self.account_manager.accounts)
+            for number, account in self.preserved.items():
+                if account is None:
+                    numbers.discard(number)
+                else:
+                    numbers.add(number)
+        return sorted(numbers)
+
+    def accounts(self):
+        """
+        Yield every account as it was when the snapshot was taken, in account number order. The manager's lock is only
+        held for one record at a time, so live transactions keep running while a long report iterates.
+        """
+        for number in self.account_numbers():
+            account = self.find_account(number)
+            if account:
+                yield account
+
+    def close(self):
+        """Release the snapshot so the manager stops preserving accounts for it."""
+        if not self.closed:
+            self.closed = True
+            self.account_manager.release_snapshot(self)
+            self.preserved.clear()
+
+    def _check_open(self):
+        """Raise if the snapshot has already been closed."""
+        if self.closed:
+            raise ValueError("snapshot is closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
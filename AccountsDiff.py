@@ -0,0 +1,114 @@
+import json
+import sys
+from decimal import Decimal, InvalidOperation
+
+from FileHandler import FileHandler
+
+
+class AccountsDiff:
+    """
+    Streaming diff of two current bank accounts files sorted by account number. Both files are merge-joined in a
+    single pass holding one record from each at a time, so memory stays constant whatever the file size. Identical
+    records are skipped by comparing the raw lines before anything is parsed.
+
+    Each change is reported as a dict:
+        {"change": "created" | "deleted", "account": ..., "name": ..., "status": ..., "balance": ..., "plan": ...}
+        {"change": "name" | "balance" | "status" | "plan", "account": ..., "old": ..., "new": ...}
+    Names are reported as written in the file, without their padding, so a change of case alone is a rename. The plan
+    is only compared when both records carry one (a ' SP'/' NP' field after the 37‑character record).
+    """
+    FIELDS = ('name', 'status', 'balance', 'plan')
+
+    @staticmethod
+    def diff(old_filename: str, new_filename: str):
+        """
+        Yield the changes between two accounts files.
+
+        :param old_filename: Path to the earlier accounts file.
+        :param new_filename: Path to the later accounts file.
+        :raises ValueError: If a file is not sorted by account number or holds a malformed record (raised when the
+                            diff reaches it, after the changes before it have been yielded).
+        """
+        with open(old_filename, 'r') as old_file, open(new_filename, 'r') as new_file:
+            old_records = AccountsDiff._records(old_file, old_filename)
+            new_records = AccountsDiff._records(new_file, new_filename)
+            old = next(old_records, None)
+            new = next(new_records, None)
+            while old or new:
+                if new is None or (old is not None and old[0] < new[0]):
+                    yield AccountsDiff._whole('deleted', old[1])
+                    old = next(old_records, None)
+                elif old is None or new[0] < old[0]:
+                    yield AccountsDiff._whole('created', new[1])
+                    new = next(new_records, None)
+                else:
+                    if old[1] != new[1]:
+                        yield from AccountsDiff._changes(old[1], new[1])
+                    old = next(old_records, None)
+                    new = next(new_records, None)
+
+    @staticmethod
+    def _records(file, filename: str):
+        """Yield (account number, line) up to the end-of-file record, checking every record and the sort order."""
+        previous = None
+        for line_number, line in enumerate(file, 1):
+            line = line.rstrip('\n')
+            if FileHandler.is_end_of_file(line):
+                return
+            if len(line) < FileHandler.ACCOUNT_RECORD_LENGTH:
+                raise ValueError(f"'{filename}' line {line_number}: record too short")
+            number = line[0:5]
+            if not number.isdigit():
+                raise ValueError(f"'{filename}' line {line_number}: invalid account number '{number}'")
+            try:
+                Decimal(line[29:37])
+            except InvalidOperation:
+                raise ValueError(f"'{filename}' line {line_number}: invalid balance '{line[29:37]}'") from None
+            if previous is not None and number <= previous:
+                raise ValueError(f"'{filename}' is not sorted by account number at {number} (line {line_number})")
+            previous = number
+            yield number, line
+
+    @staticmethod
+    def _fields(line: str) -> dict:
+        """Split an account record into the fields the diff reports."""
+        return {
+            'name': line[6:26].rstrip(' '),
+            'status': line[27],
+            'balance': str(Decimal(line[29:37])),
+            'plan': line[38:40] if line[38:40] in ('SP', 'NP') else None,
+        }
+
+    @staticmethod
+    def _whole(change: str, line: str) -> dict:
+        """Report a created or deleted account."""
+        return {'change': change, 'account': line[0:5], **AccountsDiff._fields(line)}
+
+    @staticmethod
+    def _changes(old_line: str, new_line: str):
+        """Yield one change per field that differs between two records of the same account."""
+        old, new = AccountsDiff._fields(old_line), AccountsDiff._fields(new_line)
+        for field in AccountsDiff.FIELDS:
+            if field == 'plan' and (old['plan'] is None or new['plan'] is None):
+                continue
+            if old[field] != new[field]:
+                yield {'change': field, 'account': old_line[0:5], 'old': old[field], 'new': new[field]}
+
+
+def main():
+    """Print the changes between two accounts files as JSON lines: AccountsDiff.py OLD_FILE NEW_FILE"""
+    if len(sys.argv) != 3:
+        print("usage: AccountsDiff.py OLD_FILE NEW_FILE", file=sys.stderr)
+        sys.exit(2)
+    out = sys.stdout
+    try:
+        for change in AccountsDiff.diff(sys.argv[1], sys.argv[2]):
+            out.write(json.dumps(change) + '\n')
+    except (IOError, ValueError) as e:
+        out.flush()
+        print(f"error: cannot diff '{sys.argv[1]}' and '{sys.argv[2]}' - {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import os
+import threading
+import weakref
 from decimal import Decimal
 
+from AccountSnapshot import AccountSnapshot
+from AttributeIndex import AttributeIndex
 from BankAccount import BankAccount
 from FileHandler import FileHandler
+from NameIndex import NameIndex
 
 class AccountsManager:
     """
@@ -11,23 +17,127 @@ class AccountsManager:
     def __init__(self):
         """Initialize an empty account dictionary"""
         self.accounts = {}
+        self.lock = threading.RLock()           # Guards mutations against concurrent snapshot reads
+        self._snapshots = weakref.WeakSet()     # Open AccountSnapshots that still need pre-images
 
-    def load_accounts(self, filename: str) -> bool:
+        # For incremental persistence of the fixed-width accounts file
+        self.slots = {}                         # account number -> record index in the loaded file
+        self.record_count = 0                   # records before the end-of-file marker
+        self.fixed_width = False                # True if every record in the loaded file is exactly one width
+        self.dirty = set()                      # accounts changed, created or deleted since the last load/flush
+        self.file_images = {}                   # dirty account number -> its record in the file (None if not in it)
+        self.end_of_file = FileHandler.format_end_of_file()    # end-of-file record of the loaded file, as read
+
+        # Sum of every account balance, kept up to date by each mutation so it never needs a full scan
+        self.total_balance = Decimal('0.00')
+
+        # Highest account number loaded or handed out; numbers are never reused, even after a delete
+        self.highest_number = 0
+
+        # Secondary indexes kept in sync on create, delete, disable, change plan and reload
+        self.indexes = []
+        self.name_index = None                  # NameIndex used by find_account_by_name, if one is attached
+        self.attribute_indexes = {}             # Attribute name -> AttributeIndex used by select()
+
+    def load_accounts(self, filename: str, workers: int = None) -> bool:
         """
         Load accounts from the current bank accounts file into memory.
 
         :param filename: Path to the account file.
+        :param workers: If given, parse the file in parallel with this many processes, which also build the
+                        BankAccount objects; each range is stored as soon as it arrives (Optional).
         :return: True if loading succeeded, False otherwise.
         """
         try:
-            accounts = FileHandler.read_file(filename)
-            for account in accounts:
-                self.accounts[account.account_number] = account
+            if workers:
+                from AccountColumns import AccountColumns      # Pulls in multiprocessing, so only when asked for
+                parts = AccountColumns.read_accounts(filename, workers)
+                end_of_file, fixed_width = None, True           # Ranges are only split from fixed-width records
+            else:
+                accounts, end_of_file, fixed_width = FileHandler.read_file_layout(filename)
+                parts = [accounts]
+            accounts = []
+            with self.lock:
+                for part in parts:
+                    for account in part:
+                        self._put(account, persist=False)
+                    accounts += part
+                self._track_file(filename, accounts, end_of_file, fixed_width)
+                self.dirty = set(self.accounts) - set(self.slots)
+                self.file_images = dict.fromkeys(self.dirty)
             return True
         except (IOError, ValueError) as e:
             print(f"error: cannot read account file '{filename}' - {e}")
             return False
 
+    def apply_reload(self, filename: str, accounts: list[BankAccount], end_of_file: str = None,
+                     fixed_width: bool = False) -> int:
+        """
+        Bring the in‑memory accounts up to date with a newly written accounts file by applying only the records the
+        file changed: the new file is compared with the file as last read, not with memory, so changes made in this
+        process that are not in the file yet (pending, i.e. dirty accounts) are kept on top. For a pending account the
+        file's balance change is added to the in‑memory balance, and its status and holder name are taken from the file
+        unless they were changed here too; accounts deleted here stay deleted and accounts created here are kept (a
+        file account under the number of an account created here is reported as a conflict, and the account created
+        here is kept). Accounts the file added or removed are added or removed. The whole delta is applied under the
+        lock, so it lands atomically between transactions.
+
+        :param filename: Path to the account file the accounts were read from.
+        :param accounts: The accounts parsed from that file, in file order.
+        :param end_of_file: The file's end-of-file record as read (Optional).
+        :param fixed_width: Whether every record of the file was fixed-width, as reported by
+                            FileHandler.read_file_layout() (Optional; if not, the next flush rewrites the whole file).
+        :return: Number of accounts created, changed or removed.
+        """
+        with self.lock:
+            changes = 0
+            in_file = set()
+            for account in accounts:
+                number = account.account_number
+                in_file.add(number)
+                record = (account.holder_name, account.status, account.balance, account.file_name)
+                current = self.accounts.get(number)
+                if number in self.dirty:
+                    old = self.file_images[number]
+                    if old == record:
+                        continue
+                    self.file_images[number] = record
+                    if current is not None and old is None:
+                        print(f"warning: account {number} was created here and by another writer of '{filename}'; "
+                              f"keeping the account created here")
+                    if current is None or old is None:
+                        continue                            # Deleted here, or created here under the same number
+                    self._before_change(number, persist=False)
+                    self._unindex(current)
+                    current.balance += account.balance - old[2]
+                    self.total_balance += account.balance - old[2]
+                    if current.status == old[1]:
+                        current.status = account.status
+                    if current.holder_name == old[0]:
+                        current.holder_name, current.file_name = account.holder_name, account.file_name
+                    self._index(current)
+                    changes += 1
+                elif current is None:
+                    self._put(account, persist=False)
+                    changes += 1
+                elif (current.holder_name, current.status, current.balance, current.file_name) != record:
+                    self._before_change(number, persist=False)
+                    self._unindex(current)
+                    self.total_balance += account.balance - current.balance
+                    current.holder_name, current.status, current.balance, current.file_name = record
+                    self._index(current)
+                    changes += 1
+
+            # Accounts the file no longer has, except those created here and not written yet
+            for number in [number for number in self.slots if number not in in_file]:
+                if number in self.accounts and self.file_images.get(number, ()) is not None:
+                    self._remove(number, persist=False)
+                    changes += 1
+                self.dirty.discard(number)
+                self.file_images.pop(number, None)
+            self._track_file(filename, accounts, end_of_file, fixed_width)
+            return changes
+
     def find_account(self, account_number: str):
         """
         Retrieve an account by its account number.
@@ -37,19 +147,146 @@ class AccountsManager:
         """
         return self.accounts.get(account_number)
 
+    def add_account(self, account: BankAccount):
+        """
+        Add a new account to the in‑memory collection.
+
+        :param account: The account to add.
+        """
+        with self.lock:
+            self._put(account)
+
+    def save_accounts(self, filename: str) -> bool:
+        """
+        Compact the current bank accounts file: rewrite every account in file order (new accounts last), dropping
+        deleted ones.
+
+        :param filename: Path to the account file.
+        :return: True if saving succeeded, False otherwise.
+        """
+        with self.lock:
+            ordered = sorted(self.accounts.values(),
+                             key=lambda account: (self.slots.get(account.account_number, len(self.slots)),
+                                                  account.account_number))
+            if not FileHandler.write_accounts_file(filename, ordered, self.end_of_file):
+                return False
+            self.slots = {account.account_number: slot for slot, account in enumerate(ordered)}
+            self.record_count = len(ordered)
+            self.fixed_width = True
+            self.dirty.clear()
+            self.file_images.clear()
+            return True
+
+    def flush_accounts(self, filename: str) -> bool:
+        """
+        Incrementally persist the accounts changed since the last load or flush. Every record is the same width, so
+        changed accounts are rewritten in place with positioned writes at their computed offsets and new accounts are
+        appended over the end‑of‑file record. Deleted accounts cannot be removed in place, so if there are any (or the
+        file is not fixed‑width) the file is compacted with save_accounts() instead.
+
+        :param filename: Path to the account file that was loaded.
+        :return: True if flushing succeeded, False otherwise.
+        """
+        with self.lock:
+            if not self.dirty:
+                return True
+            deleted = any(number not in self.accounts for number in self.dirty)
+            if deleted or not self.fixed_width:
+                return self.save_accounts(filename)
+
+            record_width = FileHandler.ACCOUNT_RECORD_LENGTH + 1
+            updated = sorted((self.slots[number], number) for number in self.dirty if number in self.slots)
+            created = sorted(number for number in self.dirty if number not in self.slots)
+
+            try:
+                fd = os.open(filename, os.O_WRONLY)
+                try:
+                    # Coalesce runs of adjacent changed records into a single write
+                    start = 0
+                    for i in range(1, len(updated) + 1):
+                        if i == len(updated) or updated[i][0] != updated[i - 1][0] + 1:
+                            data = ''.join(FileHandler.format_account_line(self.accounts[number]) + '\n'
+                                           for _, number in updated[start:i])
+                            os.pwrite(fd, data.encode('ascii'), updated[start][0] * record_width)
+                            start = i
+
+                    if created:
+                        data = ''.join(FileHandler.format_account_line(self.accounts[number]) + '\n'
+                                       for number in created)
+                        data += self.end_of_file + '\n'
+                        os.pwrite(fd, data.encode('ascii'), self.record_count * record_width)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                print(f"Error writing account file '{filename}': {e}")
+                return False
+
+            for number in created:
+                self.slots[number] = self.record_count
+                self.record_count += 1
+            self.dirty.clear()
+            self.file_images.clear()
+            return True
+
     def find_account_by_name(self, name: str):
         """
         Find the first account belonging to a given holder name. (Assumes at most one account per holder)
+        Uses the attached NameIndex if there is one, otherwise scans every account.
         :param name: Account holder's name.
         :return: BankAccount (if found) or None (otherwise).
         """
+        if self.name_index:
+            numbers = self.name_index.exact(name)
+            return self.accounts.get(numbers[0]) if numbers else None
         for account in self.accounts.values():
-            if account.name == name:
+            if account.holder_name == name:
                 return account
         return None
 
-    @staticmethod
-    def debit(account: BankAccount, amount: Decimal):
+    def add_index(self, index):
+        """
+        Attach a secondary index (e.g. NameIndex). The index is built from the current accounts and then kept up to
+        date through its add(account) and remove(account) methods.
+
+        :param index: The index to attach.
+        """
+        with self.lock:
+            index.rebuild(self.accounts.values())
+            self.indexes.append(index)
+            if isinstance(index, NameIndex):
+                self.name_index = index
+            elif isinstance(index, AttributeIndex):
+                self.attribute_indexes[index.attribute] = index
+
+    def select(self, min_balance: Decimal = None, max_balance: Decimal = None, **attributes) -> list[BankAccount]:
+        """
+        Find every account matching the given filters, e.g. select(status='D') or select(plan='SP', min_balance=X).
+        Attribute filters with an attached AttributeIndex are answered from the index (smallest set first); any other
+        filters are checked against the remaining accounts only.
+
+        :param min_balance: Only accounts with at least this balance (Optional).
+        :param max_balance: Only accounts with at most this balance (Optional).
+        :param attributes: BankAccount attribute name -> required value.
+        :return: Matching accounts in account number order.
+        """
+        with self.lock:
+            indexed = sorted((self.attribute_indexes[name].lookup(value) for name, value in attributes.items()
+                              if name in self.attribute_indexes), key=len)
+            if indexed:
+                candidates = (self.accounts[number] for number in indexed[0].intersection(*indexed[1:]))
+            else:
+                candidates = self.accounts.values()
+            unindexed = [(name, value) for name, value in attributes.items() if name not in self.attribute_indexes]
+
+            matches = [account for account in candidates
+                       if (min_balance is None or account.balance >= min_balance)
+                       and (max_balance is None or account.balance <= max_balance)
+                       and all(getattr(account, name) == value for name, value in unindexed)]
+        matches.sort(key=lambda account: account.account_number)
+        return matches
+
+    def debit(self, account: BankAccount, amount: Decimal):
         """
         Subtract the specified amount from the account balance.
 
@@ -57,26 +294,35 @@ class AccountsManager:
         :param amount: Positive amount to deduct.
         """
         if account:
-            account.balance_deduction(amount)
+            with self.lock:
+                self._before_change(account.account_number)
+                account.balance_deduction(amount)
+                self.total_balance -= amount
 
-    @staticmethod
-    def credit(account: BankAccount, amount: Decimal):
+    def credit(self, account: BankAccount, amount: Decimal):
         """
         Add the specified amount from the account balance.
 
         :param account: The account to credit.
         :param amount: Positive amount to add.
         """
-        account.balance_addition(amount)
+        with self.lock:
+            self._before_change(account.account_number)
+            account.balance_addition(amount)
+            self.total_balance += amount
 
     def disable_account(self, account_number: str):
         """
         Set the status of the account to disabled ('D').
         :param account_number: The account number to disable.
         """
-        account = self.find_account(account_number)
-        if account:
-            account.disable()
+        with self.lock:
+            account = self.find_account(account_number)
+            if account:
+                self._before_change(account_number)
+                self._unindex(account)
+                account.disable()
+                self._index(account)
 
     def delete(self, account_number: str):
         """
@@ -84,28 +330,189 @@ class AccountsManager:
         :param account_number: The account number to delete.
         :return:
         """
-        if account_number in self.accounts:
-            del self.accounts[account_number]
+        with self.lock:
+            if account_number in self.accounts:
+                self._remove(account_number)
 
     def change_plan(self, account_number: str):
         """
         Change the account plan from student ('SP') to non‑student ('NP').Does nothing if the account already
-        non‑student.
+        non‑student. The accounts file has no plan field, so this does not mark the account for the next flush.
 
         :param account_number: The account number to modify.
         """
-        account = self.find_account(account_number)
-        if account and account.is_student():
-            account.plan = 'NP'
+        with self.lock:
+            account = self.find_account(account_number)
+            if account and account.is_student():
+                self._before_change(account_number, persist=False)
+                self._unindex(account)
+                account.plan = 'NP'
+                self._index(account)
+
+    def disable_accounts(self, account_numbers) -> list[BankAccount]:
+        """
+        Disable many accounts under a single lock acquisition. Missing and already disabled accounts are skipped.
+
+        :param account_numbers: Iterable of account numbers to disable.
+        :return: The accounts that were disabled.
+        """
+        changed = []
+        with self.lock:
+            for account_number in account_numbers:
+                account = self.accounts.get(account_number)
+                if account and account.is_active():
+                    self._before_change(account_number)
+                    self._unindex(account)
+                    account.disable()
+                    self._index(account)
+                    changed.append(account)
+        return changed
+
+    def change_plans(self, account_numbers) -> list[BankAccount]:
+        """
+        Change many accounts from student ('SP') to non‑student ('NP') under a single lock acquisition. Missing and
+        already non‑student accounts are skipped. Like change_plan(), this does not mark the accounts for the next
+        flush.
+
+        :param account_numbers: Iterable of account numbers to modify.
+        :return: The accounts whose plan was changed.
+        """
+        changed = []
+        with self.lock:
+            for account_number in account_numbers:
+                account = self.accounts.get(account_number)
+                if account and account.is_student():
+                    self._before_change(account_number, persist=False)
+                    self._unindex(account)
+                    account.plan = 'NP'
+                    self._index(account)
+                    changed.append(account)
+        return changed
 
     def generate_new_account_number(self) -> str:
         """
-        Generate a new unique 5‑digit account number (zero‑padded).
+        Generate a new unique 5‑digit account number (zero‑padded). The number is reserved, so creating several
+        accounts in one session (before any of them is in the accounts file) gives each a different number.
         :return: A new account number greater than any existing number. (str)
         """
-        if not self.accounts:
-            return "00001"
-        max_num = max(int(num) for num in self.accounts.keys())
-        return f"{max_num + 1:05d}"
+        return self.reserve_account_numbers(1)[0]
+
+    def reserve_account_numbers(self, count: int) -> list[str]:
+        """
+        Reserve a contiguous block of new account numbers, all greater than any number loaded or handed out so far.
+
+        :param count: Number of account numbers needed.
+        :return: The reserved account numbers, in order. (zero‑padded str)
+        :raises ValueError: If the block would run past 99999.
+        """
+        with self.lock:
+            first = self.highest_number + 1
+            if first + count - 1 > 99999:
+                raise ValueError(f"cannot reserve {count} account numbers: only {99999 - first + 1} remain")
+            self.highest_number += count
+            return [f"{number:05d}" for number in range(first, first + count)]
+
+    def snapshot(self) -> AccountSnapshot:
+        """
+        Take a consistent point‑in‑time, read‑only view of the accounts. Nothing is copied up front; an account is only
+        copied into the snapshot the first time it is changed afterwards, so readers never block writers for longer
+        than a single record update.
+
+        :return: AccountSnapshot (close it, or use it as a context manager, once the report is done).
+        """
+        with self.lock:
+            snapshot = AccountSnapshot(self)
+            self._snapshots.add(snapshot)
+            return snapshot
+
+    def release_snapshot(self, snapshot: AccountSnapshot):
+        """
+        Stop preserving pre‑images for a snapshot.
 
+        :param snapshot: The snapshot to release.
+        """
+        with self.lock:
+            self._snapshots.discard(snapshot)
+
+    def _track_file(self, filename: str, accounts: list[BankAccount], end_of_file: str = None,
+                    fixed_width: bool = False):
+        """
+        Remember where each account sits in the file just read, and its end‑of‑file record, for incremental flushes.
+        Records are only rewritten in place if every one of them was checked to be fixed-width while it was read and
+        nothing follows the end-of-file record. Must be called with the lock held.
+
+        :param filename: Path to the account file.
+        :param accounts: The accounts read from it, in file order.
+        :param end_of_file: The end-of-file record as read, or None to read it from its computed offset (Optional).
+        :param fixed_width: Whether every record read, the end-of-file record included, was fixed-width (Optional).
+        """
+        record_width = FileHandler.ACCOUNT_RECORD_LENGTH + 1
+        self.slots = {account.account_number: slot for slot, account in enumerate(accounts)}
+        self.record_count = len(accounts)
+        self.fixed_width = fixed_width and os.path.getsize(filename) in ((len(accounts) + 1) * record_width,
+                                                                         (len(accounts) + 1) * record_width - 1)
+        if self.fixed_width and end_of_file is None:
+            with open(filename, 'r') as f:
+                f.seek(len(accounts) * record_width)
+                end_of_file = f.readline().rstrip('\n')
+        if self.fixed_width and FileHandler.is_fixed_width(end_of_file) and FileHandler.is_end_of_file(end_of_file):
+            self.end_of_file = end_of_file
+        else:
+            self.fixed_width = False
+
+    def _put(self, account: BankAccount, persist: bool = True):
+        """
+        Insert or replace an account, keeping the balance total in step. Must be called with the lock held.
+
+        :param account: The account to store.
+        :param persist: Whether the account must be written to the accounts file on the next flush (Optional).
+        """
+        self._before_change(account.account_number, persist)
+        previous = self.accounts.get(account.account_number)
+        if previous:
+            self._unindex(previous)
+            self.total_balance -= previous.balance
+        self.accounts[account.account_number] = account
+        self.total_balance += account.balance
+        self._index(account)
+        self.highest_number = max(self.highest_number, int(account.account_number))
 
+    def _remove(self, account_number: str, persist: bool = True):
+        """
+        Remove a stored account, keeping the balance total in step. Must be called with the lock held.
+
+        :param account_number: The account to remove.
+        :param persist: Whether the removal must be written to the accounts file on the next flush (Optional).
+        """
+        self._before_change(account_number, persist)
+        account = self.accounts.pop(account_number)
+        self._unindex(account)
+        self.total_balance -= account.balance
+
+    def _index(self, account: BankAccount):
+        """Add an account to every attached index. Must be called with the lock held."""
+        for index in self.indexes:
+            index.add(account)
+
+    def _unindex(self, account: BankAccount):
+        """Remove an account from every attached index (before it changes). Must be called with the lock held."""
+        for index in self.indexes:
+            index.remove(account)
+
+    def _before_change(self, account_number: str, persist: bool = True):
+        """
+        Hand the current state of an account to every open snapshot before it is changed, and mark it dirty for the
+        next flush. The first time an account becomes dirty, its record as it is in the file (its current state, or
+        None if it is not in the file) is kept for apply_reload(). Must be called with the lock held.
+
+        :param account_number: The account about to be created, changed or removed.
+        :param persist: Whether the change shows in the accounts file, so the record must be rewritten (Optional).
+        """
+        if persist and account_number not in self.dirty:
+            self.dirty.add(account_number)
+            account = self.accounts.get(account_number)
+            self.file_images[account_number] = \
+                (account.holder_name, account.status, account.balance, account.file_name) \
+                if account and account_number in self.slots else None
+        for snapshot in self._snapshots:
+            snapshot.preserve(account_number, self.accounts.get(account_number))
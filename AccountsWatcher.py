@@ -0,0 +1,58 @@
+import os
+import time
+
+from FileHandler import FileHandler
+
+
+class AccountsWatcher:
+    """
+    Watches the current bank accounts file for a newly written version by polling os.stat, and applies only the
+    accounts that changed to an AccountsManager. Polling is driven by the caller (e.g. once between transactions), so
+    there is no background thread and an update never lands in the middle of a transaction. A file without its
+    end-of-file record (caught while it is being rewritten in place) is not applied; the next poll tries again.
+    """
+    def __init__(self, account_manager, filename: str, interval: float = 1.0):
+        """
+        Start watching a file that has already been loaded into the manager.
+
+        :param account_manager: AccountsManager to keep up to date.
+        :param filename: Path to the account file.
+        :param interval: Minimum number of seconds between two stat calls.
+        """
+        self.account_manager = account_manager
+        self.filename = filename
+        self.interval = interval
+        self.signature = self._signature()
+        self.last_poll = time.monotonic()
+
+    def poll(self) -> int:
+        """
+        Check whether the accounts file has been replaced or rewritten and, if so, apply the delta.
+
+        :return: Number of accounts created, changed or removed (0 if the file is unchanged).
+        """
+        now = time.monotonic()
+        if now - self.last_poll < self.interval:
+            return 0
+        self.last_poll = now
+
+        signature = self._signature()
+        if signature == self.signature:
+            return 0
+        try:
+            accounts, end_of_file, fixed_width = FileHandler.read_file_layout(self.filename, require_end=True)
+        except (IOError, ValueError) as e:
+            print(f"error: cannot reload account file '{self.filename}' - {e}")
+            return 0            # Keep the old signature, so the next poll reads the file again
+        self.signature = signature
+        return self.account_manager.apply_reload(self.filename, accounts, end_of_file, fixed_width)
+
+    def _signature(self):
+        """
+        :return: (inode, size, modification time) of the file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
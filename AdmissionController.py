@@ -0,0 +1,183 @@
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from decimal import Decimal
+
+
+class AdmissionController:
+    """
+    Admission control in front of TransactionProcessor for a front end that serves many sessions in one process.
+    Requests are queued per session and run by a fixed number of worker threads, which take one request from each
+    session with pending work in turn (round robin), so a busy session cannot starve the others. A session has at most
+    one request running at a time: it only rejoins the round robin once that request has finished, so its requests
+    run one after the other, in the order they were submitted. TransactionServer runs every connection's requests
+    through one controller.
+
+    The queue is bounded both in total and per session. A request that does not fit is rejected straight away, or
+    after waiting up to `wait` seconds for room, instead of joining an ever-growing backlog: the time a request spends
+    queued is therefore bounded by roughly queue_limit / concurrency service times, which keeps tail latency bounded
+    under load spikes.
+    """
+    def __init__(self, concurrency: int = 4, queue_limit: int = 256, session_limit: int = 32):
+        """
+        Start the worker threads.
+
+        :param concurrency: Number of requests run at the same time.
+        :param queue_limit: Maximum number of requests waiting across all sessions.
+        :param session_limit: Maximum number of requests waiting for a single session.
+        """
+        self.queue_limit = queue_limit
+        self.session_limit = session_limit
+        self.queues = {}            # Session key -> deque of (future, call, args) waiting to run
+        self.ready = deque()        # Session keys with waiting requests and none running, in round-robin order
+        self.pending = 0            # Requests waiting across all sessions
+        self.closed = False
+        self.stats = {'admitted': 0, 'rejected': 0, 'completed': 0}
+
+        self.lock = threading.Lock()
+        self.work_available = threading.Condition(self.lock)
+        self.room_available = threading.Condition(self.lock)
+        self.workers = [threading.Thread(target=self._work, name=f'admission-{i}', daemon=True)
+                        for i in range(concurrency)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, session, call, *args, wait: float = 0):
+        """
+        Queue a request for a session, e.g. submit(key, processor.deposit, '00001', amount).
+
+        :param session: Key identifying the session the request belongs to (e.g. its Session object).
+        :param call: The callable to run.
+        :param args: Arguments for the call.
+        :param wait: Seconds to wait for room in the queue before rejecting (0 rejects immediately).
+        :return: Future for the call's result, or None if the request was rejected.
+        """
+        deadline = time.monotonic() + wait
+        with self.lock:
+            while not self._has_room(session):
+                remaining = deadline - time.monotonic()
+                if self.closed or remaining <= 0:
+                    self.stats['rejected'] += 1
+                    return None
+                self.room_available.wait(remaining)
+            if self.closed:
+                self.stats['rejected'] += 1
+                return None
+
+            queue = self.queues.get(session)
+            if queue is None:       # Otherwise the session is already waiting its turn or has a request running
+                queue = self.queues[session] = deque()
+                self.ready.append(session)
+            future = Future()
+            queue.append((future, call, args))
+            self.pending += 1
+            self.stats['admitted'] += 1
+            self.work_available.notify()
+            return future
+
+    def close(self):
+        """Stop accepting requests, run the ones already queued and stop the workers."""
+        with self.lock:
+            self.closed = True
+            self.work_available.notify_all()
+            self.room_available.notify_all()
+        for worker in self.workers:
+            worker.join()
+
+    def _has_room(self, session) -> bool:
+        """Whether another request for the session fits in the queue. Must be called with the lock held."""
+        queue = self.queues.get(session)
+        return self.pending < self.queue_limit and (queue is None or len(queue) < self.session_limit)
+
+    def _work(self):
+        """
+        Worker thread: run the next request of the next session in turn until closed and drained. The session stays
+        out of the round robin while its request runs (its queue is kept, so new requests wait behind it).
+        """
+        while True:
+            with self.lock:
+                while not self.ready and not (self.closed and not self.queues):
+                    self.work_available.wait()
+                if not self.ready:
+                    self.work_available.notify_all()    # Let the other workers see that everything is drained
+                    return
+                session = self.ready.popleft()
+                queue = self.queues[session]
+                future, call, args = queue.popleft()
+                self.pending -= 1
+                self.room_available.notify()
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(call(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            with self.lock:
+                self.stats['completed'] += 1
+                if queue:
+                    self.ready.append(session)      # Back of the line until every other session has had a turn
+                    self.work_available.notify()
+                else:
+                    del self.queues[session]
+
+
+def main():
+    """
+    Local load generator: AdmissionController.py [SESSIONS] [REQUESTS] [CONCURRENCY] [QUEUE_LIMIT] [SERVICE_MS]
+    Every session fires REQUESTS deposits at once against shared in-memory accounts, each taking SERVICE_MS of
+    simulated work. Prints how many requests were admitted and rejected, and the latency percentiles of the admitted
+    ones.
+    """
+    from AccountsManager import AccountsManager
+    from BankAccount import BankAccount
+    from Session import Session
+    from TransactionLog import TransactionLog
+    from TransactionProcessor import TransactionProcessor
+    from UserInterface import UserInterface
+
+    defaults = [16, 200, 4, 64, 1.0]
+    values = [float(arg) for arg in sys.argv[1:6]] + defaults[len(sys.argv[1:6]):]
+    sessions, requests, concurrency, queue_limit = (int(value) for value in values[:4])
+    service_time = values[4] / 1000
+
+    account_manager = AccountsManager()
+    for i in range(1, sessions + 1):
+        account_manager.add_account(BankAccount(f"{i:05d}", f"load {i}", Decimal('0.00')))
+    UserInterface.display_success = staticmethod(lambda msg: None)
+
+    def request(processor, account_number):
+        processor.deposit(account_number, Decimal('1.00'))
+        time.sleep(service_time)
+
+    controller = AdmissionController(concurrency, queue_limit, session_limit=max(1, queue_limit // 4))
+    latencies = []
+    clients = []
+    for i in range(1, sessions + 1):
+        session = Session()
+        session.login('admin')
+        processor = TransactionProcessor(account_manager, session, TransactionLog())
+        clients.append((session, processor, f"{i:05d}"))
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        for session, processor, account_number in clients:
+            submitted = time.perf_counter()
+            future = controller.submit(session, request, processor, account_number)
+            if future:
+                future.add_done_callback(lambda f, t=submitted: latencies.append(time.perf_counter() - t))
+    controller.close()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    stats = controller.stats
+    print(f"admitted {stats['admitted']}, rejected {stats['rejected']}, completed {stats['completed']} "
+          f"in {elapsed:.2f} s")
+    if latencies:
+        p50, p99 = latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"latency p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
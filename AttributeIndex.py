@@ -0,0 +1,58 @@
+class AttributeIndex:
+    """
+    Secondary index from the value of one BankAccount attribute (e.g. 'status' or 'plan') to the set of account numbers
+    holding that value. Questions like "all disabled accounts" become a dictionary lookup instead of a full scan, and
+    filters on several indexed attributes are answered by intersecting their sets.
+
+    The index is kept up to date incrementally by AccountsManager through add() and remove().
+    """
+    def __init__(self, attribute: str):
+        """
+        :param attribute: Name of the BankAccount attribute to index.
+        """
+        self.attribute = attribute
+        self.buckets = {}       # Attribute value -> set of account numbers
+
+    def rebuild(self, accounts):
+        """
+        Replace the contents of the index.
+
+        :param accounts: Iterable of BankAccount.
+        """
+        self.buckets = {}
+        for account in accounts:
+            self.add(account)
+
+    def add(self, account):
+        """
+        Index an account under its current attribute value.
+
+        :param account: The BankAccount to add.
+        """
+        self.buckets.setdefault(getattr(account, self.attribute), set()).add(account.account_number)
+
+    def remove(self, account):
+        """
+        Remove an account from the index.
+
+        :param account: The BankAccount to remove (with the attribute value it was indexed under).
+        """
+        value = getattr(account, self.attribute)
+        numbers = self.buckets.get(value)
+        if numbers is not None:
+            numbers.discard(account.account_number)
+            if not numbers:
+                del self.buckets[value]
+
+    def lookup(self, value) -> set:
+        """
+        :param value: Attribute value (e.g. 'D').
+        :return: Set of account numbers with that value. (Owned by the index: copy it before changing accounts.)
+        """
+        return self.buckets.get(value, set())
+
+    def counts(self) -> dict:
+        """
+        :return: Number of accounts for each attribute value.
+        """
+        return {value: len(numbers) for value, numbers in self.buckets.items()}
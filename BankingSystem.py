@@ -1,9 +1,12 @@
+import os
+import sys
 from decimal import Decimal
 
-from AccountsManager import AccountsManager
+from AccountRegistry import AccountRegistry
+from CommandPipeline import CommandPipeline
 from FileHandler import FileHandler
 from Session import Session
-from TransactionLog import TransactionLog
+from SpillingTransactionLog import SpillingTransactionLog
 from TransactionProcessor import TransactionProcessor
 from UserInterface import UserInterface
 
@@ -27,32 +30,82 @@ class BankingSystem:
         'changeplan': '_handle_changeplan',
     }
 
-    def __init__(self):
-        """Initialise the banking system and file paths."""
+    # Middleware wrapped around every command handler, outermost first (see CommandPipeline)
+    PIPELINE_STAGES = [CommandPipeline.between_transactions, CommandPipeline.verify_ledger]
+
+    def __init__(self, registry: AccountRegistry = None, database: str = None, writer=None):
+        """
+        Initialise the banking system and file paths.
+
+        :param registry: Shared accounts to attach to, from AccountRegistry.attach() (Optional). By default the
+                         system loads its own private copy of the accounts file.
+        :param database: Path to an SQLite database for the private accounts, filled from the accounts file when
+                         empty (Optional, ignored with a registry).
+        :param writer: SessionFileWriter shared with other systems to hand the session files to (Optional). close()
+                       leaves it running. By default the system starts its own on the first logout.
+        """
+        self.current_accounts_file = "current_bank_accounts.txt"
+        self.daily_transaction_file = "daily_bank_transactions.txt"
         self.session = Session()
-        self.account_manager = AccountsManager()
-        self.log = TransactionLog()
+        self.registry = registry or AccountRegistry(self.current_accounts_file, database)
+        self.account_manager = self.registry.account_manager
+        self.ledger = self.registry.ledger
+        self.log = SpillingTransactionLog()     # Keeps memory flat for very long sessions
         self.file_handler = FileHandler()
         self.ui = UserInterface()
-        self.transaction_processor = TransactionProcessor(self.account_manager, self.session, self.log)
-        self.current_accounts_file = "current_bank_accounts.txt"
-        self.daily_transaction_file = "daily_bank_transactions.txt"
+        self.transaction_processor = TransactionProcessor(self.account_manager, self.session, self.log, self.ledger)
+        self.writer = writer        # Background SessionFileWriter, started on the first logout unless shared
+        self.owns_writer = writer is None
+        self.pending_writes = []    # Futures for session files still being written in the background
+        self.pipelines = {}         # Session mode -> CommandPipeline, compiled on first login in that mode
+        self.persist_accounts = False   # Write changed accounts back to the accounts file at every logout
+        self.profiler = None        # MemoryProfiler, only when BANKING_MEMORY_PROFILE is set
+        if os.environ.get('BANKING_MEMORY_PROFILE'):
+            from MemoryProfiler import MemoryProfiler
+            self.profiler = MemoryProfiler(self, MemoryProfiler.parse_every(os.environ['BANKING_MEMORY_PROFILE']))
 
     def run(self):
         """
         Main execution loop. Attempts login first; if successful, repeatedly displays the menu, reads a command, and
-        dispatches it to the appropriate handler.
+        dispatches it through the session mode's compiled command pipeline.
         """
         if self._process_login():
+            pipeline = self._get_pipeline(self.session.get_mode())
             while True:
                 self.ui.display_menu(self.session.is_admin())
                 cmd = self.ui.prompt_transaction_type()
                 if cmd == "logout":
                     self._process_logout()
-                elif not self.session.can_execute(cmd):
-                    self.ui.display_error("You are not authorized to perform this transaction.")
-                else:
-                    getattr(self, self.COMMAND_HANDLERS[cmd])()
+                    break
+                pipeline.dispatch(cmd)
+
+    def close(self) -> bool:
+        """
+        Finish with the system: wait for the session files still being written and report any that failed, stop the
+        background writer (unless it is shared), and detach from the account registry (releasing the shared accounts
+        once no other system uses them).
+
+        :return: True if every session file was written, False otherwise.
+        """
+        if self.writer and self.owns_writer:
+            self.writer.close()
+        for future in self.pending_writes:      # A shared writer keeps running, so wait for this system's files
+            future.exception()
+        written = self._check_writes()
+        self.registry.detach()
+        return written
+
+    def _get_pipeline(self, mode: str) -> CommandPipeline:
+        """
+        Return the compiled command pipeline for a session mode, building it the first time.
+
+        :param mode: Session mode ('standard' or 'admin').
+        :return: CommandPipeline for that mode.
+        """
+        if mode not in self.pipelines:
+            stages = self.PIPELINE_STAGES + ([self.profiler.stage] if self.profiler else [])
+            self.pipelines[mode] = CommandPipeline(self, mode, stages)
+        return self.pipelines[mode]
 
     def _check_login(self) ->bool: #Lowkey redundant remove after checking
         """
@@ -76,16 +129,33 @@ class BankingSystem:
         :return: True if login succeeded, False otherwise.
         """
 
+        self._check_writes()
+
         #Prevent double login
-        if self._check_login():
+        if not self._check_login():
             return False
 
         mode, user = self.ui.prompt_login()
+        return self.login(mode, user)
+
+    def login(self, mode: str, user: str = None) -> bool:
+        """
+        Start a session without prompting (used by _process_login and by non-interactive front ends):
+            - Load accounts file
+            - Validate the account exists for standard mode
+            - create session if all is good
 
-        # Load accounts from file; error if file cannot be read
-        if not self.account_manager.load_accounts(self.current_accounts_file):
+        :param mode: Session mode ('standard' or 'admin').
+        :param user: Account holder's name (standard mode only).
+        :return: True if login succeeded, False otherwise.
+        """
+
+        # Load accounts from file (once per registry); error if file cannot be read
+        if not self.registry.load():
             self.ui.display_error("Failed to load accounts. Please try again.")
             return False
+        if self.profiler:
+            self.profiler.checkpoint('load')
 
         # For standard mode, check that the account holder exists
         if mode == 'standard':
@@ -96,9 +166,11 @@ class BankingSystem:
 
         # All checks are good - login
         self.session.login(mode, user)
+        if self.profiler:
+            self.profiler.checkpoint('login')
         self.ui.display_success(f"Successfully logged in. Mode: {mode}")
         if mode == 'standard':
-            print(f"Logged in as: {user}")
+            self.ui.display_success(f"Logged in as: {user}")
 
         return True
 
@@ -106,16 +178,57 @@ class BankingSystem:
     def _process_logout(self):
         """
         Handle logout:
-        - Write the daily transaction file.
+        - Queue the daily transaction file for the background writer.
         - Clear the transaction log.
+        - Flush the changed accounts to the accounts file, if persist_accounts is set.
         - End the session.
         """
-        if self._check_login():
-            self.log.write_session_file(self.daily_transaction_file)
-            self.log.clear()
+        if self.session.is_logged_in():
+            # Hand the log to the background writer so logout does not wait on the disk
+            self.pending_writes.append(self._get_writer().submit(self.daily_transaction_file, self.log.handoff()))
+            if self.persist_accounts and not self.account_manager.flush_accounts(self.current_accounts_file):
+                self.ui.display_error("Failed to save accounts.")
             self.session.logout()
+            if self.profiler:
+                self.profiler.logout()
             self.ui.display_success(f"Successfully logged out. Mode: {self.session.mode}")
 
+    def _get_writer(self):
+        """
+        Start the background session file writer the first time it is needed, keeping its thread and imports off the
+        startup path.
+
+        :return: SessionFileWriter
+        """
+        if self.writer is None:
+            from SessionFileWriter import SessionFileWriter
+            self.writer = SessionFileWriter()
+        return self.writer
+
+    def _check_writes(self) -> bool:
+        """
+        Report any background session file writes that have failed since the last check.
+
+        :return: True if none of them failed, False otherwise.
+        """
+        written = True
+        for future in [future for future in self.pending_writes if future.done()]:
+            self.pending_writes.remove(future)
+            if future.exception():
+                self.ui.display_error(f"Could not write transaction file: {future.exception()}")
+                written = False
+        return written
+
+    def _check_reload(self):
+        """Apply any changes made to the accounts file since it was loaded."""
+        self.registry.poll()
+
+    def _check_ledger(self):
+        """Verify that no money was created or destroyed by the last transaction (O(1))."""
+        with self.account_manager.lock:
+            if not self.ledger.verify(self.account_manager):
+                self.ui.display_error(f"Ledger out of balance by ${self.ledger.discrepancy(self.account_manager):.2f}")
+
     # =========================TRANSACTION HANDLERS=========================
 
     def _handle_withdrawal(self):
@@ -155,28 +268,59 @@ class BankingSystem:
             return
         self.transaction_processor.create(name, amount)
 
+    def _suggest_names(self, name: str):
+        """
+        If no account is held under exactly the given name, show the closest holder names (prefix and fuzzy matches).
+
+        :param name: The holder name the admin typed.
+        """
+        name_index = self.registry.name_index      # Built on the first lookup, so only admin sessions pay for it
+        if name_index is None or name_index.exact(name):
+            return
+        candidates = name_index.search(name, limit=5)
+        if candidates:
+            print("Did you mean: " + ", ".join(f"{holder} ({number})" for holder, number in candidates))
+
     def _handle_delete(self):
         """Get delete input and call transaction_processor.delete()."""
         name = self.ui.prompt_account_name()
+        self._suggest_names(name)
         account_number = self.ui.prompt_account_number()
         self.transaction_processor.delete(name, account_number)
 
     def _handle_disable(self):
         """Get disable input and call transaction_processor.disable()."""
         name = self.ui.prompt_account_name()
+        self._suggest_names(name)
         account_number = self.ui.prompt_account_number()
         self.transaction_processor.disable(name, account_number)
 
     def _handle_changeplan(self):
         """Get changeplan input and call transaction_processor.changeplan()."""
         name = self.ui.prompt_account_name()
+        self._suggest_names(name)
         account_number = self.ui.prompt_account_number()
         self.transaction_processor.change_plan(account_number)
 
 def main():
-    """Create BankingSystem and run."""
-    system = BankingSystem()
-    system.run()
+    """
+    Create BankingSystem and run: BankingSystem.py [--persist-accounts] [--database PATH]
+    --persist-accounts writes the changed accounts back to the accounts file at every logout.
+    --database keeps the accounts in an SQLite database (filled from the accounts file when empty) instead of memory.
+    Exits with status 1 if the session file could not be written.
+    """
+    args = sys.argv[1:]
+    if '--database' in args and args.index('--database') + 1 >= len(args):
+        print("usage: BankingSystem.py [--persist-accounts] [--database PATH]", file=sys.stderr)
+        sys.exit(2)
+    system = BankingSystem(database=args[args.index('--database') + 1] if '--database' in args else None)
+    system.persist_accounts = '--persist-accounts' in args
+    try:
+        system.run()
+    finally:
+        written = system.close()
+    if not written:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
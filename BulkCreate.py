@@ -0,0 +1,130 @@
+import contextlib
+import csv
+import re
+import sys
+from decimal import Decimal
+
+from AccountRegistry import AccountRegistry
+from AccountsManager import AccountsManager
+from FileHandler import FileHandler
+from Transaction import Transaction
+from TransactionLog import TransactionLog
+
+
+class BulkCreate:
+    """
+    Creates many accounts in one batch, e.g. when onboarding a partner institution. Every row is validated in a single
+    pass, the accounts that pass get a contiguous block of account numbers reserved in one call, and one 'create'
+    (code 05) record per account is added to the transaction log together.
+
+    Rows are rejected when the name or initial balance is invalid (same rules as the interactive create). A row is
+    reported as a collision when its holder already has an account, or when the same holder appears earlier in the
+    batch, since holders are looked up by name and each may hold only one account.
+
+    The collision checks and the reservation run as one step under the account manager's lock, and with an
+    SQLiteAccountsManager as one database transaction, so the numbers are recorded in the database's counters and no
+    other process sharing it can hand them out or create a colliding holder in between. An in-memory AccountsManager
+    can only reserve the numbers within this process.
+    """
+    BALANCE_FORMAT = re.compile(r'\d{1,5}(\.\d{1,2})?')     # 0 to 99999.99, the limit for a new account
+
+    def __init__(self, account_manager: AccountsManager):
+        """
+        :param account_manager: Accounts the new holders are checked against and numbers are reserved from
+                                (AccountsManager or SQLiteAccountsManager).
+        """
+        self.account_manager = account_manager
+
+    def create(self, rows, trans_log: TransactionLog) -> dict:
+        """
+        Validate the rows, reserve account numbers for the valid ones and log their create transactions.
+
+        :param rows: Iterable of (holder name, initial balance) string pairs.
+        :param trans_log: The log the create transactions are added to.
+        :return: Report dictionary:
+                 'created': [(account number, name, balance)],
+                 'rejected': [(row number, reason)],
+                 'collisions': [(row number, name, what already holds that name, e.g. 'account 00001' or 'row 8')].
+        """
+        valid, accepted, rejected, collisions = [], [], [], []
+        for row_number, row in enumerate(rows, 1):
+            if len(row) != 2:
+                rejected.append((row_number, "expected 2 fields: name, balance"))
+                continue
+            name = FileHandler.normalize_name(row[0].strip())
+            balance = row[1].strip()
+            if not 0 < len(name) <= 20:
+                rejected.append((row_number, "account name must be between 1-20 characters long"))
+            elif not self.BALANCE_FORMAT.fullmatch(balance):
+                rejected.append((row_number, f"invalid initial balance '{balance}'"))
+            else:
+                valid.append((row_number, name, Decimal(balance).quantize(Decimal('0.01'))))
+
+        manager = self.account_manager
+        with manager.lock, (manager.batch() if hasattr(manager, 'batch') else contextlib.nullcontext()):
+            seen = {}       # Holder name -> row number of its first appearance in this batch
+            for row_number, name, balance in valid:
+                if name in seen:
+                    collisions.append((row_number, name, f"row {seen[name]}"))
+                elif existing := manager.find_account_by_name(name):
+                    collisions.append((row_number, name, f"account {existing.account_number}"))
+                else:
+                    seen[name] = row_number
+                    accepted.append((name, balance))
+            numbers = manager.reserve_account_numbers(len(accepted)) if accepted else []
+        created = [(number, name, balance) for number, (name, balance) in zip(numbers, accepted)]
+        trans_log.add_transactions([Transaction('05', name, number, balance, '') for number, name, balance in created])
+        return {'created': created, 'rejected': rejected, 'collisions': collisions}
+
+
+def main():
+    """
+    Bulk-create accounts from a CSV of "name,initial balance" rows:
+    BulkCreate.py [--database PATH] ACCOUNTS_FILE INPUT_CSV TRANSACTION_FILE
+    The create records are written to TRANSACTION_FILE; rejected rows and collisions are reported on stderr.
+    --database reserves the numbers in the SQLite database the front ends share (filled from ACCOUNTS_FILE when
+    empty); without it they are only reserved against ACCOUNTS_FILE as it is now.
+    """
+    args = sys.argv[1:]
+    database = None
+    if args[:1] == ['--database']:
+        database, args = (args[1] if len(args) > 1 else None), args[2:]
+    if len(args) != 3:
+        print("usage: BulkCreate.py [--database PATH] ACCOUNTS_FILE INPUT_CSV TRANSACTION_FILE", file=sys.stderr)
+        sys.exit(2)
+    accounts_file, input_file, transaction_file = args
+
+    registry = AccountRegistry(accounts_file, database)
+    if not registry.load():
+        sys.exit(1)
+    registry.name_index         # Collision checks look up every holder name (SQLite indexes them itself)
+    log = TransactionLog()
+    try:
+        with open(input_file, 'r', newline='') as file:
+            report = BulkCreate(registry.account_manager).create(csv.reader(file), log)
+    except (IOError, ValueError) as e:
+        print(f"error: cannot create accounts from '{input_file}' - {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        registry.detach()
+
+    try:
+        FileHandler.write_file(transaction_file, log, raise_errors=True)
+    except IOError as e:
+        print(f"error: cannot write transaction file '{transaction_file}' - {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for row_number, reason in report['rejected']:
+        print(f"rejected row {row_number}: {reason}", file=sys.stderr)
+    for row_number, name, holder in report['collisions']:
+        print(f"collision row {row_number}: '{name}' is already used by {holder}", file=sys.stderr)
+    created = report['created']
+    if created:
+        print(f"created {len(created)} accounts ({created[0][0]}-{created[-1][0]}), "
+              f"{len(report['rejected'])} rejected, {len(report['collisions'])} collisions")
+    else:
+        print(f"created 0 accounts, {len(report['rejected'])} rejected, {len(report['collisions'])} collisions")
+
+
+if __name__ == "__main__":
+    main()
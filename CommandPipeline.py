@@ -0,0 +1,65 @@
+from Session import COMMANDS_BY_MODE
+
+
+class CommandPipeline:
+    """
+    Command dispatch table for one session mode, compiled once at login. For every command the mode is allowed to
+    run, the handler is wrapped by each middleware stage in turn, producing a single flat callable. Dispatching a
+    command is then one dictionary lookup and one call: authorization was settled when the table was built, and stages
+    that do not apply to a command add no per-call overhead.
+
+    A stage is a callable `stage(system, command, call) -> call` that returns `call` wrapped with its own behaviour (or
+    `call` itself to opt out). Stages listed first run outermost.
+    """
+    def __init__(self, system, mode: str, stages: list, handlers: dict = None):
+        """
+        Compile the dispatch table for a session mode.
+
+        :param system: The BankingSystem whose handlers are dispatched to.
+        :param mode: Session mode ('standard' or 'admin').
+        :param stages: Middleware stages, outermost first.
+        :param handlers: Command -> callable to dispatch to instead of the system's interactive handlers (Optional).
+        """
+        self.mode = mode
+        self.handlers = {}
+        allowed = COMMANDS_BY_MODE[mode]
+        if handlers is None:
+            handlers = {command: getattr(system, name) for command, name in system.COMMAND_HANDLERS.items()}
+        for command, call in handlers.items():
+            if command == 'logout' or command not in allowed:
+                continue
+            for stage in reversed(stages):
+                call = stage(system, command, call)
+            self.handlers[command] = call
+        self.reject = lambda: system.ui.display_error("You are not authorized to perform this transaction.")
+
+    def dispatch(self, command: str, *args):
+        """
+        Run a command through its compiled chain.
+
+        :param command: The transaction command (e.g., 'withdrawal').
+        :param args: Arguments for the handler (none for the interactive handlers).
+        """
+        handler = self.handlers.get(command)
+        return handler(*args) if handler else self.reject()
+
+    @staticmethod
+    def between_transactions(system, command: str, call):
+        """Stage: report finished background writes and pick up a reloaded accounts file before the command runs."""
+        def between(*args):
+            system._check_writes()
+            system._check_reload()
+            return call(*args)
+        return between
+
+    @staticmethod
+    def verify_ledger(system, command: str, call):
+        """Stage: check money conservation after every command that can move money."""
+        if command not in ('withdrawal', 'transfer', 'paybill', 'deposit', 'delete'):
+            return call
+
+        def verified(*args):
+            result = call(*args)
+            system._check_ledger()
+            return result
+        return verified
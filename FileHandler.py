@@ -1,6 +1,6 @@
+import os
 from decimal import Decimal
 
-from TransactionLog import TransactionLog
 from Transaction import Transaction
 from BankAccount import BankAccount
 
@@ -10,6 +10,23 @@ class FileHandler:
     Utility class with static methods for parsing the current bank accounts file and for formatting the daily
     transaction file, enforcing fixed-length formats required by banking system
     """
+    # Callables invoked as listener(filename, start) each time write_file has closed a daily transaction file, where
+    # start is the byte offset the records just written begin at
+    write_listeners = []
+
+    # Every current bank accounts record is exactly this wide, plus a newline
+    ACCOUNT_RECORD_LENGTH = 37
+    END_OF_FILE = "END_OF_FILE"
+
+    # Every daily transaction record is exactly this wide, plus a newline, with its fields at these positions
+    TRANSACTION_RECORD_LENGTH = 41
+    TRANSACTION_CODE = slice(0, 2)              # Transaction code ('00' ends a session)
+    TRANSACTION_NAME = slice(3, 23)             # Account holder name, space padded
+    TRANSACTION_ACCOUNT = slice(24, 29)         # 5-digit account number
+    TRANSACTION_AMOUNT = slice(30, 38)          # Amount as 12345.67
+    TRANSACTION_MISC = slice(39, 41)            # Miscellaneous (company code)
+    END_OF_SESSION = '00'
+
     @staticmethod
     def pad_left(line: str, width: int, pad_char: str = '0') -> str:
         """
@@ -59,10 +76,57 @@ class FileHandler:
         if len(line) < 37:
             raise ValueError("line too short")
         acc_num = line[0:5]                                             # 5-digit account number
-        name = ' '.join(line[6:26].rstrip(' ').split(" ")).lower()      # Account name
-        status = line[29]                                               # Active status
-        balance = Decimal(line[30:37].lstrip('0'))                      # Balance
-        return BankAccount(acc_num, name, balance, status)
+        raw_name = line[6:26]                                           # Account name, as stored
+        name = FileHandler.normalize_name(raw_name)                     # Account name
+        status = line[27]                                               # Active status
+        balance = Decimal(line[29:37])                                  # Balance
+        # Lowercase names are written back the same from the normalized name, so only keep the others
+        return BankAccount(acc_num, name, balance, status, file_name=None if raw_name.islower() else raw_name)
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        """
+        Normalize an account holder name the way it is stored in memory: trailing padding removed and lowercased.
+
+        :param name: Raw holder name (e.g. the 20‑character field of an account record).
+        :return: Normalized holder name.
+        """
+        return ' '.join(name.rstrip(' ').split(" ")).lower()
+
+    @staticmethod
+    def format_account_line(account: BankAccount) -> str:
+        """
+        Format a BankAccount into a 37‑character current bank accounts record. A holder name that is unchanged since it
+        was read keeps its original spelling and case.
+
+        :param account: The account to format.
+        :return: A 37‑character string (without newline).
+        """
+        account_number = FileHandler.pad_left(account.account_number, 5)
+        if account.file_name is not None and FileHandler.normalize_name(account.file_name) == account.holder_name:
+            name = account.file_name
+        else:
+            name = FileHandler.pad_right(account.holder_name[:20], 20)
+        balance = FileHandler.format_amount(account.balance)
+        return f"{account_number} {name} {account.status} {balance}"
+
+    @staticmethod
+    def format_end_of_file() -> str:
+        """
+        :return: The 37‑character record that terminates the current bank accounts file.
+        """
+        return FileHandler.format_account_line(BankAccount('00000', FileHandler.END_OF_FILE, Decimal('0.00')))
+
+    @staticmethod
+    def is_end_of_file(line: str) -> bool:
+        """
+        Check whether a current bank accounts line is the end‑of‑file marker, either on its own or as the holder name
+        of a terminating record.
+
+        :param line: A line from the account file (without newline).
+        :return: True if the line marks the end of the file, False otherwise.
+        """
+        return line == FileHandler.END_OF_FILE or line[6:26].rstrip(' ') == FileHandler.END_OF_FILE
 
     @staticmethod
     def format_transaction(trn: Transaction) -> str:
@@ -82,37 +146,124 @@ class FileHandler:
         return f"{code} {name} {account_number} {amount} {misc}"
 
     @staticmethod
-    def write_file(filename: str, trns: TransactionLog):
+    def parse_transaction_line(line: str) -> Transaction:
+        """
+        Parse a single 41‑character record from a daily transaction file.
+
+        :param line: A record from the transaction file (without newline).
+        :return: A new Transaction object populated with the parsed data.
+        """
+        if len(line) < FileHandler.TRANSACTION_AMOUNT.stop:
+            raise ValueError("line too short")
+        code = line[FileHandler.TRANSACTION_CODE]                               # Transaction code
+        name = line[FileHandler.TRANSACTION_NAME].rstrip(' ')                   # Account holder name
+        account_number = line[FileHandler.TRANSACTION_ACCOUNT]                  # 5-digit account number
+        amount = Decimal(line[FileHandler.TRANSACTION_AMOUNT])                  # Amount
+        misc = line[FileHandler.TRANSACTION_MISC].rstrip(' ')                   # Miscellaneous (company code)
+        return Transaction(code, name, account_number, amount, misc)
+
+    @staticmethod
+    def write_file(filename: str, trns: 'TransactionLog', raise_errors: bool = False, sync: bool = False,
+                   append: bool = False):
         """
         Write all transactions from a TransactionLog to the daily transaction file, followed by an end‑of‑session marker
         (code 00).
 
         :param filename: Path to the output file.
-        :param trns: The log containing the session's transactions.
+        :param trns: The log containing the session's transactions. (TransactionLog is not imported here, since it
+                     imports FileHandler.)
+        :param raise_errors: Raise IOError to the caller instead of printing it (Optional).
+        :param sync: Flush the file to disk before returning (Optional).
+        :param append: Add the session to the end of the file instead of replacing it (Optional). Listeners are given
+                       the offset the session starts at.
         """
         try:
-            with open(filename, 'w') as f:
-                for file in trns.get_transactions():
-                    f.write(file.format() + '\n')
+            with open(filename, 'a' if append else 'w') as f:
+                start = f.tell()
+                for record in trns.iter_records():
+                    f.write(record + '\n')
                 end_txn = Transaction('00', '', '00000', Decimal('0.00'), '')
                 f.write(end_txn.format() + '\n')
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
         except IOError as e:
+            if raise_errors:
+                raise
             print(f"Error writing transaction file '{filename}': {e}")
+            return
+
+        # The file is written by now, so a failing listener is reported but does not fail the write
+        for listener in FileHandler.write_listeners:
+            try:
+                listener(filename, start)
+            except Exception as e:
+                print(f"Error processing transaction file '{filename}': {e}")
 
     @staticmethod
-    def read_file(filename: str) -> list[BankAccount]:
+    def read_file(filename: str, require_end: bool = False) -> list[BankAccount]:
         """
         Read the current bank accounts file and return a list of BankAccount objects. Stops reading when an account
         with holder name "END_OF_FILE" is encountered.
 
         :param filename:Path to the output file.
+        :param require_end: Raise ValueError if the file ends before the end-of-file record, e.g. because it is still
+                            being written (Optional).
         :return: List of accounts to read from file
         """
+        return FileHandler.read_file_layout(filename, require_end)[0]
+
+    @staticmethod
+    def read_file_layout(filename: str, require_end: bool = False) -> tuple:
+        """
+        Read the current bank accounts file like read_file(), also reporting what an in-place rewrite of its records
+        needs to know.
+
+        :param filename: Path to the account file.
+        :param require_end: Raise ValueError if the file ends before the end-of-file record (Optional).
+        :return: (list of BankAccount, the end-of-file record as read or None, True if every record up to and including
+                 the end-of-file record is a fixed-width record (see is_fixed_width)).
+        """
         accounts = []
+        fixed_width = True
         with open(filename, 'r') as file:
             for line in file:
                 line = line.rstrip('\n')
-                if line == "END_OF_FILE":
-                    break
+                fixed_width = fixed_width and FileHandler.is_fixed_width(line)
+                if FileHandler.is_end_of_file(line):
+                    return accounts, line, fixed_width
                 accounts.append(FileHandler.parse_account_line(line))
-        return accounts
\ No newline at end of file
+        if require_end:
+            raise ValueError("no end-of-file record (the file may still be being written)")
+        return accounts, None, False
+
+    @staticmethod
+    def is_fixed_width(line: str) -> bool:
+        """
+        :param line: A line from the account file (without newline).
+        :return: True if the line is exactly ACCOUNT_RECORD_LENGTH ASCII characters, so exactly that many bytes.
+        """
+        return len(line) == FileHandler.ACCOUNT_RECORD_LENGTH and line.isascii()
+
+    @staticmethod
+    def write_accounts_file(filename: str, accounts, end_of_file: str = None) -> bool:
+        """
+        Rewrite the whole current bank accounts file, followed by the end‑of‑file record. The file is written to a
+        temporary path and moved into place, so readers never see a partially written master.
+
+        :param filename: Path to the account file.
+        :param accounts: BankAccount objects to write, in file order.
+        :param end_of_file: The end‑of‑file record to write (defaults to format_end_of_file()) (Optional).
+        :return: True if writing succeeded, False otherwise.
+        """
+        tmp_filename = filename + '.tmp'
+        try:
+            with open(tmp_filename, 'w') as f:
+                for account in accounts:
+                    f.write(FileHandler.format_account_line(account) + '\n')
+                f.write((end_of_file or FileHandler.format_end_of_file()) + '\n')
+            os.replace(tmp_filename, filename)
+            return True
+        except IOError as e:
+            print(f"Error writing account file '{filename}': {e}")
+            return False
\ No newline at end of file
@@ -0,0 +1,87 @@
+import os
+import statistics
+import subprocess
+import sys
+
+
+class ImportBenchmark:
+    """
+    Cold-start gate for the command line and batch entry points. Each entry module is imported in a fresh interpreter
+    with `-X importtime`, and the median cumulative import time over several runs is compared against a budget.
+    An entry point that fails to import at all (for example because of an import cycle) also fails the gate.
+    """
+    # Entry module -> cold import budget in microseconds
+    BUDGETS = {
+        'BankingSystem': 40000,         # interactive front end
+        'TransactionAggregate': 25000,  # end-of-day reporting
+        'AccountsDiff': 40000,          # back-office audit
+        'TransactionArchive': 40000,    # archiving
+        'TransactionIndex': 25000,      # statement lookups
+        'TransactionServer': 60000,     # line protocol server and client
+        'AdmissionController': 40000,   # admission control load generator
+        'BulkCreate': 50000,            # bulk account creation
+        'SessionRecorder': 55000,       # session recording
+        'SessionReplayer': 55000,       # session replay
+    }
+    # The entry modules are imported from the directory this file is in, whatever the current directory is
+    DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+    RUNS = 5
+
+    @staticmethod
+    def measure(module: str) -> tuple[int, list]:
+        """
+        Import a module once in a fresh interpreter.
+
+        :param module: Name of the module to import.
+        :return: (cumulative import time in microseconds, [(self time, module name)] for every module imported).
+        """
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True, cwd=ImportBenchmark.DIRECTORY)
+        if result.returncode != 0:
+            raise ImportError(f"cannot import {module}:\n{result.stderr.strip().splitlines()[-1]}")
+
+        total, modules = None, []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules.append((int(self_us), name.strip()))
+            if name.strip() == module:
+                total = int(cumulative_us)
+        return total, modules
+
+    @classmethod
+    def run(cls, runs: int = RUNS) -> bool:
+        """
+        Measure every entry point and print the results.
+
+        :param runs: Number of fresh interpreters per entry point (the median is used).
+        :return: True if every entry point imports within its budget, False otherwise.
+        """
+        passed = True
+        for module, budget in cls.BUDGETS.items():
+            try:
+                samples = [cls.measure(module) for _ in range(runs)]
+            except ImportError as e:
+                print(f"FAIL {module}: {e}")
+                passed = False
+                continue
+
+            median = statistics.median(total for total, _ in samples)
+            status = 'ok  ' if median <= budget else 'FAIL'
+            print(f"{status} {module:<22} {median / 1000:7.1f} ms  (budget {budget / 1000:.1f} ms)")
+            if median > budget:
+                passed = False
+                for self_us, name in sorted(samples[-1][1], reverse=True)[:5]:
+                    print(f"       {self_us / 1000:7.1f} ms  {name}")
+        return passed
+
+
+def main():
+    """Run the import-time gate: ImportBenchmark.py [RUNS]. Exits with status 1 if any entry point is over budget."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else ImportBenchmark.RUNS
+    sys.exit(0 if ImportBenchmark.run(runs) else 1)
+
+
+if __name__ == "__main__":
+    main()
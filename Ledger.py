@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+
+class Ledger:
+    """
+    Double-entry style record of every flow of money into or out of the account store. The ledger keeps a running
+    total per flow, so the money-conservation invariant
+
+        opening balance + inflows - outflows == AccountsManager.total_balance
+
+    can be checked in O(1) after every transaction or batch. Any code path that debits or credits an account without
+    posting the matching flow (or vice versa) shows up as a discrepancy.
+    """
+    INFLOWS = ('deposit', 'transfer_in')
+    OUTFLOWS = ('withdrawal', 'paybill', 'transfer_out', 'delete')
+
+    def __init__(self, opening_balance: Decimal = Decimal('0.00')):
+        """
+        Initialize an empty ledger.
+
+        :param opening_balance: Total of all account balances when the ledger is opened.
+        """
+        self.opening_balance = opening_balance
+        self.flows = {flow: Decimal('0.00') for flow in self.INFLOWS + self.OUTFLOWS}
+        self.paybill_by_company = {}
+
+    def open(self, opening_balance: Decimal):
+        """
+        Start a fresh ledger period, e.g. after the accounts file has been (re)loaded.
+
+        :param opening_balance: Total of all account balances at the start of the period.
+        """
+        self.opening_balance = opening_balance
+        self.flows = {flow: Decimal('0.00') for flow in self.flows}
+        self.paybill_by_company = {}
+
+    def rebase(self, amount: Decimal):
+        """
+        Move the opening balance by money that entered or left the account store outside of any transaction, e.g. the
+        changes applied from a reloaded accounts file, keeping the flows posted so far.
+
+        :param amount: Net change of the total balance (negative if money left).
+        """
+        self.opening_balance += amount
+
+    def post(self, flow: str, amount: Decimal, company: str = None):
+        """
+        Record money moving into or out of the account store.
+
+        :param flow: One of INFLOWS or OUTFLOWS.
+        :param amount: Positive amount moved.
+        :param company: Company code for 'paybill' flows (Optional).
+        """
+        if flow not in self.flows:
+            raise ValueError(f"unknown ledger flow '{flow}'")
+        self.flows[flow] += amount
+        if flow == 'paybill':
+            company = (company or '').upper()
+            self.paybill_by_company[company] = self.paybill_by_company.get(company, Decimal('0.00')) + amount
+
+    def post_transfer(self, amount: Decimal):
+        """
+        Record both legs of a transfer between two accounts.
+
+        :param amount: Positive amount transferred.
+        """
+        self.post('transfer_out', amount)
+        self.post('transfer_in', amount)
+
+    def expected_balance(self) -> Decimal:
+        """
+        :return: The total balance the account store should hold according to the posted flows.
+        """
+        inflows = sum(self.flows[flow] for flow in self.INFLOWS)
+        outflows = sum(self.flows[flow] for flow in self.OUTFLOWS)
+        return self.opening_balance + inflows - outflows
+
+    def discrepancy(self, account_manager) -> Decimal:
+        """
+        :param account_manager: The AccountsManager whose balances the ledger tracks.
+        :return: Money created (positive) or destroyed (negative) outside of the posted flows.
+        """
+        return account_manager.total_balance - self.expected_balance()
+
+    def verify(self, account_manager) -> bool:
+        """
+        Check the money-conservation invariant in O(1).
+
+        :param account_manager: The AccountsManager whose balances the ledger tracks.
+        :return: True if balances and flows agree, False otherwise.
+        """
+        return self.discrepancy(account_manager) == 0
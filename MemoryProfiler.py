@@ -0,0 +1,143 @@
+import linecache
+import sys
+import tracemalloc
+
+
+class MemoryProfiler:
+    """
+    Opt-in memory instrumentation for a BankingSystem. It traces allocations with tracemalloc and takes a snapshot at
+    every phase boundary: start, accounts loaded, login, every N transactions, logout and the session file written.
+    The report lists the memory traced at each boundary, the bytes per account loaded and per transaction recorded,
+    and the top allocation sites (file and line) behind each phase's growth, which shows how much goes to BankAccount
+    objects, Decimals, the AccountsManager.accounts dict and the TransactionLog list.
+
+    Enabled by setting the BANKING_MEMORY_PROFILE environment variable to N (snapshot every N transactions); the
+    report is printed to stderr at logout. Tracing slows everything down, so it is never on by default.
+    """
+    TOP_SITES = 5
+    DEFAULT_EVERY = 1000
+    # Allocations made by the profiler itself and by the import machinery are left out of every figure
+    IGNORED = (tracemalloc.__file__, linecache.__file__, __file__,
+               '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>')
+
+    def __init__(self, system, every: int = 1000, frames: int = 1):
+        """
+        Start tracing and take the 'start' snapshot.
+
+        :param system: The BankingSystem being profiled.
+        :param every: Number of transactions between two 'transactions' snapshots.
+        :param frames: Number of stack frames kept per allocation (more frames show callers, at a higher cost).
+        """
+        self.system = system
+        self.every = max(1, every)
+        # A shared registry loaded by another session is not loaded again, so there is no load growth to measure
+        self.preloaded = system.registry.loaded
+        self.transactions = 0           # Commands dispatched since the profiler started
+        self.checkpoints = []           # (phase, sites, traced bytes, accounts, transactions recorded in the log)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.checkpoint('start')
+
+    @staticmethod
+    def parse_every(value: str) -> int:
+        """
+        Read the BANKING_MEMORY_PROFILE setting.
+
+        :param value: The variable's value, which should be a positive whole number of transactions.
+        :return: The number of transactions between snapshots (DEFAULT_EVERY, with a warning, if the value is invalid).
+        """
+        try:
+            every = int(value)
+        except ValueError:
+            every = 0
+        if every > 0:
+            return every
+        print(f"warning: BANKING_MEMORY_PROFILE must be a positive whole number of transactions, got '{value}'; "
+              f"taking a snapshot every {MemoryProfiler.DEFAULT_EVERY}", file=sys.stderr)
+        return MemoryProfiler.DEFAULT_EVERY
+
+    def checkpoint(self, phase: str):
+        """
+        Take a snapshot at a phase boundary. Only its per-line totals are kept (a few hundred entries), not the
+        snapshot itself, so checkpoints stay small however many objects are traced.
+
+        :param phase: Name of the phase that just finished (e.g. 'load').
+        """
+        sites = {}                      # (filename, line number) -> (bytes, blocks)
+        for stat in tracemalloc.take_snapshot().statistics('lineno'):
+            frame = stat.traceback[0]
+            if frame.filename not in self.IGNORED:
+                sites[frame.filename, frame.lineno] = (stat.size, stat.count)
+        traced = sum(size for size, _ in sites.values())
+        log = self.system.log
+        recorded = len(log.transactions) + getattr(log, 'spilled', 0)
+        accounts = getattr(self.system.account_manager, 'accounts', ())    # None held in memory with a database
+        self.checkpoints.append((phase, sites, traced, len(accounts), recorded))
+
+    def stage(self, system, command: str, call):
+        """CommandPipeline stage: take a 'transactions' snapshot after every `every` commands."""
+        def profiled(*args):
+            result = call(*args)
+            self.transactions += 1
+            if self.transactions % self.every == 0:
+                self.checkpoint(f'transactions {self.transactions}')
+            return result
+        return profiled
+
+    def logout(self):
+        """
+        Take the 'logout' snapshot, wait for the session file and take the 'write' snapshot, then print the report.
+        """
+        self.checkpoint('logout')
+        if self.system.writer:
+            self.system.writer.flush()
+        self.checkpoint('write')
+        print(self.report(), file=sys.stderr)
+
+    def report(self) -> str:
+        """
+        :return: The memory report for every checkpoint taken so far.
+        """
+        lines = ["========Memory profile========",
+                 f"{'phase':<20} {'traced':>12} {'change':>12} {'accounts':>9} {'trans':>7}"]
+        for i, (phase, _, traced, accounts, recorded) in enumerate(self.checkpoints):
+            change = traced - self.checkpoints[i - 1][2] if i else 0
+            lines.append(f"{phase:<20} {traced:>12,} {change:>+12,} {accounts:>9} {recorded:>7}")
+
+        loaded = self._between('start', 'load')
+        if self.preloaded:
+            lines.append("bytes per account loaded: n/a (the shared accounts were already loaded by another session)")
+        elif loaded and loaded[-1][3]:
+            per_account = (loaded[-1][2] - loaded[0][2]) / loaded[-1][3]
+            lines.append(f"bytes per account loaded: {per_account:,.1f}")
+        # The log is handed to the writer at logout, so measure up to the session checkpoint holding the most records
+        session = self._between('login', 'logout')
+        if session:
+            last = max(session, key=lambda checkpoint: checkpoint[4])
+            if last[4]:
+                per_transaction = (last[2] - session[0][2]) / last[4]
+                lines.append(f"bytes per transaction recorded: {per_transaction:,.1f}")
+
+        for (_, before, _, _, _), (phase, after, _, _, _) in zip(self.checkpoints, self.checkpoints[1:]):
+            lines.append(f"--- top allocation sites: {phase} ---")
+            changes = []
+            for site in before.keys() | after.keys():
+                size, count = after.get(site, (0, 0))
+                old_size, old_count = before.get(site, (0, 0))
+                if size != old_size:
+                    changes.append((size - old_size, count - old_count, site))
+            changes.sort(key=lambda change: abs(change[0]), reverse=True)
+            for size, count, (filename, lineno) in changes[:self.TOP_SITES]:
+                code = linecache.getline(filename, lineno).strip()
+                lines.append(f"{size:>+12,} B {count:>+8} blocks  {filename.rsplit('/', 1)[-1]}:{lineno}  {code}")
+        return '\n'.join(lines)
+
+    def _between(self, first: str, last: str):
+        """:return: The checkpoints from the latest one named `first` to the following one named `last`, or None."""
+        phases = [checkpoint[0] for checkpoint in self.checkpoints]
+        if first not in phases:
+            return None
+        start = len(phases) - 1 - phases[::-1].index(first)
+        if last not in phases[start:]:
+            return None
+        return self.checkpoints[start:phases.index(last, start) + 1]
@@ -0,0 +1,212 @@
+import bisect
+
+from FileHandler import FileHandler
+
+
+class NameIndex:
+    """
+    Search index over normalized account holder names (as produced by FileHandler.normalize_name). It answers exact
+    lookups, prefix searches and bounded edit-distance (fuzzy) searches.
+
+    The distinct names are kept in one sorted list, which works as an implicit trie: names sharing a prefix sit next to
+    each other. The fuzzy search walks the list keeping one Levenshtein row per character of the current name, so it
+    only computes rows for the characters a name does not share with the previous one, and only the cells of each row
+    near its diagonal. Once a prefix is already too far from the query (or longer than any match can be), bisect skips
+    every name starting with it before any of them is scored. Anchoring the walk on the query's first character (as
+    search() does) narrows it to the names starting with that character. Holding one string per name instead of one
+    dictionary per trie node keeps the index small.
+
+    The index is kept up to date incrementally by AccountsManager through add() and remove(). New names are sorted into
+    the list in one batch when the next search needs it, so loading many accounts costs a single sort.
+    """
+    def __init__(self):
+        """Initialize an empty index."""
+        self.numbers = {}       # Normalized name -> list of account numbers held under it
+        self.names = []         # Sorted distinct names, once `added` has been merged in
+        self.added = []         # Names added since `names` was last sorted
+        self.size = 0
+
+    def rebuild(self, accounts):
+        """
+        Replace the contents of the index.
+
+        :param accounts: Iterable of BankAccount.
+        """
+        self.numbers, self.names, self.added = {}, [], []
+        self.size = 0
+        for account in accounts:
+            self.add(account)
+        self._sorted_names()
+
+    def add(self, account):
+        """
+        Index an account under its holder name.
+
+        :param account: The BankAccount to add.
+        """
+        name = FileHandler.normalize_name(account.holder_name)
+        numbers = self.numbers.get(name)
+        if numbers is None:
+            self.numbers[name] = [account.account_number]
+            self.added.append(name)
+            self.size += 1
+        elif account.account_number not in numbers:
+            numbers.append(account.account_number)
+            self.size += 1
+
+    def remove(self, account):
+        """
+        Remove an account from the index, dropping its name once no account holds it.
+
+        :param account: The BankAccount to remove (with the holder name it was indexed under).
+        """
+        name = FileHandler.normalize_name(account.holder_name)
+        numbers = self.numbers.get(name)
+        if not numbers or account.account_number not in numbers:
+            return
+        numbers.remove(account.account_number)
+        self.size -= 1
+        if not numbers:
+            del self.numbers[name]
+            names = self._sorted_names()
+            del names[bisect.bisect_left(names, name)]
+
+    def exact(self, name: str) -> list[str]:
+        """
+        :param name: Holder name (normalized before lookup).
+        :return: Sorted account numbers held under exactly that name.
+        """
+        return sorted(self.numbers.get(FileHandler.normalize_name(name), ()))
+
+    def prefix(self, prefix: str, limit: int = 20) -> list[tuple[str, str]]:
+        """
+        Find names starting with a prefix, in alphabetical order.
+
+        :param prefix: Start of the holder name (normalized before lookup).
+        :param limit: Maximum number of results.
+        :return: List of (name, account number).
+        """
+        prefix = FileHandler.normalize_name(prefix)
+        names = self._sorted_names()
+        results = []
+        for i in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            for number in sorted(self.numbers[names[i]]):
+                if len(results) >= limit:
+                    return results
+                results.append((names[i], number))
+        return results
+
+    def fuzzy(self, name: str, max_distance: int = 2, limit: int = 20,
+              anchored: bool = False) -> list[tuple[int, str, str]]:
+        """
+        Find names within an edit distance of the query, closest first.
+
+        :param name: Holder name to match (normalized before lookup).
+        :param max_distance: Largest Levenshtein distance returned.
+        :param limit: Maximum number of results.
+        :param anchored: Only consider names starting with the query's first character (typos there are rare, and
+                         it narrows the walk to those names).
+        :return: List of (distance, name, account number).
+        """
+        query = FileHandler.normalize_name(name)
+        names = self._sorted_names()
+        results = []
+        start, stop = 0, len(names)
+        if anchored:
+            if not query:
+                return results
+            start = bisect.bisect_left(names, query[0], 0, stop)
+            stop = bisect.bisect_left(names, _after(query[0]), start, stop)
+        rows = [[min(j, max_distance + 1) for j in range(len(query) + 1)]]  # rows[d]: row for previous[:d]
+        previous = ''
+        i = start
+        while i < stop:
+            text = names[i]
+            shared = 0
+            most = min(len(text), len(rows) - 1)
+            while shared < most and text[shared] == previous[shared]:
+                shared += 1
+            del rows[shared + 1:]
+            depth, skip = shared, False
+            while depth < len(text):
+                row, smallest = _next_row(query, rows[depth], text[depth], depth + 1, max_distance)
+                rows.append(row)
+                depth += 1
+                if smallest > max_distance:
+                    skip = True             # Every name starting with text[:depth] is too far (or too long)
+                    break
+            previous = text[:depth]
+            if skip:
+                i = bisect.bisect_left(names, _after(previous), i + 1, stop)
+                continue
+            if rows[depth][-1] <= max_distance:
+                results.extend((rows[depth][-1], text, number) for number in self.numbers[text])
+            i += 1
+        results.sort()
+        return results[:limit]
+
+    def search(self, name: str, limit: int = 10, max_distance: int = 2) -> list[tuple[str, str]]:
+        """
+        Ranked candidates for an admin lookup: exact matches, then prefix matches, then fuzzy matches by distance
+        among names sharing the query's first character (only walked when the first two leave room).
+
+        :param name: What the admin typed.
+        :param limit: Maximum number of results.
+        :param max_distance: Largest edit distance for fuzzy matches.
+        :return: List of (name, account number) without duplicates.
+        """
+        normalized = FileHandler.normalize_name(name)
+        ranked = [(normalized, number) for number in self.exact(normalized)]
+        ranked = list(dict.fromkeys(ranked + self.prefix(normalized, limit)))
+        if len(ranked) < limit:
+            fuzzy = self.fuzzy(normalized, max_distance, limit + len(ranked), anchored=True)
+            ranked = list(dict.fromkeys(ranked + [(text, number) for _, text, number in fuzzy]))
+        return ranked[:limit]
+
+    def _sorted_names(self) -> list[str]:
+        """Return the sorted list of names, first merging in the names added since it was last sorted."""
+        if self.added:
+            self.names += self.added
+            self.added = []
+            self.names.sort()       # Timsort merges the short new run into the sorted list in about linear time
+        return self.names
+
+
+def _next_row(query: str, row: list[int], char: str, depth: int, max_distance: int) -> tuple[list[int], int]:
+    """
+    Compute the Levenshtein row of a name prefix one character longer than the prefix of `row`. Only the cells within
+    max_distance of the diagonal can be max_distance or less, so only those are computed; every distance is capped at
+    max_distance + 1, which keeps each row's smallest value exact for the bound check.
+
+    :param query: The normalized query.
+    :param row: Row of the prefix so far (distances to each prefix of the query).
+    :param char: The next character of the name.
+    :param depth: Length of the longer prefix.
+    :param max_distance: Largest distance of interest.
+    :return: The new row and its smallest value.
+    """
+    cap = max_distance + 1
+    first, last = max(1, depth - max_distance), min(len(query), depth + max_distance)
+    next_row = [cap] * (len(query) + 1)
+    next_row[0] = left = smallest = min(depth, cap)
+    if first > 1:
+        left = cap
+    for j in range(first, last + 1):
+        value = row[j - 1] if query[j - 1] == char else row[j - 1] + 1
+        if row[j] + 1 < value:
+            value = row[j] + 1
+        if left + 1 < value:
+            value = left + 1
+        if value > cap:
+            value = cap
+        next_row[j] = left = value
+        if value < smallest:
+            smallest = value
+    return next_row, smallest
+
+
+def _after(prefix: str) -> str:
+    """:return: The smallest string greater than every string starting with `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
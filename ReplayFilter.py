@@ -0,0 +1,165 @@
+import datetime
+import hashlib
+import math
+import os
+import sqlite3
+
+from FileHandler import FileHandler
+
+
+class ReplayFilter:
+    """
+    Persistent duplicate detector for daily transaction records, so that re-delivered or partially replayed files are
+    never applied twice.
+
+    Every record gets a stable key derived from the daily file it belongs to, the position of its session in that file
+    (sessions are only ever appended), its sequence number within the session and its contents. The file is identified
+    by the caller, e.g. with daily_file_id(), which combines the business date with the file name: the daily file keeps
+    the same name every day, so its name alone would make a new day's records look like replays of the day before. The
+    key depends on nothing else about the delivery, so a redelivery that is truncated, or that has grown since, yields
+    exactly the records not seen before.
+
+    Keys are checked against a rotating set of Bloom filters held in memory (fixed size, so memory stays bounded
+    however many records pass through). Only when a Bloom filter reports a possible match is the exact key
+    store on disk consulted, so new records, which are the common case, never touch the disk for a lookup.
+
+    When the newest filter reaches its capacity a new generation is started; once more than `generations`
+    generations exist, the oldest filter and its exact keys are dropped.
+    """
+    def __init__(self, filename: str, capacity: int = 1_000_000, error_rate: float = 0.001, generations: int = 4):
+        """
+        Open (or create) a replay filter store.
+
+        :param filename: Path to the SQLite file holding the filters and exact keys.
+        :param capacity: Keys per generation.
+        :param error_rate: Target false positive rate of each Bloom filter.
+        :param generations: Number of generations kept before the oldest is dropped.
+        """
+        self.capacity = capacity
+        self.generations = generations
+        self.bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2 / 8) * 8)
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+
+        self.db = sqlite3.connect(filename)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS blooms (generation INTEGER PRIMARY KEY, count INTEGER, bits BLOB);
+            CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY, generation INTEGER) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS seen_generation ON seen (generation);
+        ''')
+        # generation -> [count, bytearray], oldest first
+        self.blooms = {generation: [count, bytearray(bits)]
+                       for generation, count, bits in self.db.execute(
+                           'SELECT generation, count, bits FROM blooms ORDER BY generation')}
+        if not self.blooms or len(next(iter(self.blooms.values()))[1]) * 8 != self.bits:
+            if self.blooms:
+                raise ValueError(f"replay filter '{filename}' was created with a different capacity or error rate")
+            self._start_generation(0)
+
+    @staticmethod
+    def record_key(session_id: str, sequence: int, record: str) -> bytes:
+        """
+        Derive the stable key of a transaction record.
+
+        :param session_id: Identifier of the session that produced the record.
+        :param sequence: Position of the record within its session.
+        :param record: The record itself (without newline).
+        :return: 16‑byte key.
+        """
+        return hashlib.blake2b(f"{session_id}\0{sequence}\0{record}".encode('utf-8'), digest_size=16).digest()
+
+    @staticmethod
+    def daily_file_id(filename: str, date: datetime.date = None) -> str:
+        """
+        Identify the daily transaction file of one business day: every delivery of it, whole, truncated or grown, gets
+        the same id, and another day's file gets a different one even under the same name.
+
+        :param filename: Path to the daily transaction file.
+        :param date: Business date of the file. Defaults to the date the file was last modified.
+        :return: '<date>:<file name>'.
+        """
+        if date is None:
+            date = datetime.date.fromtimestamp(os.stat(filename).st_mtime)
+        return f"{date.isoformat()}:{os.path.basename(filename)}"
+
+    def seen(self, key: bytes) -> bool:
+        """
+        :param key: Record key from record_key().
+        :return: True if the key has already been added, False otherwise.
+        """
+        positions = self._positions(key)
+        for _, bits in self.blooms.values():
+            if all(bits[position >> 3] & (1 << (position & 7)) for position in positions):
+                break
+        else:
+            return False
+        return self.db.execute('SELECT 1 FROM seen WHERE key = ?', (key,)).fetchone() is not None
+
+    def add(self, key: bytes) -> bool:
+        """
+        Check a key and remember it.
+
+        :param key: Record key from record_key().
+        :return: True if the key is new, False if it is a duplicate.
+        """
+        if self.seen(key):
+            return False
+        generation = next(reversed(self.blooms))
+        entry = self.blooms[generation]
+        for position in self._positions(key):
+            entry[1][position >> 3] |= 1 << (position & 7)
+        entry[0] += 1
+        self.db.execute('INSERT OR IGNORE INTO seen (key, generation) VALUES (?, ?)', (key, generation))
+        if entry[0] >= self.capacity:
+            self._start_generation(generation + 1)
+        return True
+
+    def new_records(self, filename: str, source: str):
+        """
+        Yield the records of a daily transaction file that have not been seen before, remembering them as they go.
+        Sessions are delimited by end‑of‑session (code 00) records, which are never yielded.
+
+        :param filename: Path to the daily transaction file.
+        :param source: Id of the business day's daily file, the same for every delivery of it, e.g. from
+                       daily_file_id(filename).
+        """
+        if not source:
+            raise ValueError("a daily file id is required to tell one day's daily file from another's")
+        session, sequence = 0, 0
+        with open(filename, 'r') as file:
+            for line in file:
+                record = line.rstrip('\n')
+                if record[FileHandler.TRANSACTION_CODE] == FileHandler.END_OF_SESSION:
+                    session, sequence = session + 1, 0
+                    continue
+                if self.add(self.record_key(f"{source}/{session}", sequence, record)):
+                    yield record
+                sequence += 1
+        self.flush()
+
+    def flush(self):
+        """Persist the Bloom filters and every key added so far."""
+        self.db.executemany('UPDATE blooms SET count = ?, bits = ? WHERE generation = ?',
+                            [(count, bytes(bits), generation) for generation, (count, bits) in self.blooms.items()])
+        self.db.commit()
+
+    def close(self):
+        """Flush and close the store."""
+        self.flush()
+        self.db.close()
+
+    def _positions(self, key: bytes) -> list[int]:
+        """Bit positions of a key in a Bloom filter, by double hashing the two halves of the key."""
+        first = int.from_bytes(key[:8], 'little')
+        second = int.from_bytes(key[8:16], 'little') | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def _start_generation(self, generation: int):
+        """Start a new, empty Bloom filter and drop the oldest generations beyond the retention limit."""
+        self.blooms[generation] = [0, bytearray(self.bits // 8)]
+        self.db.execute('INSERT OR REPLACE INTO blooms (generation, count, bits) VALUES (?, 0, ?)',
+                        (generation, bytes(self.blooms[generation][1])))
+        while len(self.blooms) > self.generations:
+            oldest = next(iter(self.blooms))
+            del self.blooms[oldest]
+            self.db.execute('DELETE FROM blooms WHERE generation = ?', (oldest,))
+            self.db.execute('DELETE FROM seen WHERE generation = ?', (oldest,))
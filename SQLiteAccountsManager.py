@@ -0,0 +1,370 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from BankAccount import BankAccount
+from FileHandler import FileHandler
+
+
+class SQLiteAccountsManager:
+    """
+    Storage engine with the same interface as AccountsManager, backed by an SQLite database in WAL mode instead of an
+    in-memory dictionary. Accounts are read on demand, so the account set can be larger than RAM, and several front
+    end processes can share one database (WAL lets readers run alongside the single writer). Select it with
+    AccountRegistry(filename, database) or BankingSystem.py --database PATH.
+
+    Every statement except select()'s is a fixed SQL string, so sqlite3 prepares it once and reuses it from its
+    statement cache. Each mutation commits on its own unless it runs inside batch(), which groups any number of them
+    into one transaction. Balances are stored as integer cents.
+
+    The connection may be used from any thread: every use of it holds the manager's lock. Account numbers handed out
+    by reserve_account_numbers() are recorded in the database, so processes sharing it never hand out the same
+    number, and refresh() brings total_balance up to date after other processes have written.
+    """
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS accounts (
+            number TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            balance INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'A',
+            plan TEXT NOT NULL DEFAULT 'SP'
+        );
+        CREATE INDEX IF NOT EXISTS accounts_name ON accounts (name);
+        CREATE INDEX IF NOT EXISTS accounts_status ON accounts (status);
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    '''
+    SELECT_ACCOUNT = 'SELECT number, name, balance, status, plan FROM accounts WHERE number = ?'
+    SELECT_BY_NAME = 'SELECT number, name, balance, status, plan FROM accounts WHERE name = ? ORDER BY number LIMIT 1'
+    SELECT_ALL = 'SELECT number, name, balance, status, plan FROM accounts ORDER BY number'
+    UPSERT = 'INSERT OR REPLACE INTO accounts (number, name, balance, status, plan) VALUES (?, ?, ?, ?, ?)'
+    ADD_BALANCE = 'UPDATE accounts SET balance = balance + ? WHERE number = ?'
+    SUBTRACT_BALANCE = 'UPDATE accounts SET balance = balance - ? WHERE number = ? AND balance >= ?'
+    SET_STATUS = 'UPDATE accounts SET status = ? WHERE number = ?'
+    SET_PLAN = 'UPDATE accounts SET plan = ? WHERE number = ?'
+    DELETE = 'DELETE FROM accounts WHERE number = ?'
+    SELECT_COUNTER = 'SELECT value FROM counters WHERE name = ?'
+    SET_COUNTER = 'INSERT OR REPLACE INTO counters (name, value) VALUES (?, ?)'
+    SUM_BALANCES = 'SELECT COALESCE(SUM(balance), 0) FROM accounts'
+    # select() filters: BankAccount attribute -> column
+    COLUMNS = {'account_number': 'number', 'holder_name': 'name', 'status': 'status', 'plan': 'plan'}
+
+    def __init__(self, database: str):
+        """
+        Open (or create) the accounts database.
+
+        :param database: Path to the SQLite database file.
+        """
+        self.db = sqlite3.connect(database, isolation_level=None, cached_statements=64, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(self.SCHEMA)
+        self.in_batch = False
+        self.lock = threading.RLock()   # Guards the connection; TransactionProcessor holds it for each transaction
+        self.data_version = None        # PRAGMA data_version when total_balance was last computed
+        self.total_balance = Decimal('0.00')
+        self._refresh_total()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group the mutations made inside the block into a single transaction, committed when the block exits (or
+        rolled back if it raises).
+        """
+        with self.lock:
+            if self.in_batch:
+                yield self
+                return
+            self.db.execute('BEGIN IMMEDIATE')
+            self.in_batch = True
+            try:
+                yield self
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                self._refresh_total()
+                raise
+            finally:
+                self.in_batch = False
+
+    def load_accounts(self, filename: str) -> bool:
+        """
+        Import a current bank accounts file into the database in one transaction, replacing accounts with the same
+        numbers.
+
+        :param filename: Path to the account file.
+        :return: True if loading succeeded, False otherwise.
+        """
+        try:
+            accounts = FileHandler.read_file(filename)
+            with self.batch():
+                self.db.executemany(self.UPSERT, (self._row(account) for account in accounts))
+                self._refresh_total()
+            return True
+        except (IOError, ValueError) as e:
+            print(f"error: cannot read account file '{filename}' - {e}")
+            return False
+
+    def save_accounts(self, filename: str) -> bool:
+        """
+        Export every account to a current bank accounts file, in account number order.
+
+        :param filename: Path to the account file.
+        :return: True if saving succeeded, False otherwise.
+        """
+        return FileHandler.write_accounts_file(filename, self.iter_accounts())
+
+    def flush_accounts(self, filename: str) -> bool:
+        """
+        Write the accounts back to a current bank accounts file. The database is always up to date, so this exports
+        every account, like save_accounts().
+
+        :param filename: Path to the account file.
+        :return: True if saving succeeded, False otherwise.
+        """
+        return self.save_accounts(filename)
+
+    def is_empty(self) -> bool:
+        """:return: True if the database holds no accounts."""
+        with self.lock:
+            return self.db.execute('SELECT 1 FROM accounts LIMIT 1').fetchone() is None
+
+    def iter_accounts(self):
+        """Yield every account in account number order, streaming them from the database a page at a time."""
+        with self.lock:
+            cursor = self.db.execute(self.SELECT_ALL)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for row in rows:
+                yield self._account(row)
+
+    def find_account(self, account_number: str):
+        """
+        Retrieve an account by its account number.
+
+        :param account_number: 5‑digit account number (zero‑padded).
+        :return: BankAccount (if found) or None (otherwise).
+        """
+        with self.lock:
+            row = self.db.execute(self.SELECT_ACCOUNT, (account_number,)).fetchone()
+        return self._account(row) if row else None
+
+    def find_account_by_name(self, name: str):
+        """
+        Find the first account belonging to a given holder name, using the holder name index.
+
+        :param name: Account holder's name.
+        :return: BankAccount (if found) or None (otherwise).
+        """
+        with self.lock:
+            row = self.db.execute(self.SELECT_BY_NAME, (name,)).fetchone()
+        return self._account(row) if row else None
+
+    def add_account(self, account: BankAccount):
+        """
+        Add (or replace) an account.
+
+        :param account: The account to add.
+        """
+        with self.batch():
+            previous = self.find_account(account.account_number)
+            self.db.execute(self.UPSERT, self._row(account))
+            self.total_balance += account.balance - (previous.balance if previous else 0)
+
+    def debit(self, account: BankAccount, amount: Decimal):
+        """
+        Subtract the specified amount from the account balance. The balance is checked again by the update itself, so
+        money another process took out after the caller's check cannot make it negative.
+
+        :param account: The account to debit.
+        :param amount: Positive amount to deduct.
+        :raises ValueError: If the stored balance is less than the amount (the enclosing batch is rolled back).
+        """
+        if account:
+            with self.batch():
+                cents = self._cents(amount)
+                if self.db.execute(self.SUBTRACT_BALANCE, (cents, account.account_number, cents)).rowcount != 1:
+                    raise ValueError(f"insufficient funds in account {account.account_number}")
+                account.balance_deduction(amount)
+                self.total_balance -= amount
+
+    def credit(self, account: BankAccount, amount: Decimal):
+        """
+        Add the specified amount to the account balance.
+
+        :param account: The account to credit.
+        :param amount: Positive amount to add.
+        """
+        with self.batch():
+            self.db.execute(self.ADD_BALANCE, (self._cents(amount), account.account_number))
+            account.balance_addition(amount)
+            self.total_balance += amount
+
+    def disable_account(self, account_number: str):
+        """
+        Set the status of the account to disabled ('D').
+
+        :param account_number: The account number to disable.
+        """
+        with self.batch():
+            self.db.execute(self.SET_STATUS, ('D', account_number))
+
+    def delete(self, account_number: str):
+        """
+        Permanently remove an account.
+
+        :param account_number: The account number to delete.
+        """
+        with self.batch():
+            account = self.find_account(account_number)
+            if account:
+                self.db.execute(self.DELETE, (account_number,))
+                self.total_balance -= account.balance
+
+    def change_plan(self, account_number: str):
+        """
+        Change the account plan from student ('SP') to non‑student ('NP').
+
+        :param account_number: The account number to modify.
+        """
+        with self.batch():
+            self.db.execute(self.SET_PLAN, ('NP', account_number))
+
+    def disable_accounts(self, account_numbers) -> list[BankAccount]:
+        """
+        Disable many accounts in one transaction. Missing and already disabled accounts are skipped.
+
+        :param account_numbers: Iterable of account numbers to disable.
+        :return: The accounts that were disabled.
+        """
+        changed = []
+        with self.batch():
+            for account_number in account_numbers:
+                account = self.find_account(account_number)
+                if account and account.is_active():
+                    self.db.execute(self.SET_STATUS, ('D', account_number))
+                    account.disable()
+                    changed.append(account)
+        return changed
+
+    def change_plans(self, account_numbers) -> list[BankAccount]:
+        """
+        Change many accounts from student ('SP') to non‑student ('NP') in one transaction. Missing and already
+        non‑student accounts are skipped.
+
+        :param account_numbers: Iterable of account numbers to modify.
+        :return: The accounts whose plan was changed.
+        """
+        changed = []
+        with self.batch():
+            for account_number in account_numbers:
+                account = self.find_account(account_number)
+                if account and account.is_student():
+                    self.db.execute(self.SET_PLAN, ('NP', account_number))
+                    account.plan = 'NP'
+                    changed.append(account)
+        return changed
+
+    def select(self, min_balance: Decimal = None, max_balance: Decimal = None, **attributes) -> list[BankAccount]:
+        """
+        Find every account matching the given filters, e.g. select(status='D') or select(plan='SP', min_balance=X), in
+        one query.
+
+        :param min_balance: Only accounts with at least this balance (Optional).
+        :param max_balance: Only accounts with at most this balance (Optional).
+        :param attributes: BankAccount attribute name -> required value (one of COLUMNS).
+        :return: Matching accounts in account number order.
+        :raises ValueError: If an attribute has no column.
+        """
+        conditions, parameters = [], []
+        for name, value in sorted(attributes.items()):
+            if name not in self.COLUMNS:
+                raise ValueError(f"cannot select accounts by '{name}'")
+            conditions.append(f'{self.COLUMNS[name]} = ?')
+            parameters.append(value)
+        if min_balance is not None:
+            conditions.append('balance >= ?')
+            parameters.append(self._cents(min_balance))
+        if max_balance is not None:
+            conditions.append('balance <= ?')
+            parameters.append(self._cents(max_balance))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        query = f'SELECT number, name, balance, status, plan FROM accounts{where} ORDER BY number'
+        with self.lock:
+            rows = self.db.execute(query, parameters).fetchall()
+        return [self._account(row) for row in rows]
+
+    def generate_new_account_number(self) -> str:
+        """
+        Generate a new unique 5‑digit account number (zero‑padded).
+
+        :return: A new account number greater than any existing number. (str)
+        """
+        return self.reserve_account_numbers(1)[0]
+
+    def reserve_account_numbers(self, count: int) -> list[str]:
+        """
+        Reserve a contiguous block of new account numbers, greater than any number stored or handed out so far by
+        any process sharing the database. The highest number handed out is kept in the counters table and advanced in
+        the same write transaction that reads it.
+
+        :param count: Number of account numbers needed.
+        :return: The reserved account numbers, in order. (zero‑padded str)
+        :raises ValueError: If the block would run past 99999.
+        """
+        with self.batch():
+            highest = self.db.execute('SELECT MAX(number) FROM accounts').fetchone()[0]
+            reserved = self.db.execute(self.SELECT_COUNTER, ('account_number',)).fetchone()
+            first = max(int(highest or 0), reserved[0] if reserved else 0) + 1
+            if first + count - 1 > 99999:
+                raise ValueError(f"cannot reserve {count} account numbers: only {99999 - first + 1} remain")
+            self.db.execute(self.SET_COUNTER, ('account_number', first + count - 1))
+        return [f"{number:05d}" for number in range(first, first + count)]
+
+    def refresh(self) -> bool:
+        """
+        Bring total_balance up to date if another connection has committed changes since it was last computed (its
+        own changes keep it up to date as they are made).
+
+        :return: True if another connection has written to the database since the last refresh.
+        """
+        with self.lock:
+            if self.db.execute('PRAGMA data_version').fetchone()[0] == self.data_version:
+                return False
+            self._refresh_total()
+            return True
+
+    def close(self):
+        """Close the database connection."""
+        with self.lock:
+            self.db.close()
+
+    def _refresh_total(self):
+        """Recompute the balance total from the database (on open, after bulk imports, a rollback or other writers)."""
+        with self.lock:
+            self.data_version = self.db.execute('PRAGMA data_version').fetchone()[0]
+            cents = self.db.execute(self.SUM_BALANCES).fetchone()[0]
+            self.total_balance = Decimal(cents).scaleb(-2)
+
+    @staticmethod
+    def _cents(amount: Decimal) -> int:
+        """Convert a Decimal amount to integer cents."""
+        return int(amount * 100)
+
+    @staticmethod
+    def _row(account: BankAccount) -> tuple:
+        """Convert a BankAccount to a table row."""
+        return (account.account_number, account.holder_name, SQLiteAccountsManager._cents(account.balance),
+                account.status, account.plan)
+
+    @staticmethod
+    def _account(row: tuple) -> BankAccount:
+        """Convert a table row to a BankAccount."""
+        number, name, cents, status, plan = row
+        return BankAccount(number, name, Decimal(cents).scaleb(-2), status, plan)
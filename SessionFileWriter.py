@@ -0,0 +1,78 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+
+from FileHandler import FileHandler
+
+
+class SessionFileWriter:
+    """
+    Background writer for daily transaction files. Logout hands the session's TransactionLog to a bounded queue and
+    gets a Future back immediately; a single writer thread formats and writes the files in submission order.
+
+    When the queue is full, submit() blocks (or times out) so a slow disk pushes back on new logouts instead of
+    buffering without limit. Pending files are flushed to disk on close(), which also runs at interpreter exit.
+
+    In append mode each session is added to the end of its file, so one writer shared by many sessions (as in
+    TransactionServer) collects all of them in the daily file, one whole session after another.
+    """
+    def __init__(self, max_pending: int = 8, append: bool = False):
+        """
+        Start the writer thread.
+
+        :param max_pending: Maximum number of session files waiting to be written.
+        :param append: Append each session to its file instead of replacing the file (Optional).
+        """
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.append = append
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name='SessionFileWriter', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, filename: str, trns, timeout: float = None) -> Future:
+        """
+        Queue a session's transactions to be written to the daily transaction file.
+
+        :param filename: Path to the output file.
+        :param trns: TransactionLog holding the session's transactions. It must not be modified afterwards.
+        :param timeout: Seconds to wait for room in the queue (None waits indefinitely).
+        :return: Future resolving to the filename once written, or to the IOError that stopped it.
+        :raises queue.Full: If the queue stays full for longer than `timeout`.
+        """
+        if self.closed:
+            raise RuntimeError("session file writer is closed")
+        future = Future()
+        self.queue.put((filename, trns, future), timeout=timeout)
+        return future
+
+    def flush(self):
+        """Wait until every queued session file has been written."""
+        self.queue.join()
+
+    def close(self):
+        """Write out everything still queued, then stop the writer thread."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        """Writer thread: write queued session files one at a time until close() is called."""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                filename, trns, future = item
+                if future.set_running_or_notify_cancel():
+                    try:
+                        FileHandler.write_file(filename, trns, raise_errors=True, sync=True, append=self.append)
+                        future.set_result(filename)
+                    except Exception as e:
+                        future.set_exception(e)
+            finally:
+                self.queue.task_done()
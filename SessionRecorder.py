@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sys
+import time
+
+from BankingSystem import BankingSystem
+from UserInterface import UserInterface
+
+
+class SessionRecorder:
+    """
+    Records what a teller does in a session: every raw input line read by UserInterface.read_input, when it was
+    prompted for and when it was answered, and every success or error message shown. The log is compact tab-separated
+    text, appended one session at a time:
+
+        S <start time> <accounts hash>                  start of a session (seconds since the epoch)
+        I <prompted ms> <answered ms> <input as JSON>   one input line
+        O <shown ms> <OK|ERR> <message as JSON>         one outcome message
+
+    Times are milliseconds since the start of the session. The accounts hash identifies the current bank accounts
+    file the session started from ('-' if there was none; logs written before it was recorded have no such field),
+    so SessionReplayer can tell when it re-drives a recorded log against different accounts.
+
+    Usage: with SessionRecorder(filename): BankingSystem().run()
+    """
+    def __init__(self, filename: str = None, source=None, accounts_file: str = "current_bank_accounts.txt"):
+        """
+        :param filename: Path of the log to append the session to (None keeps the session in memory only).
+        :param source: Function reading a raw input line for a prompt (defaults to input()).
+        :param accounts_file: Path of the current bank accounts file the session runs against.
+        """
+        self.filename = filename
+        self.source = source or input
+        self.accounts_file = accounts_file
+        self.session = None         # Recorded session, in the format returned by load()
+        self.start = None
+
+    def __enter__(self):
+        """Start recording: UserInterface reads its input through this recorder until the block exits."""
+        self.start = time.perf_counter()
+        self.session = {'start': time.time(), 'accounts': self.accounts_hash(self.accounts_file),
+                        'inputs': [], 'outcomes': []}
+        UserInterface.recorder = self
+        return self
+
+    def __exit__(self, *exc):
+        """Stop recording and append the session to the log."""
+        UserInterface.recorder = None
+        if self.filename:
+            lines = [f"S\t{self.session['start']:.3f}\t{self.session['accounts'] or '-'}"]
+            lines += [f"I\t{prompted:.3f}\t{answered:.3f}\t{json.dumps(text)}"
+                      for prompted, answered, text in self.session['inputs']]
+            lines += [f"O\t{shown:.3f}\t{kind}\t{json.dumps(message)}"
+                      for shown, kind, message in self.session['outcomes']]
+            with open(self.filename, 'a') as file:
+                file.write('\n'.join(lines) + '\n')
+        return False
+
+    def read(self, prompt: str) -> str:
+        """
+        Read one raw input line from the source and record it.
+
+        :param prompt: The prompt shown for the input.
+        :return: The line read.
+        """
+        prompted = self._now()
+        value = self.source(prompt)
+        self.session['inputs'].append((prompted, self._now(), value))
+        return value
+
+    def outcome(self, kind: str, message: str):
+        """
+        Record a message shown to the teller.
+
+        :param kind: 'OK' for success messages, 'ERR' for errors.
+        :param message: The message.
+        """
+        self.session['outcomes'].append((self._now(), kind, message))
+
+    def _now(self) -> float:
+        """Milliseconds since the session started."""
+        return (time.perf_counter() - self.start) * 1000
+
+    @staticmethod
+    def accounts_hash(filename: str):
+        """
+        :param filename: Path of a current bank accounts file.
+        :return: Hex digest of the file's contents, or None if it cannot be read.
+        """
+        try:
+            with open(filename, 'rb') as file:
+                return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+        except IOError:
+            return None
+
+    @staticmethod
+    def load(filename: str) -> list[dict]:
+        """
+        Read a session log.
+
+        :param filename: Path of the log.
+        :return: One dictionary per session: {'start': seconds since the epoch, 'accounts': accounts hash or None,
+                 'inputs': [(prompted ms, answered ms, text)], 'outcomes': [(shown ms, kind, message)]}.
+        :raises ValueError: If a line is not a valid log record.
+        """
+        sessions = []
+        with open(filename, 'r') as file:
+            for number, line in enumerate(file, 1):
+                fields = line.rstrip('\n').split('\t')
+                if fields[0] == 'S' and len(fields) in (2, 3):
+                    accounts = fields[2] if len(fields) == 3 and fields[2] != '-' else None
+                    sessions.append({'start': float(fields[1]), 'accounts': accounts, 'inputs': [], 'outcomes': []})
+                elif fields[0] == 'I' and len(fields) == 4 and sessions:
+                    sessions[-1]['inputs'].append((float(fields[1]), float(fields[2]), json.loads(fields[3])))
+                elif fields[0] == 'O' and len(fields) == 4 and sessions:
+                    sessions[-1]['outcomes'].append((float(fields[1]), fields[2], json.loads(fields[3])))
+                else:
+                    raise ValueError(f"line {number}: invalid session log record")
+        return sessions
+
+
+def main():
+    """Run one interactive session, appending everything the teller does to LOG: SessionRecorder.py LOG"""
+    if len(sys.argv) != 2:
+        print("usage: SessionRecorder.py LOG", file=sys.stderr)
+        sys.exit(2)
+    with SessionRecorder(sys.argv[1]):
+        BankingSystem().run()
+
+
+if __name__ == "__main__":
+    main()
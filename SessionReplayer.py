@@ -0,0 +1,140 @@
+import contextlib
+import os
+import sys
+import time
+
+from BankingSystem import BankingSystem
+from SessionRecorder import SessionRecorder
+
+
+class SessionReplayer:
+    """
+    Re-drives sessions recorded by SessionRecorder against a fresh BankingSystem each, feeding the recorded input
+    lines back through UserInterface.read_input. The teller's think time (from prompt to answer) is replayed at the
+    original speed, scaled by a speed factor, or skipped entirely; the time the system itself takes between an answer
+    and its next prompt is measured again, so recorded and replayed service latencies can be compared to reproduce a
+    slowdown deterministically. The replayed screen output and session files go to os.devnull.
+
+    Sessions run against the current bank accounts file in the working directory. When a session recorded the hash
+    of the file it started from and the file now differs, its report says so, since its outcomes may differ too.
+    """
+    def __init__(self, sessions: list[dict], speed: float = 1.0):
+        """
+        :param sessions: Sessions as returned by SessionRecorder.load().
+        :param speed: Think-time speed-up (1 replays at the original pace, 10 ten times faster, 0 without waiting).
+        """
+        self.sessions = sessions
+        self.speed = speed
+
+    def replay(self) -> list[dict]:
+        """
+        Replay every session in order.
+
+        :return: One report per session (see compare()).
+        """
+        return [self.compare(session, self.replay_session(session)) for session in self.sessions]
+
+    def replay_session(self, session: dict) -> dict:
+        """
+        Replay one session.
+
+        :param session: A recorded session.
+        :return: The replayed session, in the same format, with 'diverged' set if the system asked for more or fewer
+                 inputs than were recorded.
+        """
+        inputs = iter(session['inputs'])
+
+        def source(prompt):
+            recorded = next(inputs, None)
+            if recorded is None:
+                raise EOFError("the recorded session has no more input")
+            prompted, answered, text = recorded
+            if self.speed:
+                time.sleep((answered - prompted) / 1000 / self.speed)
+            return text
+
+        system = BankingSystem()
+        system.daily_transaction_file = os.devnull
+        recorder = SessionRecorder(source=source, accounts_file=system.current_accounts_file)
+        diverged = False
+        with recorder, open(os.devnull, 'w') as screen, contextlib.redirect_stdout(screen):
+            try:
+                system.run()
+            except EOFError:
+                diverged = True
+        system.close()
+        replayed = recorder.session
+        replayed['diverged'] = diverged or next(inputs, None) is not None
+        return replayed
+
+    @staticmethod
+    def compare(recorded: dict, replayed: dict) -> dict:
+        """
+        Compare a recorded session with its replay.
+
+        :param recorded: The recorded session.
+        :param replayed: The replayed session.
+        :return: {'inputs', 'diverged', 'mismatched outcomes', 'accounts changed' (the session recorded a different
+                 accounts file than it was replayed against), and for both 'recorded' and 'replayed':
+                 {'duration ms', 'inputs/s', 'service p50 ms', 'service p99 ms', 'service total ms'}}.
+        """
+        mismatched = sum(a[1:] != b[1:] for a, b in zip(recorded['outcomes'], replayed['outcomes']))
+        mismatched += abs(len(recorded['outcomes']) - len(replayed['outcomes']))
+        return {
+            'inputs': len(recorded['inputs']),
+            'diverged': replayed.get('diverged', False),
+            'mismatched outcomes': mismatched,
+            'accounts changed': recorded.get('accounts') is not None
+                                and recorded['accounts'] != replayed.get('accounts'),
+            'recorded': SessionReplayer.timings(recorded),
+            'replayed': SessionReplayer.timings(replayed),
+        }
+
+    @staticmethod
+    def timings(session: dict) -> dict:
+        """
+        :param session: A recorded or replayed session.
+        :return: Duration, input throughput and the service latencies (from each answer to the next prompt) in ms.
+        """
+        inputs = session['inputs']
+        service = sorted(prompted - answered for (_, answered, _), (prompted, _, _) in zip(inputs, inputs[1:]))
+        duration = max([answered for _, answered, _ in inputs] + [shown for shown, _, _ in session['outcomes']] + [0])
+        return {
+            'duration ms': round(duration, 3),
+            'inputs/s': round(len(inputs) / (duration / 1000), 1) if duration else 0.0,
+            'service p50 ms': round(service[len(service) // 2], 3) if service else 0.0,
+            'service p99 ms': round(service[min(len(service) - 1, int(len(service) * 0.99))], 3) if service else 0.0,
+            'service total ms': round(sum(service), 3),
+        }
+
+
+def main():
+    """
+    Replay a session log and print a report per session: SessionReplayer.py LOG [SPEED]
+    SPEED scales the teller's think time (1 = original pace, the default; 'max' or 0 = no waiting).
+    """
+    if len(sys.argv) not in (2, 3):
+        print("usage: SessionReplayer.py LOG [SPEED]", file=sys.stderr)
+        sys.exit(2)
+    speed = sys.argv[2] if len(sys.argv) == 3 else '1'
+    try:
+        sessions = SessionRecorder.load(sys.argv[1])
+    except (IOError, ValueError) as e:
+        print(f"error: cannot read session log '{sys.argv[1]}' - {e}", file=sys.stderr)
+        sys.exit(1)
+
+    reports = SessionReplayer(sessions, 0 if speed == 'max' else float(speed)).replay()
+    for number, report in enumerate(reports, 1):
+        recorded, replayed = report['recorded'], report['replayed']
+        if report['accounts changed']:
+            print(f"warning: session {number} was recorded against a different accounts file; its outcomes may differ",
+                  file=sys.stderr)
+        print(f"session {number}: {report['inputs']} inputs, {report['mismatched outcomes']} mismatched outcomes"
+              f"{', DIVERGED' if report['diverged'] else ''}")
+        for key in recorded:
+            change = replayed[key] - recorded[key]
+            print(f"    {key:<17} recorded {recorded[key]:>10} replayed {replayed[key]:>10} ({change:+.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from FileHandler import FileHandler
+from Transaction import Transaction
+from TransactionLog import TransactionLog
+
+
+class SpillingTransactionLog(TransactionLog):
+    """
+    TransactionLog with a fixed in‑memory budget. Once `memory_limit` transactions are held, they are encoded as daily
+    transaction records and appended to a temporary spill file, so memory stays flat however long the session runs.
+    Spilled records are streamed straight back out when the session file is written.
+    """
+    def __init__(self, memory_limit: int = 10000):
+        """
+        :param memory_limit: Maximum number of Transaction objects kept in memory.
+        """
+        super().__init__()
+        self.memory_limit = memory_limit
+        self.spill = None           # Temporary file of encoded records, oldest first
+        self.spilled = 0            # Number of records in the spill file
+
+    def add_transaction(self, transaction: Transaction):
+        """
+        Record a transaction, spilling the in‑memory records to disk once the budget is full.
+
+        :param transaction: The transaction to record.
+        """
+        self.transactions.append(transaction)
+        if len(self.transactions) >= self.memory_limit:
+            self._spill()
+
+    def get_transactions(self) -> list[Transaction]:
+        """
+        :return: Every recorded transaction in order, with spilled records decoded back into Transaction objects. This
+                 loads the whole log into memory; use iter_transactions() to stream it.
+        """
+        return list(self.iter_transactions())
+
+    def iter_transactions(self):
+        """
+        Yield every recorded transaction in order, decoding spilled records back into Transaction objects.
+        """
+        for record in self._spilled_records():
+            yield FileHandler.parse_transaction_line(record)
+        yield from self.transactions
+
+    def iter_records(self):
+        """
+        Yield every recorded transaction as a formatted record, streaming spilled records without decoding them.
+        """
+        yield from self._spilled_records()
+        yield from super().iter_records()
+
+    def handoff(self):
+        """
+        Move every recorded transaction, including the spill file, into a new log and leave this one empty.
+
+        :return: SpillingTransactionLog holding the records.
+        """
+        detached = SpillingTransactionLog(self.memory_limit)
+        detached.transactions, self.transactions = self.transactions, []
+        detached.spill, detached.spilled, self.spill, self.spilled = self.spill, self.spilled, None, 0
+        return detached
+
+    def clear(self):
+        """Discard every recorded transaction and the spill file."""
+        super().clear()
+        if self.spill:
+            self.spill.close()
+        self.spill, self.spilled = None, 0
+
+    def _spill(self):
+        """Append the in‑memory transactions to the spill file and release them."""
+        if self.spill is None:
+            import tempfile         # Only long sessions ever spill, so keep it off the startup path
+            self.spill = tempfile.TemporaryFile(mode='w+', prefix='txlog-')
+        self.spill.seek(0, 2)
+        self.spill.writelines(transaction.format() + '\n' for transaction in self.transactions)
+        self.spilled += len(self.transactions)
+        self.transactions.clear()
+
+    def _spilled_records(self):
+        """Yield the spilled records in order, without their newlines."""
+        if self.spill is None:
+            return
+        self.spill.flush()
+        self.spill.seek(0)
+        for line in self.spill:
+            yield line.rstrip('\n')
@@ -1,7 +1,5 @@
 from decimal import Decimal
 
-from FileHandler import FileHandler
-
 
 class Transaction:
     def __init__(self, transaction_code: str, holders_name: str, account_num: str, balance: Decimal, misc: str = ''):
@@ -12,6 +10,8 @@ class Transaction:
         self.misc = misc
 
     def format(self):
+        # Imported here so that Transaction has no import-time dependency on FileHandler (which imports Transaction)
+        from FileHandler import FileHandler
         return FileHandler.format_transaction(self)
 
     # def get_transaction_code(self):
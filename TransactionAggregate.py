@@ -0,0 +1,157 @@
+from decimal import Decimal
+
+from FileHandler import FileHandler
+
+
+class TransactionAggregate:
+    """
+    End-of-day rollups over daily transaction files: count and total amount per transaction code, per paybill company,
+    per account plan and per account holder. Records are streamed one at a time, so memory only grows with the number
+    of distinct keys, never with the number of records.
+
+    Aggregates are mergeable: partial aggregates built over separate files (for example in worker processes) can be
+    combined with merge() into the same result as a single pass over all of them.
+    """
+    ROLLUPS = ('code', 'company', 'plan', 'holder')
+
+    def __init__(self, plans: dict = None):
+        """
+        Initialize an empty aggregate.
+
+        :param plans: Mapping of account number to plan ('SP'/'NP') used for the per-plan rollup (Optional).
+        """
+        self.plans = plans or {}
+        self.records = 0
+        # rollup name -> key -> [count, total in cents]
+        self.totals = {rollup: {} for rollup in self.ROLLUPS}
+
+    @classmethod
+    def from_accounts(cls, account_manager):
+        """
+        Build an empty aggregate that looks up account plans in an AccountsManager.
+
+        :param account_manager: AccountsManager holding the current accounts.
+        :return: New TransactionAggregate.
+        """
+        return cls({number: account.plan for number, account in account_manager.accounts.items()})
+
+    def add_record(self, line: str):
+        """
+        Fold a single daily transaction record into the aggregate. End‑of‑session records (code 00) are skipped.
+
+        :param line: A record from the transaction file (with or without newline).
+        """
+        code = line[FileHandler.TRANSACTION_CODE]
+        if code == FileHandler.END_OF_SESSION or len(line) < FileHandler.TRANSACTION_AMOUNT.stop:
+            return
+        amount = line[FileHandler.TRANSACTION_AMOUNT]
+        cents = int(amount[0:5]) * 100 + int(amount[6:8])
+        account_number = line[FileHandler.TRANSACTION_ACCOUNT]
+
+        self.records += 1
+        self._add('code', code, cents)
+        self._add('holder', line[FileHandler.TRANSACTION_NAME].rstrip(' '), cents)
+        self._add('plan', self.plans.get(account_number, '??'), cents)
+        if code == '03':
+            self._add('company', line[FileHandler.TRANSACTION_MISC].upper(), cents)
+
+    def add_file(self, filename: str):
+        """
+        Stream every record of a daily transaction file into the aggregate.
+
+        :param filename: Path to the daily transaction file.
+        """
+        with open(filename, 'r') as file:
+            for line in file:
+                self.add_record(line)
+
+    def merge(self, other: 'TransactionAggregate'):
+        """
+        Combine another partial aggregate into this one.
+
+        :param other: TransactionAggregate built over a different set of records.
+        """
+        self.records += other.records
+        for rollup in self.ROLLUPS:
+            for key, (count, cents) in other.totals[rollup].items():
+                totals = self.totals[rollup].setdefault(key, [0, 0])
+                totals[0] += count
+                totals[1] += cents
+
+    def to_dict(self) -> dict:
+        """
+        :return: Plain-data form of the partial aggregate (safe to pickle or dump as JSON).
+        """
+        return {'records': self.records, 'totals': self.totals}
+
+    @classmethod
+    def from_dict(cls, data: dict, plans: dict = None):
+        """
+        Rebuild a partial aggregate from its plain-data form.
+
+        :param data: Output of to_dict().
+        :param plans: Mapping of account number to plan (Optional).
+        :return: New TransactionAggregate.
+        """
+        aggregate = cls(plans)
+        aggregate.records = data['records']
+        for rollup in cls.ROLLUPS:
+            aggregate.totals[rollup] = {key: list(value) for key, value in data['totals'].get(rollup, {}).items()}
+        return aggregate
+
+    @classmethod
+    def aggregate_files(cls, filenames: list[str], plans: dict = None, workers: int = None):
+        """
+        Aggregate many daily transaction files in parallel, one file per task, and merge the partial results.
+
+        :param filenames: Paths to daily transaction files.
+        :param plans: Mapping of account number to plan (Optional).
+        :param workers: Number of worker processes (defaults to the CPU count). 1 aggregates in this process.
+        :return: TransactionAggregate over all of the files.
+        """
+        result = cls(plans)
+        if workers == 1 or len(filenames) <= 1:
+            for filename in filenames:
+                result.add_file(filename)
+            return result
+
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(plans,)) as pool:
+            for partial in pool.map(_aggregate_file, filenames):
+                result.merge(cls.from_dict(partial))
+        return result
+
+    def report(self) -> dict:
+        """
+        :return: Rollups as {rollup: {key: (count, total)}} with totals as Decimal dollars.
+        """
+        return {
+            rollup: {key: (count, Decimal(cents) / 100) for key, (count, cents) in sorted(totals.items())}
+            for rollup, totals in self.totals.items()
+        }
+
+    def _add(self, rollup: str, key: str, cents: int):
+        """Add one record to a rollup bucket."""
+        totals = self.totals[rollup].get(key)
+        if totals is None:
+            self.totals[rollup][key] = [1, cents]
+        else:
+            totals[0] += 1
+            totals[1] += cents
+
+
+# Account plans shared by every file aggregated in a worker process
+_worker_plans = None
+
+
+def _init_worker(plans: dict):
+    """Store the account plans once per worker process instead of once per file."""
+    global _worker_plans
+    _worker_plans = plans
+
+
+def _aggregate_file(filename: str) -> dict:
+    """Aggregate a single file in a worker process and return the partial result."""
+    aggregate = TransactionAggregate(_worker_plans)
+    aggregate.add_file(filename)
+    return aggregate.to_dict()
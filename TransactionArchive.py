@@ -0,0 +1,185 @@
+import gzip
+import json
+import lzma
+import os
+import struct
+
+
+class TransactionArchive:
+    """
+    Compressed archive segment holding one or more closed daily transaction files. Records are grouped into blocks
+    that are compressed independently, and a block index is stored at the end of the segment so a reader only has to
+    decompress the blocks that cover the records it asks for.
+
+    Segment layout:
+        MAGIC, codec byte
+        compressed blocks, back to back
+        block index (JSON)
+        footer: index offset (8 bytes), index length (4 bytes), MAGIC
+    """
+    MAGIC = b'TXARC1'
+    FOOTER = struct.Struct('>QI')
+    BLOCK_RECORDS = 4096
+
+    # Codec byte stored in the header mapped to (name, compress, decompress)
+    CODECS = {
+        b'g': ('gzip', lambda data: gzip.compress(data, mtime=0), gzip.decompress),
+        b'x': ('lzma', lzma.compress, lzma.decompress),
+    }
+
+    def __init__(self, filename: str):
+        """
+        Open an existing archive segment and read its block index.
+
+        :param filename: Path to the segment file.
+        """
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            header = f.read(len(self.MAGIC) + 1)
+            if header[:len(self.MAGIC)] != self.MAGIC or header[-1:] not in self.CODECS:
+                raise ValueError(f"'{filename}' is not a transaction archive segment")
+            self.codec = self.CODECS[header[-1:]][0]
+            self._decompress = self.CODECS[header[-1:]][2]
+
+            f.seek(-(self.FOOTER.size + len(self.MAGIC)), os.SEEK_END)
+            footer = f.read()
+            if footer[self.FOOTER.size:] != self.MAGIC:
+                raise ValueError(f"archive segment '{filename}' is truncated")
+            index_offset, index_length = self.FOOTER.unpack(footer[:self.FOOTER.size])
+            f.seek(index_offset)
+            self.blocks = json.loads(f.read(index_length).decode('utf-8'))
+
+    @classmethod
+    def roll(cls, segment_path: str, daily_files: list[str], codec: str = 'gzip',
+             block_records: int = BLOCK_RECORDS):
+        """
+        Roll closed daily transaction files into a new compressed segment. The segment is written to a temporary file
+        and moved into place once complete, so a crash never leaves a half-written segment behind.
+
+        :param segment_path: Path of the segment to create.
+        :param daily_files: Daily transaction files to archive, in order. Each is stored under its base name.
+        :param codec: 'gzip' or 'lzma'.
+        :param block_records: Number of records per compressed block.
+        :return: TransactionArchive opened on the new segment.
+        """
+        codec_byte = next((key for key, value in cls.CODECS.items() if value[0] == codec), None)
+        if codec_byte is None:
+            raise ValueError(f"unknown codec '{codec}'")
+        if block_records <= 0:
+            raise ValueError("block_records must be positive")
+        compress = cls.CODECS[codec_byte][1]
+
+        sources = [os.path.basename(path) for path in daily_files]
+        if len(set(sources)) != len(sources):
+            raise ValueError("daily files must have distinct names")
+
+        blocks = []
+        tmp_path = segment_path + '.tmp'
+        with open(tmp_path, 'wb') as out:
+            out.write(cls.MAGIC + codec_byte)
+            for path, source in zip(daily_files, sources):
+                with open(path, 'rb') as f:
+                    lines = f.read().splitlines(keepends=True)
+                # Empty files still get one (empty) block so they remain listed in the index
+                for first in range(0, max(len(lines), 1), block_records):
+                    raw = b''.join(lines[first:first + block_records])
+                    data = compress(raw)
+                    blocks.append({
+                        'source': source,
+                        'first': first,
+                        'count': min(block_records, len(lines) - first),
+                        'offset': out.tell(),
+                        'length': len(data),
+                        'raw': len(raw),
+                    })
+                    out.write(data)
+
+            index = json.dumps(blocks, separators=(',', ':')).encode('utf-8')
+            index_offset = out.tell()
+            out.write(index)
+            out.write(cls.FOOTER.pack(index_offset, len(index)) + cls.MAGIC)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, segment_path)
+        return cls(segment_path)
+
+    def sources(self) -> list[str]:
+        """
+        :return: Names of the daily files stored in this segment, in archive order.
+        """
+        return list(dict.fromkeys(block['source'] for block in self.blocks))
+
+    def record_count(self, source: str) -> int:
+        """
+        :param source: Name of an archived daily file.
+        :return: Number of records stored for that file.
+        """
+        return sum(block['count'] for block in self.blocks if block['source'] == source)
+
+    def iter_records(self, source: str, start: int = 0, stop: int = None):
+        """
+        Yield the records of one archived daily file, without their line endings. Only the blocks overlapping
+        [start, stop) are read and decompressed.
+
+        :param source: Name of an archived daily file.
+        :param start: Index of the first record to return.
+        :param stop: Index one past the last record to return (None for the end of the file).
+        """
+        for block, lines in self._iter_blocks(source, start, stop):
+            for i, line in enumerate(lines, block['first']):
+                if i < start:
+                    continue
+                if stop is not None and i >= stop:
+                    return
+                yield line.rstrip(b'\r\n').decode('utf-8')
+
+    def read_record(self, source: str, number: int) -> str:
+        """
+        Read a single record, decompressing only the block that contains it.
+
+        :param source: Name of an archived daily file.
+        :param number: Zero-based record index within the file.
+        :return: The record without its line ending.
+        """
+        for record in self.iter_records(source, number, number + 1):
+            return record
+        raise IndexError(f"record {number} not in '{source}'")
+
+    def read_source(self, source: str) -> bytes:
+        """
+        Reconstruct an archived daily file byte for byte.
+
+        :param source: Name of an archived daily file.
+        :return: Original file contents.
+        """
+        return b''.join(b''.join(lines) for _, lines in self._iter_blocks(source, 0, None))
+
+    def extract(self, source: str, filename: str):
+        """
+        Write an archived daily file back out to disk.
+
+        :param source: Name of an archived daily file.
+        :param filename: Path to write the original contents to.
+        """
+        with open(filename, 'wb') as f:
+            f.write(self.read_source(source))
+
+    def _iter_blocks(self, source: str, start: int, stop):
+        """
+        Yield (block, lines) for each block of `source` overlapping the record range [start, stop).
+        """
+        found = False
+        with open(self.filename, 'rb') as f:
+            for block in self.blocks:
+                if block['source'] != source:
+                    continue
+                found = True
+                if block['first'] + block['count'] <= start:
+                    continue
+                if stop is not None and block['first'] >= stop:
+                    break
+                f.seek(block['offset'])
+                raw = self._decompress(f.read(block['length']))
+                yield block, raw.splitlines(keepends=True)
+        if not found:
+            raise KeyError(f"'{source}' is not in archive '{self.filename}'")
@@ -0,0 +1,172 @@
+import datetime
+import os
+from bisect import bisect_left, bisect_right, insort
+
+from FileHandler import FileHandler
+
+
+class TransactionIndex:
+    """
+    Index from account number to the daily transaction records that touch it. Each posting is a (date, file, offset)
+    tuple, kept sorted per account so that a query by account and date range only costs as much as the matching
+    records.
+
+    The index is persisted as an append-only log of lines:
+        F <date> <file>         start of the postings for a (re)indexed daily file
+        A <date> <file>         more postings for a file already indexed, from records appended to it
+        P <account> <offset>    one posting in the most recent file
+    Postings point straight into the daily files, so nothing is copied. Re-indexing a file that was rewritten replaces
+    its earlier postings, since its old records are gone; sessions appended to a file (as TransactionServer writes
+    them) each add their own postings and keep the earlier ones.
+    """
+    def __init__(self, index_file: str):
+        """
+        Open (or start) the index stored in the given log file.
+
+        :param index_file: Path to the index log.
+        """
+        self.index_file = index_file
+        self.postings = {}          # account number -> sorted list of (date, file, offset)
+        self.file_accounts = {}     # daily file -> set of account numbers it has postings for
+        self.file_dates = {}        # daily file -> date it was last indexed under
+        if os.path.exists(index_file):
+            self._load()
+
+    def attach(self):
+        """Index every daily transaction file as soon as FileHandler.write_file closes it."""
+        if self.add_written_file not in FileHandler.write_listeners:
+            FileHandler.write_listeners.append(self.add_written_file)
+
+    def detach(self):
+        """Stop indexing files written by FileHandler.write_file."""
+        if self.add_written_file in FileHandler.write_listeners:
+            FileHandler.write_listeners.remove(self.add_written_file)
+
+    def add_written_file(self, filename: str, start: int = 0):
+        """
+        Index the records just written to a daily transaction file. A session appended to a file already in the index
+        only adds the postings of its own records; a file written from the start is indexed afresh.
+
+        :param filename: Path to the daily transaction file.
+        :param start: Byte offset the records just written begin at.
+        """
+        self._index(filename, None, start if os.path.abspath(filename) in self.file_accounts else 0)
+
+    def add_file(self, filename: str, date: datetime.date = None):
+        """
+        Index a closed daily transaction file and append its postings to the index log, replacing any earlier postings
+        for the file.
+
+        :param filename: Path to the daily transaction file.
+        :param date: Business date of the file. Defaults to the date the file was last modified.
+        """
+        self._index(filename, date, 0)
+
+    def _index(self, filename: str, date: datetime.date, start: int):
+        """
+        Index the records of a daily transaction file from a byte offset on, and append the postings to the index log.
+
+        :param filename: Path to the daily transaction file.
+        :param date: Business date of the records (None for the date the file was last modified).
+        :param start: Offset to index from. 0 replaces the file's earlier postings; any other offset adds to them.
+        """
+        if date is None:
+            date = datetime.date.fromtimestamp(os.stat(filename).st_mtime)
+        day = date.isoformat()
+        path = os.path.abspath(filename)
+
+        found = []
+        offset = start
+        code, account = FileHandler.TRANSACTION_CODE, FileHandler.TRANSACTION_ACCOUNT
+        end_of_session = FileHandler.END_OF_SESSION.encode('ascii')
+        with open(path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                if line[code] != end_of_session and len(line) >= account.stop:
+                    found.append((line[account].decode('ascii'), offset))
+                offset += len(line)
+
+        with open(self.index_file, 'a') as log:
+            log.write(f"{'A' if start else 'F'} {day} {path}\n")
+            log.writelines(f"P {account} {posting}\n" for account, posting in found)
+
+        if start:
+            self._continue_file(day, path)
+        else:
+            self._start_file(day, path)
+        for account, posting in found:
+            self._add_posting(account, day, path, posting)
+
+    def lookup(self, account_number: str, start: datetime.date = None, end: datetime.date = None) -> list:
+        """
+        Find the postings for an account within a date range.
+
+        :param account_number: 5‑digit account number (zero‑padded).
+        :param start: First date to include (None for no lower bound).
+        :param end: Last date to include (None for no upper bound).
+        :return: List of (date, file, offset) tuples in date order.
+        """
+        postings = self.postings.get(account_number, [])
+        low = bisect_left(postings, (start.isoformat(),)) if start else 0
+        high = bisect_right(postings, (end.isoformat(), chr(0x10FFFF))) if end else len(postings)
+        return postings[low:high]
+
+    def records(self, account_number: str, start: datetime.date = None, end: datetime.date = None):
+        """
+        Yield the Transaction records for an account within a date range, reading only the matching records.
+
+        :param account_number: 5‑digit account number (zero‑padded).
+        :param start: First date to include (None for no lower bound).
+        :param end: Last date to include (None for no upper bound).
+        """
+        current_name, current = None, None
+        try:
+            for _, filename, offset in self.lookup(account_number, start, end):
+                if filename != current_name:
+                    if current:
+                        current.close()
+                    current_name, current = filename, open(filename, 'rb')
+                current.seek(offset)
+                yield FileHandler.parse_transaction_line(current.readline().decode('utf-8').rstrip('\r\n'))
+        finally:
+            if current:
+                current.close()
+
+    def _load(self):
+        """Rebuild the in-memory postings from the index log."""
+        day = path = None
+        with open(self.index_file, 'r') as log:
+            for line in log:
+                kind, first, rest = line.rstrip('\n').split(' ', 2)
+                if kind == 'F':
+                    day, path = first, rest
+                    self._start_file(day, path)
+                elif kind == 'A':
+                    day, path = first, rest
+                    self._continue_file(day, path)
+                elif kind == 'P':
+                    self._add_posting(first, day, path, int(rest))
+
+    def _start_file(self, day: str, path: str):
+        """Drop any postings left over from an earlier version of the file."""
+        for account in self.file_accounts.pop(path, ()):
+            self.postings[account] = [posting for posting in self.postings[account] if posting[1] != path]
+            if not self.postings[account]:
+                del self.postings[account]
+        self.file_accounts[path] = set()
+        self.file_dates[path] = day
+
+    def _continue_file(self, day: str, path: str):
+        """Keep the postings of a file that more records were appended to."""
+        self.file_accounts.setdefault(path, set())
+        self.file_dates[path] = day
+
+    def _add_posting(self, account: str, day: str, path: str, offset: int):
+        """Insert a posting, keeping the account's postings sorted."""
+        postings = self.postings.setdefault(account, [])
+        posting = (day, path, offset)
+        if not postings or postings[-1] <= posting:
+            postings.append(posting)
+        else:
+            insort(postings, posting)
+        self.file_accounts[path].add(account)
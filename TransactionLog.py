@@ -8,11 +8,24 @@ class TransactionLog:
     def add_transaction(self, transaction: Transaction):
         self.transactions.append(transaction)
 
+    def add_transactions(self, transactions: list[Transaction]):
+        for transaction in transactions:
+            self.add_transaction(transaction)
+
     def get_transactions(self):
         return self.transactions
 
+    def iter_records(self):
+        for transaction in self.transactions:
+            yield transaction.format()
+
     def write_session_file(self, filename: str):
         FileHandler.write_file(filename, self)
 
+    def handoff(self):
+        detached = TransactionLog()
+        detached.transactions, self.transactions = self.transactions, []
+        return detached
+
     def clear(self):
         self.transactions.clear()
\ No newline at end of file
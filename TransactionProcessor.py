@@ -1,29 +1,50 @@
+import contextlib
+import functools
 from decimal import Decimal
 
 from AccountsManager import AccountsManager
 from BankAccount import BankAccount
+from Ledger import Ledger
 from Session import Session
 from Transaction import Transaction
 from TransactionLog import TransactionLog
 from UserInterface import UserInterface
 
 
+def _exclusive(method):
+    """
+    Run a transaction while holding the account manager's lock, so that its validation, execution and ledger posting
+    form one step that no other session sharing the accounts (see AccountRegistry) can interleave with. A manager
+    with batch() (SQLiteAccountsManager) also runs it as one database transaction, so other processes can neither
+    change the balances it validated nor see half of a transfer.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        manager = self.account_manager
+        with manager.lock, (manager.batch() if hasattr(manager, 'batch') else contextlib.nullcontext()):
+            return method(self, *args, **kwargs)
+    return locked
+
+
 class TransactionProcessor:
     """
     Handles the validation and execution of all banking transactions. Interacts with AccountsManager to modify account
     data, update the session sending and receiving limits, and records successful transactions in TransactionLog object.
     """
-    def __init__(self, account_manager: AccountsManager, session: Session, trans_log: TransactionLog):
+    def __init__(self, account_manager: AccountsManager, session: Session, trans_log: TransactionLog,
+                 ledger: Ledger = None):
         """
         Initializes the processor with required dependencies
 
         :param account_manager: AccountsManager object (account storage and operations)
         :param session: Session object (Tracks login states like mode and cumulative limits)
         :param trans_log: TransactionLog object (For saving daily transaction records
+        :param ledger: Ledger object (Running totals of money moved, for conservation checks) (Optional)
         """
         self.account_manager = account_manager
         self.session = session
         self.trans_log = trans_log
+        self.ledger = ledger
 
     def validate_transaction(self, account:BankAccount, transaction_type: str, amount: Decimal = None) -> bool:
         """
@@ -33,7 +54,8 @@ class TransactionProcessor:
           - For withdrawal, transfer, paybill: sufficient funds and session limit.
 
         :param account: The account involved in the transaction.
-        :param transaction_type: Type of transaction (e.g., 'paybill' or 'withdrawal').
+        :param transaction_type: Type of transaction, lowercase (e.g., 'paybill' or 'withdrawal'; 'transfer_in' for the
+                                 receiving account of a transfer, which needs no funds).
         :param amount: Required for balance‑affecting transactions (optional)
 
         :return: True if all checks pass, False otherwise.
@@ -71,6 +93,7 @@ class TransactionProcessor:
         """
         return self.account_manager.find_account(account_number)
 
+    @_exclusive
     def withdrawal(self, account_number: str, amount: Decimal) -> bool:
         """
         Process a withdrawal transaction.
@@ -81,12 +104,13 @@ class TransactionProcessor:
         """
         # Finding account and validating
         account = self.find_current_user(account_number)
-        if not self.validate_transaction(account, 'Withdrawal', amount):
+        if not self.validate_transaction(account, 'withdrawal', amount):
             return False
 
         # Execute withdrawal
         self.account_manager.debit(account, amount)
         self.session.session_limit('withdrawal', amount)
+        self._post('withdrawal', amount)
 
         # Log the transaction
         trans_line = Transaction('01', account.holder_name, account_number,amount, '')
@@ -97,6 +121,7 @@ class TransactionProcessor:
 
         return True
 
+    @_exclusive
     def transfer(self, from_account_num: str, to_account_num: str, amount: Decimal) -> bool:
         """
         Process a transfer between two accounts.
@@ -109,18 +134,20 @@ class TransactionProcessor:
         """
         # Finding source account and validating
         from_account = self.find_current_user(from_account_num)
-        if not self.validate_transaction(from_account, 'Transfer', amount):
+        if not self.validate_transaction(from_account, 'transfer', amount):
             return False
 
         # Finding destination account and validating
         to_account = self.find_current_user(to_account_num)
-        if not self.validate_transaction(to_account, 'Transfer', amount):
+        if not self.validate_transaction(to_account, 'transfer_in'):
             return False
 
         # Execute Transfer
         self.account_manager.debit(from_account, amount)
         self.account_manager.credit(to_account, amount)
         self.session.session_limit('transfer', amount)
+        if self.ledger:
+            self.ledger.post_transfer(amount)
 
         # Log the transaction
         trans_line = Transaction('02', from_account.holder_name, from_account_num,amount, '')
@@ -131,6 +158,7 @@ class TransactionProcessor:
 
         return True
 
+    @_exclusive
     def paybill(self, account_number: str, company: str, amount: Decimal) -> bool:
         """
         Process a bill payment to an approved company.
@@ -144,12 +172,13 @@ class TransactionProcessor:
 
         # Finding account and validating
         account = self.find_current_user(account_number)
-        if not self.validate_transaction(account, 'PayBill', amount):
+        if not self.validate_transaction(account, 'paybill', amount):
             return False
 
         # Execute paybill
         self.account_manager.debit(account, amount)
         self.session.session_limit('paybill', amount)
+        self._post('paybill', amount, company)
 
         # Log the transaction
         trans_line = Transaction('03', account.holder_name, account_number,amount, company)
@@ -160,6 +189,7 @@ class TransactionProcessor:
 
         return True
 
+    @_exclusive
     def deposit(self, account_number: str, amount: Decimal) -> bool:
         """
         Process a deposit. According to requirements, deposit does **not** update the account balance immediately; it
@@ -172,11 +202,12 @@ class TransactionProcessor:
 
         # Finding account and validating
         account = self.find_current_user(account_number)
-        if not self.validate_transaction(account, 'Deposit', amount):
+        if not self.validate_transaction(account, 'deposit', amount):
             return False
 
         # Execute deposit
         self.account_manager.credit(account, amount)
+        self._post('deposit', amount)
 
         # Log the transaction
         trans_line = Transaction('04', account.holder_name, account_number,amount, '')
@@ -187,6 +218,7 @@ class TransactionProcessor:
 
         return True
 
+    @_exclusive
     def create(self, name: str, initial_balance: Decimal):
         """
         Process account creation (admin only). Does **not** add the account to the in‑memory repository; only logs a
@@ -209,6 +241,7 @@ class TransactionProcessor:
 
         return new_account_num
 
+    @_exclusive
     def delete(self, name: str, account_number: str) -> bool:
         """
         Process account deletion (admin only). Removes the account from the in‑memory repository and logs a
@@ -221,21 +254,23 @@ class TransactionProcessor:
 
         # Finding account and validating
         account = self.find_current_user(account_number)
-        if not self.validate_transaction(account, 'Delete', None):
+        if not self.validate_transaction(account, 'delete', None):
             return False
 
         # Execute
         self.account_manager.delete(account_number)
+        self._post('delete', account.balance)
 
         # Log the transaction
         trans_line = Transaction('06', name, account_number, Decimal('0.00'), '')
         self.trans_log.add_transaction(trans_line)
 
         # Display Success
-        UserInterface.display_success(f"Delete of ${name:.2f} successful")
+        UserInterface.display_success(f"Delete of {name} successful")
 
         return True
 
+    @_exclusive
     def disable(self, name: str, account_number: str) -> bool:
         """
         Process account disable (admin only). Sets account status to 'D' and logs
@@ -248,7 +283,7 @@ class TransactionProcessor:
 
         # Finding account and validating
         account = self.account_manager.find_account(account_number)
-        if not self.validate_transaction(account, 'Disable', None):
+        if not self.validate_transaction(account, 'disable', None):
             return False
 
         # Execute
@@ -263,6 +298,7 @@ class TransactionProcessor:
 
         return True
 
+    @_exclusive
     def change_plan(self, account_number: str,):
         """
         Process changeplan transaction (admin only). Changes the account plan from student ('SP') to non‑student
@@ -274,7 +310,7 @@ class TransactionProcessor:
 
         # Finding account and validating
         account = self.find_current_user(account_number)
-        if not self.validate_transaction(account, 'ChangePlan', Decimal('0.00')):
+        if not self.validate_transaction(account, 'changeplan', Decimal('0.00')):
             return False
         if not account.is_student():
             UserInterface.display_error(f"Account {account.holder_name} account is already on non-student account plan")
@@ -292,6 +328,69 @@ class TransactionProcessor:
 
         return True
 
+    @_exclusive
+    def bulk_disable(self, account_numbers) -> int:
+        """
+        Disable many accounts in one batch (admin only), e.g. the numbers from AccountsManager.select(). Accounts that
+        do not exist or are already disabled are skipped. One 'disable' transaction is logged per disabled account, and
+        all of them are added to the log together.
+
+        :param account_numbers: Iterable of account numbers to disable.
+        :return: Number of accounts disabled.
+        """
+        if not self.session.is_admin():
+            UserInterface.display_error("Bulk disable requires an admin session")
+            return 0
+
+        # Execute and log
+        changed = self.account_manager.disable_accounts(account_numbers)
+        self.trans_log.add_transactions([Transaction('07', account.holder_name, account.account_number,
+                                                     Decimal('0.00'), '') for account in changed])
+
+        # Display Success
+        UserInterface.display_success(f"Disabled {len(changed)} accounts")
+
+        return len(changed)
+
+    @_exclusive
+    def bulk_change_plan(self, account_numbers) -> int:
+        """
+        Change many accounts to the non‑student plan in one batch (admin only). Accounts that do not exist, are disabled
+        or are already non‑student are skipped. One 'changeplan' transaction is logged per changed account, and all of
+        them are added to the log together.
+
+        :param account_numbers: Iterable of account numbers to modify.
+        :return: Number of accounts changed.
+        """
+        if not self.session.is_admin():
+            UserInterface.display_error("Bulk change plan requires an admin session")
+            return 0
+
+        # Disabled accounts cannot change plan (same rule as change_plan)
+        active = [number for number in account_numbers
+                  if (account := self.account_manager.find_account(number)) and account.is_active()]
+
+        # Execute and log
+        changed = self.account_manager.change_plans(active)
+        self.trans_log.add_transactions([Transaction('08', account.holder_name, account.account_number,
+                                                     Decimal('0.00'), '') for account in changed])
+
+        # Display Success
+        UserInterface.display_success(f"Changed {len(changed)} accounts to the non-student plan")
+
+        return len(changed)
+
+    def _post(self, flow: str, amount: Decimal, company: str = None):
+        """
+        Record a flow of money in the ledger, if one is attached.
+
+        :param flow: Ledger flow name (e.g. 'withdrawal').
+        :param amount: Amount moved.
+        :param company: Company code for paybill flows (Optional).
+        """
+        if self.ledger:
+            self.ledger.post(flow, amount, company)
+
     @staticmethod
     def _sufficient_funds(account:BankAccount, amount: Decimal) -> bool:
         """
@@ -0,0 +1,261 @@
+import os
+import re
+import socket
+import socketserver
+import sys
+from decimal import Decimal
+
+from AccountRegistry import AccountRegistry
+from AdmissionController import AdmissionController
+from BankingSystem import BankingSystem
+from CommandPipeline import CommandPipeline
+from SessionFileWriter import SessionFileWriter
+from UserInterface import UserInterface
+
+
+class TransactionServer:
+    """
+    Line protocol front end for scripted and remote clients. A client sends complete operations, one per line, and
+    may pipeline as many as it likes without waiting: every line gets exactly one response line, in order, and all
+    the responses to a batch of received lines go back in a single write.
+
+    Requests (account numbers of up to 5 digits, amounts as 123 or 123.45, names last since they may contain spaces):
+        login admin                     login standard NAME         logout
+        withdrawal ACCOUNT AMOUNT       transfer FROM TO AMOUNT     paybill ACCOUNT COMPANY AMOUNT
+        deposit ACCOUNT AMOUNT          create AMOUNT NAME          delete ACCOUNT NAME
+        disable ACCOUNT NAME            changeplan ACCOUNT
+    Responses:
+        OK <message>                    ERR <message>
+
+    Each connection is its own BankingSystem session attached to one shared AccountRegistry, and commands run through
+    the same CommandPipeline stages (authorization, reload checks, ledger verification) as the interactive front end,
+    mapped straight onto the TransactionProcessor methods. Requests from every connection go through one
+    AdmissionController, which bounds how many run at once and takes the sessions in turn; a request that finds no
+    room in its queue is answered "ERR server busy". At logout each session is appended to the daily transaction file
+    by one SessionFileWriter owned by the server, so concurrent sessions never overwrite each other's records.
+    """
+    AMOUNT = re.compile(r'\d{1,5}(\.\d{1,2})?')
+    ACCOUNT = re.compile(r'\d{1,5}')
+    COMPANIES = {'EC', 'CQ', 'FI'}
+
+    def __init__(self, system: BankingSystem):
+        """
+        :param system: The BankingSystem serving this connection.
+        """
+        self.system = system
+        self.pipelines = {}         # Session mode -> CommandPipeline over the protocol handlers
+
+    def execute(self, line: str) -> str:
+        """
+        Run one request line.
+
+        :param line: The request, without its newline.
+        :return: The response line, without its newline.
+        """
+        messages = UserInterface.messages.sink = []
+        try:
+            result = self._execute(line.split())
+        except ValueError as e:
+            return f"ERR {e}"
+        finally:
+            UserInterface.messages.sink = None
+
+        errors = [msg for kind, msg in messages if kind == 'ERR']
+        if errors or result is False or result is None:
+            return f"ERR {errors[-1] if errors else 'request failed'}"
+        if result is not True:
+            return f"OK {result}"
+        return f"OK {messages[-1][1] if messages else 'done'}"
+
+    def _execute(self, words: list[str]):
+        """Parse and run a request. :return: The handler's result (False on failure)."""
+        if not words:
+            raise ValueError("empty request")
+        command, args = words[0].lower(), words[1:]
+        system = self.system
+
+        if command == 'login':
+            if system.session.is_logged_in():
+                raise ValueError("already logged in")
+            if args[:1] == ['admin'] and len(args) == 1:
+                return system.login('admin')
+            if args[:1] == ['standard'] and len(args) > 1:
+                return system.login('standard', self._name(args[1:]))
+            raise ValueError("usage: login admin | login standard NAME")
+        if not system.session.is_logged_in():
+            raise ValueError("not logged in")
+        if command == 'logout':
+            system._process_logout()
+            return True
+
+        mode = system.session.get_mode()
+        if mode not in self.pipelines:
+            self.pipelines[mode] = CommandPipeline(system, mode, system.PIPELINE_STAGES, self.handlers())
+        return self.pipelines[mode].dispatch(command, *self._parse(command, args))
+
+    def handlers(self) -> dict:
+        """
+        :return: Command -> callable taking the parsed request arguments, for CommandPipeline.
+        """
+        processor = self.system.transaction_processor
+        return {
+            'withdrawal': processor.withdrawal,
+            'transfer': processor.transfer,
+            'paybill': processor.paybill,
+            'deposit': processor.deposit,
+            'create': lambda amount, name: processor.create(name, amount),
+            'delete': lambda account, name: processor.delete(name, account),
+            'disable': lambda account, name: processor.disable(name, account),
+            'changeplan': processor.change_plan,
+        }
+
+    def _parse(self, command: str, args: list[str]) -> tuple:
+        """Validate a request's arguments and convert them for its handler."""
+        if command in ('withdrawal', 'deposit') and len(args) == 2:
+            return self._account(args[0]), self._amount(args[1])
+        if command == 'transfer' and len(args) == 3:
+            return self._account(args[0]), self._account(args[1]), self._amount(args[2])
+        if command == 'paybill' and len(args) == 3:
+            company = args[1].upper()
+            if company not in self.COMPANIES:
+                raise ValueError("company code must be one of 'EC', 'CQ', 'FI'")
+            return self._account(args[0]), company, self._amount(args[2])
+        if command == 'create' and len(args) >= 2:
+            return self._amount(args[0]), self._name(args[1:])
+        if command in ('delete', 'disable') and len(args) >= 2:
+            return self._account(args[0]), self._name(args[1:])
+        if command == 'changeplan' and len(args) == 1:
+            return self._account(args[0]),
+        if command in BankingSystem.COMMAND_HANDLERS:
+            raise ValueError(f"wrong number of arguments for {command}")
+        raise ValueError(f"unknown command '{command}'")
+
+    def _account(self, text: str) -> str:
+        """Validate an account number and zero-pad it."""
+        if not self.ACCOUNT.fullmatch(text):
+            raise ValueError(f"invalid account number '{text}'")
+        return text.zfill(5)
+
+    def _amount(self, text: str) -> Decimal:
+        """Validate an amount."""
+        if not self.AMOUNT.fullmatch(text):
+            raise ValueError(f"invalid amount '{text}'")
+        return Decimal(text)
+
+    @staticmethod
+    def _name(words: list[str]) -> str:
+        """Join and validate a holder name (lowercased, like the interactive prompt)."""
+        name = ' '.join(words).lower()
+        if not 0 < len(name) <= 20:
+            raise ValueError("account name must be between 1-20 characters long")
+        return name
+
+
+class _Connection(socketserver.BaseRequestHandler):
+    """
+    Serve one client connection: read whatever lines have arrived, run them one by one through the server's
+    AdmissionController, answer them all in one write, repeat.
+    """
+    WAIT = 5.0      # Seconds a request may wait for room in the admission queue before it is turned away
+
+    def handle(self):
+        system = BankingSystem(AccountRegistry.attach(self.server.accounts_file), writer=self.server.writer)
+        server = TransactionServer(system)
+        pending = b''
+        try:
+            while True:
+                data = self.request.recv(65536)
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b'\n')
+                if lines:
+                    replies = [self._admit(system, server, line.decode('utf-8', 'replace').rstrip('\r'))
+                               for line in lines]
+                    self.request.sendall(('\n'.join(replies) + '\n').encode())
+        finally:
+            if system.session.is_logged_in():
+                system._process_logout()
+            system.close()
+
+    def _admit(self, system: BankingSystem, server: TransactionServer, line: str) -> str:
+        """Run one request line through the admission controller and return its response line."""
+        future = self.server.admission.submit(system.session, server.execute, line, wait=self.WAIT)
+        return future.result() if future else "ERR server busy"
+
+
+def create_server(address: str, accounts_file: str = "current_bank_accounts.txt", concurrency: int = 4):
+    """
+    Create the protocol server without starting it. Its serve_forever() runs it; once it has stopped, close it, its
+    admission controller and its session file writer (server.admission.close(), server.writer.close()).
+
+    :param address: HOST:PORT for TCP, otherwise the path of a Unix domain socket.
+    :param accounts_file: Path to the current bank accounts file shared by every connection.
+    :param concurrency: Number of requests run at the same time across all connections.
+    :return: The socketserver server.
+    """
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        server = socketserver.ThreadingTCPServer((host, int(port)), _Connection)
+    else:
+        if os.path.exists(address):
+            os.remove(address)
+        server = socketserver.ThreadingUnixStreamServer(address, _Connection)
+    server.daemon_threads = True
+    server.accounts_file = accounts_file
+    server.admission = AdmissionController(concurrency)
+    server.writer = SessionFileWriter(append=True)
+    return server
+
+
+def serve(address: str, accounts_file: str = "current_bank_accounts.txt"):
+    """
+    Serve the protocol until interrupted.
+
+    :param address: HOST:PORT for TCP, otherwise the path of a Unix domain socket.
+    :param accounts_file: Path to the current bank accounts file shared by every connection.
+    """
+    with create_server(address, accounts_file) as server:
+        try:
+            server.serve_forever()
+        finally:
+            server.admission.close()
+            server.writer.close()
+
+
+def connect(address: str) -> socket.socket:
+    """
+    :param address: HOST:PORT for TCP, otherwise the path of a Unix domain socket.
+    :return: A connected socket.
+    """
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        return socket.create_connection((host, int(port)))
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(address)
+    return client
+
+
+def main():
+    """
+    TransactionServer.py serve ADDRESS [ACCOUNTS_FILE]  - serve the protocol on ADDRESS
+    TransactionServer.py send ADDRESS < REQUESTS        - pipeline every request line from stdin, print the responses
+    ADDRESS is HOST:PORT for TCP, otherwise the path of a Unix domain socket.
+    """
+    if len(sys.argv) < 3 or sys.argv[1] not in ('serve', 'send'):
+        print("usage: TransactionServer.py serve ADDRESS [ACCOUNTS_FILE] | send ADDRESS < REQUESTS", file=sys.stderr)
+        sys.exit(2)
+    if sys.argv[1] == 'serve':
+        serve(sys.argv[2], *sys.argv[3:4])
+        return
+
+    requests = [line.rstrip('\n') for line in sys.stdin if line.strip()]
+    with connect(sys.argv[2]) as client:
+        client.sendall(''.join(request + '\n' for request in requests).encode())
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('r') as responses:
+            for response in responses:
+                sys.stdout.write(response)
+
+
+if __name__ == "__main__":
+    main()
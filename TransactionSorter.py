@@ -0,0 +1,156 @@
+import heapq
+import os
+import sys
+import tempfile
+
+from FileHandler import FileHandler
+
+
+class TransactionSorter:
+    """
+    External merge sort of daily transaction records by (account number, sequence), where the sequence is a record's
+    position in the input. Records are read in runs that fit the memory budget, each run is sorted and spilled to a
+    temporary file, and the runs are combined with a k-way heap merge. Records of the same account therefore come out
+    grouped and in their original order, however large the input.
+
+    The merge reads at most `max_fan_in` run files at once. When there are more runs than that, groups of them are
+    first merged into longer runs, pass after pass, so the number of open files stays bounded however many runs the
+    input produces.
+    """
+    # Memory one record takes while it is held in a run: the (account, sequence, record) tuple, the three objects in
+    # it, the run list's pointer to it and up to half a pointer of merge buffer while the run is sorted
+    ENTRY_BYTES = (sys.getsizeof(('00000', 10 ** 6, '')) + sys.getsizeof('00000') + sys.getsizeof(10 ** 6)
+                   + sys.getsizeof('x' * FileHandler.TRANSACTION_RECORD_LENGTH) + 12)
+
+    def __init__(self, memory_budget: int = 64 * 1024 * 1024, workers: int = 1, temp_dir: str = None,
+                 skip_end_of_session: bool = True, max_fan_in: int = 64):
+        """
+        :param memory_budget: Approximate number of bytes of memory this process uses for the records it holds,
+                              counting their Python objects (see ENTRY_BYTES). With several workers it is shared by the
+                              run being read and the runs waiting for a worker.
+        :param workers: Number of processes sorting and spilling runs in parallel (1 sorts in this process).
+        :param temp_dir: Directory for the spilled runs (defaults to the system temporary directory).
+        :param skip_end_of_session: Drop end‑of‑session (code 00) records, which belong to no account.
+        :param max_fan_in: Largest number of run files merged (and open) at once, at least 2.
+        """
+        runs_held = workers + 1 if workers > 1 else 1
+        self.run_records = max(1, memory_budget // (self.ENTRY_BYTES * runs_held))
+        self.workers = workers
+        self.temp_dir = temp_dir
+        self.skip_end_of_session = skip_end_of_session
+        self.max_fan_in = max(2, max_fan_in)
+
+    def sort(self, filenames: list[str], output: str) -> int:
+        """
+        Sort the records of one or more daily transaction files into a single output file.
+
+        :param filenames: Paths to daily transaction files, in session order.
+        :param output: Path to write the sorted records to.
+        :return: Number of records written.
+        """
+        runs = []           # Every run file not yet removed, so that they are all cleaned up however sorting ends
+        pending = []
+        try:
+            if self.workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    for run in self._read_runs(filenames):
+                        pending.append(pool.submit(_spill_run, run, self.temp_dir))
+                        # Bound the runs in flight so they stay within the memory budget
+                        if len(pending) >= self.workers:
+                            runs.append(pending.pop(0).result())
+                    while pending:
+                        runs.append(pending.pop(0).result())
+            else:
+                for run in self._read_runs(filenames):
+                    runs.append(_spill_run(run, self.temp_dir))
+            return self._merge(runs, output)
+        finally:
+            # If a worker failed, the pool has still finished the other runs it was given: remove those files too
+            for future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    runs.append(future.result())
+            for run in runs:
+                os.remove(run)
+
+    def _read_runs(self, filenames: list[str]):
+        """Yield runs of (account number, sequence, record) tuples of at most run_records records."""
+        run = []
+        sequence = 0
+        code, account = FileHandler.TRANSACTION_CODE, FileHandler.TRANSACTION_ACCOUNT
+        for filename in filenames:
+            with open(filename, 'r') as file:
+                for line in file:
+                    record = line.rstrip('\n')
+                    if len(record) < account.stop or \
+                            (self.skip_end_of_session and record[code] == FileHandler.END_OF_SESSION):
+                        continue
+                    run.append((record[account], sequence, record))
+                    sequence += 1
+                    if len(run) >= self.run_records:
+                        yield run
+                        run = []
+        if run:
+            yield run
+
+    def _merge(self, runs: list[str], output: str) -> int:
+        """
+        Heap-merge the sorted run files into the output file, at most max_fan_in of them at a time. `runs` is updated
+        in place as intermediate runs are written and merged runs removed, so the caller can clean up whatever is left.
+        """
+        while len(runs) > self.max_fan_in:
+            group = runs[:self.max_fan_in]
+            fd, path = tempfile.mkstemp(prefix='txsort-', suffix='.run', dir=self.temp_dir)
+            runs.append(path)
+            with os.fdopen(fd, 'w') as out:
+                _merge_runs(group, lambda sequence, record: out.write(f"{sequence} {record}\n"))
+            del runs[:self.max_fan_in]
+            for run in group:
+                os.remove(run)
+
+        with open(output, 'w') as out:
+            return _merge_runs(runs, lambda sequence, record: out.write(record + '\n'))
+
+
+def _spill_run(run: list, temp_dir: str) -> str:
+    """
+    Sort a run and write it to a temporary file, one "sequence record" line per entry.
+
+    :return: Path to the run file.
+    """
+    run.sort()
+    fd, path = tempfile.mkstemp(prefix='txsort-', suffix='.run', dir=temp_dir)
+    try:
+        with os.fdopen(fd, 'w') as file:
+            file.writelines(f"{sequence} {record}\n" for _, sequence, record in run)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def _merge_runs(runs: list[str], write) -> int:
+    """
+    Heap-merge run files, passing each entry in order to `write(sequence, record)`.
+
+    :return: Number of entries merged.
+    """
+    files = []
+    try:
+        for run in runs:
+            files.append(open(run, 'r'))
+        count = 0
+        for _, sequence, record in heapq.merge(*(_run_entries(file) for file in files)):
+            write(sequence, record)
+            count += 1
+        return count
+    finally:
+        for file in files:
+            file.close()
+
+
+def _run_entries(file):
+    """Yield (account number, sequence, record) from a run file, in its sorted order."""
+    for line in file:
+        sequence, record = line.rstrip('\n').split(' ', 1)
+        yield record[FileHandler.TRANSACTION_ACCOUNT], int(sequence), record
@@ -1,3 +1,4 @@
+import threading
 from decimal import Decimal
 
 class UserInterface:
@@ -5,6 +6,12 @@ class UserInterface:
     This function handles all user interaction via stdin/stdout. It will provide static methods for displaying menus,
     reading input with validation and showing error/success messages
     """
+    # Per-thread list that error/success messages are collected in instead of printed (e.g. by TransactionServer)
+    messages = threading.local()
+
+    # SessionRecorder (or SessionReplayer) that raw input lines are read through and outcomes reported to, if any
+    recorder = None
+
     @staticmethod
     def display_menu(is_admin: bool):
         """
@@ -37,7 +44,7 @@ class UserInterface:
         :return: The validated user input (lowercased and stripped)
         """
         while True:
-            value = input(prompt).strip().lower()
+            value = (UserInterface.recorder.read(prompt) if UserInterface.recorder else input(prompt)).strip().lower()
             try:
                 if validator(value):
                     print(value)
@@ -126,7 +133,7 @@ class UserInterface:
         """
         value = UserInterface.read_input(
             "Enter amount value: ",
-            lambda x: x.isdigit() and x >= 0,
+            lambda x: x.replace('.', '', 1).isdigit(),
             "Error amount must be entered and cannot be negative"
         )
         return Decimal(value)
@@ -148,9 +155,21 @@ class UserInterface:
     @staticmethod
     def display_error(msg: str):
         """Print an error message to screen"""
+        if UserInterface.recorder:
+            UserInterface.recorder.outcome('ERR', msg)
+        sink = getattr(UserInterface.messages, 'sink', None)
+        if sink is not None:
+            sink.append(('ERR', msg))
+            return
         print(f"Error: {msg}")
 
     @staticmethod
     def display_success(msg: str):
         """print a success message to screen"""
+        if UserInterface.recorder:
+            UserInterface.recorder.outcome('OK', msg)
+        sink = getattr(UserInterface.messages, 'sink', None)
+        if sink is not None:
+            sink.append(('OK', msg))
+            return
         print({msg})
\ No newline at end of file
@@ -0,0 +1,24 @@
+from AccountRegistry import AccountRegistry
+
+MASTER = ("00001 john doe             A 00100.00\n"
+          "00002 jane roe             D 00050.00\n"
+          "00003 jim poe              A 00010.00\n"
+          "00000 END_OF_FILE          A 00000.00\n")
+
+
+def test_indexes_are_built_on_first_use(tmp_path):
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    registry = AccountRegistry(str(accounts))
+    assert registry.load()
+    manager = registry.account_manager
+    assert manager.indexes == []
+
+    assert registry.name_index.exact('john doe') == ['00001']
+    assert manager.name_index is registry.name_index
+    assert [account.account_number for account in registry.select(status='A')] == ['00001', '00003']
+    assert set(manager.attribute_indexes) == {'status'}
+
+    manager.disable_account('00003')
+    assert [account.account_number for account in registry.select(status='A')] == ['00001']
+
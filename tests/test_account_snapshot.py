@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+import pytest
+
+from AccountsManager import AccountsManager
+from BankAccount import BankAccount
+
+
+@pytest.fixture
+def manager():
+    manager = AccountsManager()
+    manager.add_account(BankAccount('00001', 'John Doe', Decimal('100.00')))
+    manager.add_account(BankAccount('00002', 'Jane Smith', Decimal('250.00')))
+    manager.add_account(BankAccount('00003', 'Ann Lee', Decimal('75.00')))
+    return manager
+
+
+def view(accounts):
+    return [(a.account_number, a.holder_name, a.status, a.balance) for a in accounts]
+
+
+def test_snapshot_keeps_state_from_before_changes(manager):
+    before = view(manager.accounts.values())
+    with manager.snapshot() as snapshot:
+        manager.debit(manager.find_account('00001'), Decimal('40.00'))
+        manager.add_account(BankAccount('00004', 'New Holder', Decimal('10.00')))
+        manager.delete('00002')
+        manager.disable_account('00003')
+
+        assert view(snapshot.accounts()) == before
+        assert snapshot.account_numbers() == ['00001', '00002', '00003']
+        assert snapshot.find_account('00004') is None
+        assert snapshot.find_account('00002').holder_name == 'Jane Smith'
+
+        assert manager.find_account('00001').balance == Decimal('60.00')
+        assert manager.find_account('00004').holder_name == 'New Holder'
+        assert manager.find_account('00002') is None
+        assert manager.find_account('00003').status == 'D'
+
+
+def test_snapshot_keeps_first_preimage_only(manager):
+    snapshot = manager.snapshot()
+    account = manager.find_account('00001')
+    manager.debit(account, Decimal('10.00'))
+    manager.debit(account, Decimal('20.00'))
+
+    assert snapshot.find_account('00001').balance == Decimal('100.00')
+    assert manager.find_account('00001').balance == Decimal('70.00')
+    snapshot.close()
+
+
+def test_reads_return_copies(manager):
+    with manager.snapshot() as snapshot:
+        snapshot.find_account('00001').balance_deduction(Decimal('50.00'))
+        assert snapshot.find_account('00001').balance == Decimal('100.00')
+        assert manager.find_account('00001').balance == Decimal('100.00')
+
+
+def test_unchanged_accounts_show_through(manager):
+    with manager.snapshot() as snapshot:
+        assert view(snapshot.accounts()) == view(manager.accounts.values())
+        assert snapshot.preserved == {}
+
+
+def test_closed_snapshot_is_released(manager):
+    snapshot = manager.snapshot()
+    snapshot.close()
+    manager.debit(manager.find_account('00001'), Decimal('1.00'))
+
+    assert snapshot.preserved == {}
+    assert snapshot not in manager._snapshots
+    with pytest.raises(ValueError):
+        snapshot.find_account('00001')
+
+
+def test_snapshots_taken_at_different_times(manager):
+    first = manager.snapshot()
+    manager.debit(manager.find_account('00001'), Decimal('30.00'))
+    second = manager.snapshot()
+    manager.debit(manager.find_account('00001'), Decimal('30.00'))
+
+    assert first.find_account('00001').balance == Decimal('100.00')
+    assert second.find_account('00001').balance == Decimal('70.00')
+    assert manager.find_account('00001').balance == Decimal('40.00')
+    first.close()
+    second.close()
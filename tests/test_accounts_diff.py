@@ -0,0 +1,102 @@
+import json
+import sys
+
+import pytest
+
+import AccountsDiff as accounts_diff
+from AccountsDiff import AccountsDiff
+
+END = "00000 END_OF_FILE          A 00000.00"
+
+
+def write(path, *records):
+    path.write_text(''.join(record + '\n' for record in records + (END,)))
+    return str(path)
+
+
+def test_reports_created_deleted_and_changed_fields(tmp_path):
+    old = write(tmp_path / 'old.txt',
+                "00001 John Doe             A 00100.00 SP",
+                "00002 Jane Smith           A 00250.00",
+                "00004 Ann Lee              A 00075.00 SP")
+    new = write(tmp_path / 'new.txt',
+                "00001 John Doe             D 00090.00 NP",
+                "00003 New Holder           A 00010.00",
+                "00004 Ann Lee              A 00075.00 SP")
+
+    assert list(AccountsDiff.diff(old, new)) == [
+        {'change': 'status', 'account': '00001', 'old': 'A', 'new': 'D'},
+        {'change': 'balance', 'account': '00001', 'old': '100.00', 'new': '90.00'},
+        {'change': 'plan', 'account': '00001', 'old': 'SP', 'new': 'NP'},
+        {'change': 'deleted', 'account': '00002', 'name': 'Jane Smith', 'status': 'A', 'balance': '250.00',
+         'plan': None},
+        {'change': 'created', 'account': '00003', 'name': 'New Holder', 'status': 'A', 'balance': '10.00',
+         'plan': None},
+    ]
+
+
+@pytest.mark.parametrize('new_name', ['Jane Doe            ', 'JANE SMITH          '])
+def test_a_rename_alone_is_reported(tmp_path, new_name):
+    old = write(tmp_path / 'old.txt', "00002 Jane Smith           A 00250.00")
+    new = write(tmp_path / 'new.txt', f"00002 {new_name} A 00250.00")
+
+    assert list(AccountsDiff.diff(old, new)) == [
+        {'change': 'name', 'account': '00002', 'old': 'Jane Smith', 'new': new_name.rstrip()},
+    ]
+
+
+def test_plan_is_only_compared_when_both_records_have_one(tmp_path):
+    old = write(tmp_path / 'old.txt', "00001 John Doe             A 00100.00 SP")
+    new = write(tmp_path / 'new.txt', "00001 John Doe             A 00100.00")
+
+    assert list(AccountsDiff.diff(old, new)) == []
+
+
+@pytest.mark.parametrize('records, message', [
+    (("00002 Jane Smith           A 00250.00", "00001 John Doe             A 00100.00"), 'not sorted'),
+    (("00001 John Doe             A 00100.00", "00002 Jane Smith"), 'record too short'),
+    (("0000x John Doe             A 00100.00",), 'invalid account number'),
+    (("00001 John Doe             A 001OO.00",), 'invalid balance'),
+])
+def test_bad_input_raises_value_error(tmp_path, records, message):
+    old = write(tmp_path / 'old.txt')
+    new = write(tmp_path / 'new.txt', *records)
+
+    with pytest.raises(ValueError, match=message):
+        list(AccountsDiff.diff(old, new))
+
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['AccountsDiff.py', *args])
+    with pytest.raises(SystemExit) as exit_info:
+        accounts_diff.main()
+    return exit_info.value.code
+
+
+def test_main_prints_changes_as_json_lines(tmp_path, monkeypatch, capsys):
+    old = write(tmp_path / 'old.txt', "00001 John Doe             A 00100.00")
+    new = write(tmp_path / 'new.txt', "00001 John Doe             A 00110.00")
+    monkeypatch.setattr(sys, 'argv', ['AccountsDiff.py', old, new])
+    accounts_diff.main()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'change': 'balance', 'account': '00001', 'old': '100.00', 'new': '110.00'}]
+
+
+def test_main_reports_unsorted_input_without_a_traceback(tmp_path, monkeypatch, capsys):
+    old = write(tmp_path / 'old.txt', "00001 John Doe             A 00100.00")
+    new = write(tmp_path / 'new.txt', "00002 Jane Smith           A 00250.00", "00001 John Doe             A 00100.00")
+
+    assert run_main(monkeypatch, old, new) == 1
+    captured = capsys.readouterr()
+    assert "is not sorted by account number at 00001" in captured.err
+    assert "Traceback" not in captured.err
+    assert [json.loads(line)['change'] for line in captured.out.splitlines()] == ['deleted', 'created']
+
+
+def test_main_reports_a_missing_file(tmp_path, monkeypatch, capsys):
+    old = write(tmp_path / 'old.txt')
+
+    assert run_main(monkeypatch, old, str(tmp_path / 'missing.txt')) == 1
+    assert "error: cannot diff" in capsys.readouterr().err
@@ -0,0 +1,218 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+from AccountRegistry import AccountRegistry
+from AccountsManager import AccountsManager
+from BankAccount import BankAccount
+from FileHandler import FileHandler
+
+
+def write_accounts_file(path, count):
+    with open(path, 'w') as f:
+        for i in range(1, count + 1):
+            f.write(f"{i:05d} {'Holder ' + str(i):<20} {'D' if i % 7 == 0 else 'A'} {i:05d}.{i % 100:02d}\n")
+        f.write("00000 END_OF_FILE          A 00000.00\n")
+    return str(path)
+
+
+def state(manager):
+    return [(a.account_number, a.holder_name, a.status, a.balance) for a in manager.accounts.values()]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parallel_load_matches_serial_load(tmp_path, workers):
+    filename = write_accounts_file(tmp_path / 'accounts.txt', 500)
+    serial, parallel = AccountsManager(), AccountsManager()
+    assert serial.load_accounts(filename)
+    assert parallel.load_accounts(filename, workers=workers)
+
+    assert state(parallel) == state(serial)
+    assert parallel.total_balance == serial.total_balance
+    assert parallel.slots == serial.slots and parallel.fixed_width
+    assert parallel.generate_new_account_number() == '00501'
+
+
+def test_both_range_parsers_reject_misaligned_records(tmp_path, capsys):
+    from AccountColumns import AccountColumns
+
+    # Fits a whole number of records, but the first record is one character short and the second one long
+    path = tmp_path / 'accounts.txt'
+    path.write_text("00001 John Doe             A 0100.00\n"
+                    "00002 Jane Smith           A 00250.000\n"
+                    "00000 END_OF_FILE          A 00000.00\n")
+    with pytest.raises(ValueError, match="record 0"):
+        AccountColumns.from_file(str(path), workers=1)
+    with pytest.raises(ValueError, match="record 0"):
+        list(AccountColumns.read_accounts(str(path), workers=1))
+    assert not AccountsManager().load_accounts(str(path), workers=1)
+    assert "record 0 is not 37 characters" in capsys.readouterr().out
+
+
+MASTER = ("00001 John Doe             A 00100.00\n"
+          "00002 Jane Smith           A 00250.00\n"
+          "00003 bob stone            A 00010.00\n"
+          "00004 END_OF_FILE          A 00000.00\n")
+
+
+@pytest.fixture
+def master(tmp_path):
+    path = tmp_path / 'current_bank_accounts.txt'
+    path.write_text(MASTER)
+    return path
+
+
+def test_flush_rewrites_only_the_changed_records_at_their_offsets(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.debit(manager.find_account('00002'), Decimal('50.00'))
+    assert manager.flush_accounts(str(master))
+
+    lines = master.read_text().splitlines(keepends=True)
+    assert lines[1] == "00002 Jane Smith           A 00200.00\n"
+    assert [lines[0], lines[2], lines[3]] == [MASTER.splitlines(keepends=True)[i] for i in (0, 2, 3)]
+    assert not manager.dirty
+
+
+def test_flush_appends_created_accounts_before_the_end_of_file_record(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.add_account(BankAccount(manager.generate_new_account_number(), 'new holder', Decimal('5.00')))
+    assert manager.flush_accounts(str(master))
+
+    assert master.read_text() == MASTER.replace("00004 END_OF_FILE ", "00004 new holder           A 00005.00\n"
+                                                                      "00004 END_OF_FILE ")
+    reloaded = AccountsManager()
+    reloaded.load_accounts(str(master))
+    assert reloaded.find_account('00004').balance == Decimal('5.00')
+
+
+def test_compaction_keeps_names_and_end_of_file_record_as_read(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.delete('00003')
+    assert manager.flush_accounts(str(master))
+    assert master.read_text() == MASTER.replace("00003 bob stone            A 00010.00\n", "")
+
+
+def test_plan_changes_are_not_flushed(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.change_plan('00001')
+    assert manager.find_account('00001').plan == 'NP'
+    assert not manager.dirty
+
+
+def reload(manager, master, text):
+    master.write_text(text)
+    return manager.apply_reload(str(master), FileHandler.read_file(str(master)))
+
+
+def test_reload_applies_file_changes_on_top_of_pending_session_changes(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.debit(manager.find_account('00001'), Decimal('30.00'))         # Not in the file yet
+
+    assert reload(manager, master, MASTER.replace("00250.00", "00300.00")) == 1
+    assert manager.find_account('00001').balance == Decimal('70.00')
+    assert manager.find_account('00002').balance == Decimal('300.00')
+
+    assert reload(manager, master, MASTER.replace("00100.00", "00150.00")
+                                         .replace("00002 Jane Smith           A", "00002 Jane Smith           D")) == 2
+    assert manager.find_account('00001').balance == Decimal('120.00')
+    assert manager.find_account('00002').status == 'D'
+    assert manager.total_balance == sum(account.balance for account in manager.accounts.values())
+
+
+def test_reload_adds_and_removes_what_the_file_does_and_keeps_local_creates_and_deletes(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.add_account(BankAccount('00009', 'local create', Decimal('1.00')))
+    manager.delete('00002')
+
+    changes = reload(manager, master, MASTER.replace("00003 bob stone            A 00010.00\n", "")
+                                            .replace("00002 Jane Smith           A 00250.00",
+                                                     "00002 Jane Smith           A 00999.00")
+                                            .replace("00004 END_OF_FILE ", "00005 file create          A 00005.00\n"
+                                                                           "00004 END_OF_FILE "))
+    assert changes == 2
+    assert sorted(manager.accounts) == ['00001', '00005', '00009']
+    assert manager.find_account('00001').holder_name == 'john doe'
+
+
+def test_reload_of_an_unchanged_file_changes_nothing(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.credit(manager.find_account('00003'), Decimal('5.00'))
+    assert reload(manager, master, MASTER) == 0
+    assert manager.find_account('00003').balance == Decimal('15.00')
+
+
+def test_registry_poll_keeps_the_ledger_in_balance(master, tmp_path):
+    registry = AccountRegistry(str(master))
+    assert registry.load()
+    registry.watcher.interval = 0
+    manager = registry.account_manager
+    manager.debit(manager.find_account('00001'), Decimal('30.00'))
+    registry.ledger.post('withdrawal', Decimal('30.00'))
+
+    replacement = tmp_path / 'new_master.txt'
+    replacement.write_text(MASTER.replace("00010.00", "00060.00"))
+    os.replace(replacement, master)
+    assert registry.poll() == 1
+    assert manager.find_account('00001').balance == Decimal('70.00')
+    assert registry.ledger.flows['withdrawal'] == Decimal('30.00')
+    assert registry.ledger.verify(manager)
+
+
+def test_reloading_a_flushed_file_changes_nothing(master):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.debit(manager.find_account('00001'), Decimal('30.00'))
+    assert manager.flush_accounts(str(master))
+    assert manager.apply_reload(str(master), FileHandler.read_file(str(master))) == 0
+    assert manager.find_account('00001').balance == Decimal('70.00')
+
+
+def test_a_half_written_master_is_not_applied_until_it_is_complete(master):
+    registry = AccountRegistry(str(master))
+    assert registry.load()
+    registry.watcher.interval = 0
+    manager = registry.account_manager
+
+    master.write_text(MASTER.splitlines(keepends=True)[0])              # Rewritten in place, caught half way
+    assert registry.poll() == 0
+    assert sorted(manager.accounts) == ['00001', '00002', '00003']
+
+    master.write_text(MASTER.replace("00010.00", "00020.00"))
+    assert registry.poll() == 1
+    assert manager.find_account('00003').balance == Decimal('20.00')
+
+
+def test_reload_reports_a_file_account_under_a_locally_created_number(master, capsys):
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    manager.add_account(BankAccount('00009', 'local create', Decimal('1.00')))
+
+    reload(manager, master, MASTER.replace("00004 END_OF_FILE ", "00009 file create          A 00005.00\n"
+                                                                 "00004 END_OF_FILE "))
+    assert "account 00009 was created here and by another writer" in capsys.readouterr().out
+    assert manager.find_account('00009').holder_name == 'local create'
+
+
+def test_a_file_with_records_of_other_widths_is_rewritten_not_patched(master):
+    # Same size as three fixed-width records, but the second is 26 characters too long and the end is a bare marker
+    master.write_text("00001 John Doe             A 00100.00\n"
+                      "00002 Jane Smith           A 00250.00" + " " * 26 + "\n"
+                      "END_OF_FILE\n")
+    assert os.path.getsize(master) == 3 * (FileHandler.ACCOUNT_RECORD_LENGTH + 1)
+    manager = AccountsManager()
+    manager.load_accounts(str(master))
+    assert not manager.fixed_width
+
+    manager.debit(manager.find_account('00002'), Decimal('50.00'))
+    assert manager.flush_accounts(str(master))
+    assert master.read_text() == ("00001 John Doe             A 00100.00\n"
+                                  "00002 Jane Smith           A 00200.00\n"
+                                  "00000 END_OF_FILE          A 00000.00\n")
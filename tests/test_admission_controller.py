@@ -0,0 +1,56 @@
+import threading
+import time
+
+from AdmissionController import AdmissionController
+
+
+def test_a_sessions_requests_run_one_at_a_time_in_order():
+    controller = AdmissionController(concurrency=4)
+    events = []
+
+    def request(name, delay):
+        events.append(('start', name))
+        time.sleep(delay)
+        events.append(('end', name))
+        return name
+
+    futures = [controller.submit('session', request, name, delay)
+               for name, delay in (('first', 0.05), ('second', 0), ('third', 0))]
+    assert [future.result(timeout=5) for future in futures] == ['first', 'second', 'third']
+    controller.close()
+    assert events == [('start', 'first'), ('end', 'first'), ('start', 'second'), ('end', 'second'),
+                      ('start', 'third'), ('end', 'third')]
+
+
+def test_sessions_take_turns():
+    controller = AdmissionController(concurrency=1)
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    controller.submit('blocker', block)
+    assert started.wait(5)
+    for name in ('a1', 'a2', 'a3'):
+        controller.submit('a', order.append, name)
+    for name in ('b1', 'b2'):
+        controller.submit('b', order.append, name)
+    release.set()
+    controller.close()
+    assert order == ['a1', 'b1', 'a2', 'b2', 'a3']
+
+
+def test_a_full_session_queue_rejects():
+    controller = AdmissionController(concurrency=1, session_limit=1)
+    started = threading.Event()
+    release = threading.Event()
+    controller.submit('a', lambda: started.set() or release.wait(5))
+    assert started.wait(5)
+    assert controller.submit('a', len, 'x') is not None
+    assert controller.submit('a', len, 'y') is None
+    release.set()
+    controller.close()
+    assert controller.stats == {'admitted': 2, 'rejected': 1, 'completed': 2}
@@ -0,0 +1,77 @@
+import shutil
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+import BankingSystem
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    shutil.copy(REPO / 'current_bank_accounts.txt', tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'argv', ['BankingSystem.py'])
+    return tmp_path
+
+
+def feed(monkeypatch, *lines):
+    answers = iter(lines)
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+
+
+def test_main_writes_the_session_file_before_returning(workdir, monkeypatch):
+    feed(monkeypatch, 'standard', 'john doe', 'deposit', '00001', '10', 'logout')
+    BankingSystem.main()
+    assert (workdir / 'daily_bank_transactions.txt').read_text().splitlines() == [
+        "04 john doe             00001 00010.00   ",
+        "00                      00000 00000.00   ",
+    ]
+
+
+def test_main_exits_with_an_error_when_the_session_file_cannot_be_written(workdir, monkeypatch, capsys):
+    (workdir / 'daily_bank_transactions.txt').mkdir()
+    feed(monkeypatch, 'admin', 'logout')
+    with pytest.raises(SystemExit) as exit_info:
+        BankingSystem.main()
+    assert exit_info.value.code == 1
+    assert "Could not write transaction file" in capsys.readouterr().out
+
+
+def test_a_standard_session_builds_no_indexes(workdir, monkeypatch):
+    feed(monkeypatch, 'standard', 'john doe', 'logout')
+    system = BankingSystem.BankingSystem()
+    system.run()
+    assert system.close()
+    assert system.account_manager.indexes == []
+
+
+@pytest.fixture
+def profiling(monkeypatch):
+    yield lambda setting: monkeypatch.setenv('BANKING_MEMORY_PROFILE', setting)
+    tracemalloc.stop()
+
+
+def test_an_invalid_memory_profile_setting_falls_back_with_a_warning(workdir, profiling, capsys):
+    profiling('yes')
+    system = BankingSystem.BankingSystem()
+    assert system.profiler.every == 1000
+    assert "BANKING_MEMORY_PROFILE must be a positive whole number" in capsys.readouterr().err
+    system.close()
+
+
+def test_the_profile_skips_bytes_per_account_when_the_shared_accounts_were_loaded(workdir, profiling, monkeypatch,
+                                                                                   capsys):
+    from AccountRegistry import AccountRegistry
+
+    registry = AccountRegistry.attach('current_bank_accounts.txt')
+    assert registry.load()
+    profiling('10')
+    feed(monkeypatch, 'standard', 'john doe', 'logout')
+    system = BankingSystem.BankingSystem(registry)
+    system.run()
+    assert system.close()
+    assert "bytes per account loaded: n/a" in capsys.readouterr().err
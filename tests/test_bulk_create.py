@@ -0,0 +1,108 @@
+import sys
+from decimal import Decimal
+
+import pytest
+
+import BulkCreate as bulk_create
+from AccountRegistry import AccountRegistry
+from BankAccount import BankAccount
+from BulkCreate import BulkCreate
+from SQLiteAccountsManager import SQLiteAccountsManager
+from TransactionLog import TransactionLog
+
+MASTER = ("00001 john doe             A 00100.00\n"
+          "00002 jane roe             D 00050.00\n"
+          "00007 jim poe              A 00010.00\n"
+          "00000 END_OF_FILE          A 00000.00\n")
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def registry(request, tmp_path):
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    database = str(tmp_path / 'accounts.db') if request.param == 'sqlite' else None
+    registry = AccountRegistry(str(accounts), database)
+    assert registry.load()
+    registry.name_index
+    yield registry
+    registry.detach()
+
+
+def test_valid_rows_get_a_contiguous_block_and_05_records(registry):
+    log = TransactionLog()
+    report = BulkCreate(registry.account_manager).create([['Ann Lee', '10'], ['Bob Ray', '20.5']], log)
+
+    assert report == {'created': [('00008', 'ann lee', Decimal('10.00')), ('00009', 'bob ray', Decimal('20.50'))],
+                      'rejected': [], 'collisions': []}
+    assert list(log.iter_records()) == [
+        "05 ann lee              00008 00010.00   ",
+        "05 bob ray              00009 00020.50   ",
+    ]
+    # The block stays reserved: the next account created gets the number after it
+    assert registry.account_manager.generate_new_account_number() == '00010'
+
+
+def test_invalid_rows_are_rejected(registry):
+    rows = [['', '10'], ['A name far too long for it', '10'], ['Ann Lee', '100000'], ['Bob Ray', '-5'], ['Cy']]
+    log = TransactionLog()
+    report = BulkCreate(registry.account_manager).create(rows, log)
+
+    assert [row_number for row_number, _ in report['rejected']] == [1, 2, 3, 4, 5]
+    assert report['created'] == [] and log.get_transactions() == []
+    assert registry.account_manager.generate_new_account_number() == '00008'
+
+
+def test_existing_holders_and_repeats_are_collisions(registry):
+    rows = [['John Doe', '10'], ['Ann Lee', '10'], ['ANN LEE ', '5'], ['Bob Ray', '1']]
+    report = BulkCreate(registry.account_manager).create(rows, TransactionLog())
+
+    assert report['collisions'] == [(1, 'john doe', 'account 00001'), (3, 'ann lee', 'row 2')]
+    assert [name for _, name, _ in report['created']] == ['ann lee', 'bob ray']
+
+
+def test_running_out_of_numbers_raises(registry):
+    registry.account_manager.reserve_account_numbers(99999 - 7)
+    log = TransactionLog()
+
+    with pytest.raises(ValueError):
+        BulkCreate(registry.account_manager).create([['Ann Lee', '10']], log)
+    assert log.get_transactions() == []
+
+
+def test_numbers_are_reserved_in_the_shared_database(tmp_path):
+    database = str(tmp_path / 'accounts.db')
+    bulk, other = SQLiteAccountsManager(database), SQLiteAccountsManager(database)
+    other.add_account(BankAccount('00004', 'ann lee', Decimal('1.00')))
+
+    report = BulkCreate(bulk).create([['Ann Lee', '10'], ['Bob Ray', '10'], ['Cy Dee', '10']], TransactionLog())
+    assert report['collisions'] == [(1, 'ann lee', 'account 00004')]
+    assert [number for number, _, _ in report['created']] == ['00005', '00006']
+    # Another process sharing the database never hands out the reserved numbers
+    assert other.generate_new_account_number() == '00007'
+    bulk.close()
+    other.close()
+
+
+def test_main_with_a_database_reserves_there(tmp_path, monkeypatch, capsys):
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    rows = tmp_path / 'rows.csv'
+    rows.write_text("Ann Lee,10\nJohn Doe,5\n")
+    database, transactions = tmp_path / 'accounts.db', tmp_path / 'creates.txt'
+    monkeypatch.setattr(sys, 'argv', ['BulkCreate.py', '--database', str(database), str(accounts), str(rows),
+                                      str(transactions)])
+    bulk_create.main()
+
+    assert transactions.read_text().splitlines()[0] == "05 ann lee              00008 00010.00   "
+    assert "created 1 accounts (00008-00008), 0 rejected, 1 collisions" in capsys.readouterr().out
+    shared = SQLiteAccountsManager(str(database))
+    assert shared.generate_new_account_number() == '00009'
+    shared.close()
+
+
+def test_main_rejects_bad_arguments(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['BulkCreate.py', '--database', 'accounts.db', 'only-one'])
+    with pytest.raises(SystemExit) as exit_info:
+        bulk_create.main()
+    assert exit_info.value.code == 2
+    assert "usage: BulkCreate.py [--database PATH]" in capsys.readouterr().err
@@ -0,0 +1,131 @@
+from decimal import Decimal
+
+import pytest
+
+from AccountsManager import AccountsManager
+from AttributeIndex import AttributeIndex
+from BankAccount import BankAccount
+from Session import Session
+from TransactionLog import TransactionLog
+from TransactionProcessor import TransactionProcessor
+
+ACCOUNTS = [('00001', 'john doe', '100.00', 'A', 'SP'),
+            ('00002', 'jane smith', '250.00', 'D', 'SP'),
+            ('00003', 'ann lee', '75.00', 'A', 'NP'),
+            ('00004', 'bob ray', '10.00', 'A', 'SP'),
+            ('00005', 'cy dee', '500.00', 'D', 'NP')]
+
+
+def make_manager(indexed):
+    manager = AccountsManager()
+    if indexed:
+        manager.add_index(AttributeIndex('status'))
+        manager.add_index(AttributeIndex('plan'))
+    for number, name, balance, status, plan in ACCOUNTS:
+        manager.add_account(BankAccount(number, name, Decimal(balance), status, plan))
+    return manager
+
+
+@pytest.fixture
+def manager():
+    return make_manager(indexed=True)
+
+
+def numbers(accounts):
+    return [account.account_number for account in accounts]
+
+
+def assert_indexes_consistent(manager):
+    for name, index in manager.attribute_indexes.items():
+        fresh = AttributeIndex(name)
+        fresh.rebuild(manager.accounts.values())
+        assert index.buckets == fresh.buckets, name
+
+
+@pytest.mark.parametrize('filters, expected', [
+    ({'status': 'D'}, ['00002', '00005']),
+    ({'plan': 'SP', 'status': 'A'}, ['00001', '00004']),
+    ({'plan': 'SP', 'min_balance': Decimal('50.00')}, ['00001', '00002']),
+    ({'max_balance': Decimal('75.00')}, ['00003', '00004']),
+    ({'holder_name': 'ann lee'}, ['00003']),
+    ({'status': 'X'}, []),
+])
+def test_select_gives_the_same_answer_with_and_without_indexes(manager, filters, expected):
+    assert numbers(manager.select(**filters)) == expected
+    assert numbers(make_manager(indexed=False).select(**filters)) == expected
+
+
+def test_disable_accounts_skips_missing_and_disabled_accounts(manager):
+    changed = manager.disable_accounts(['00001', '00002', '99999', '00004'])
+
+    assert numbers(changed) == ['00001', '00004']
+    assert numbers(manager.select(status='D')) == ['00001', '00002', '00004', '00005']
+    assert_indexes_consistent(manager)
+
+
+def test_change_plans_skips_missing_and_non_student_accounts(manager):
+    changed = manager.change_plans(['00001', '00003', '99999', '00002'])
+
+    assert numbers(changed) == ['00001', '00002']
+    assert numbers(manager.select(plan='SP')) == ['00004']
+    assert_indexes_consistent(manager)
+
+
+def processor(manager, mode):
+    session = Session()
+    session.login(mode, None if mode == 'admin' else 'john doe')
+    log = TransactionLog()
+    return TransactionProcessor(manager, session, log), log
+
+
+def records(log):
+    return [(t.transaction_code, t.holders_name, t.account_num, t.balance) for t in log.get_transactions()]
+
+
+def test_bulk_disable_logs_one_record_per_disabled_account(manager, capsys):
+    bulk, log = processor(manager, 'admin')
+
+    assert bulk.bulk_disable(numbers(manager.select(plan='SP'))) == 2
+    assert records(log) == [('07', 'john doe', '00001', Decimal('0.00')),
+                            ('07', 'bob ray', '00004', Decimal('0.00'))]
+    assert "Disabled 2 accounts" in capsys.readouterr().out
+    assert_indexes_consistent(manager)
+
+
+def test_bulk_change_plan_skips_disabled_accounts_and_logs_the_rest(manager, capsys):
+    bulk, log = processor(manager, 'admin')
+
+    assert bulk.bulk_change_plan(['00001', '00002', '00003', '00004']) == 2
+    assert records(log) == [('08', 'john doe', '00001', Decimal('0.00')),
+                            ('08', 'bob ray', '00004', Decimal('0.00'))]
+    assert manager.find_account('00002').plan == 'SP'
+    assert "Changed 2 accounts" in capsys.readouterr().out
+    assert_indexes_consistent(manager)
+
+
+def test_bulk_operations_require_an_admin_session(manager, capsys):
+    bulk, log = processor(manager, 'standard')
+
+    assert bulk.bulk_disable(['00001']) == 0
+    assert bulk.bulk_change_plan(['00001']) == 0
+    assert log.get_transactions() == []
+    assert manager.find_account('00001').status == 'A' and manager.find_account('00001').plan == 'SP'
+    out = capsys.readouterr().out
+    assert "Bulk disable requires an admin session" in out and "Bulk change plan requires an admin session" in out
+
+
+def test_indexes_stay_consistent_after_later_single_account_changes(manager):
+    bulk, _ = processor(manager, 'admin')
+    bulk.bulk_disable(['00004'])
+    bulk.bulk_change_plan(['00001'])
+
+    manager.disable_account('00003')
+    manager.change_plan('00001')
+    manager.delete('00005')
+    manager.add_account(BankAccount('00006', 'dee fox', Decimal('5.00')))
+    manager.debit(manager.find_account('00001'), Decimal('10.00'))
+
+    assert_indexes_consistent(manager)
+    assert numbers(manager.select(status='D')) == ['00002', '00003', '00004']
+    assert numbers(manager.select(plan='SP', status='A')) == ['00006']
+    assert numbers(manager.select(status='A', min_balance=Decimal('50.00'))) == ['00001']
@@ -0,0 +1,87 @@
+import shutil
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+import BankingSystem
+from CommandPipeline import CommandPipeline
+from Session import COMMANDS_BY_MODE
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def system(tmp_path, monkeypatch):
+    shutil.copy(REPO / 'current_bank_accounts.txt', tmp_path)
+    monkeypatch.chdir(tmp_path)
+    system = BankingSystem.BankingSystem()
+    assert system.registry.load()
+    yield system
+    system.close()
+
+
+def recording_stage(name, events):
+    def stage(system, command, call):
+        def wrapped(*args):
+            events.append(f'{name} before {command}')
+            result = call(*args)
+            events.append(f'{name} after {command}')
+            return result
+        return wrapped
+    return stage
+
+
+def test_stages_listed_first_run_outermost(system):
+    events = []
+    handlers = {'deposit': lambda *args: events.append(('deposit', args)) or 'done'}
+    pipeline = CommandPipeline(system, 'standard', [recording_stage('outer', events), recording_stage('inner', events)],
+                               handlers)
+
+    assert pipeline.dispatch('deposit', '00001', 10) == 'done'
+    assert events == ['outer before deposit', 'inner before deposit', ('deposit', ('00001', 10)),
+                      'inner after deposit', 'outer after deposit']
+
+
+def test_commands_outside_the_mode_are_rejected_without_running_stages(system, capsys):
+    events = []
+    handlers = {'create': lambda: events.append('create'), 'deposit': lambda: events.append('deposit')}
+    pipeline = CommandPipeline(system, 'standard', [recording_stage('stage', events)], handlers)
+
+    pipeline.dispatch('create')
+    pipeline.dispatch('nonsense')
+    assert events == []
+    assert capsys.readouterr().out.count("You are not authorized to perform this transaction.") == 2
+
+
+@pytest.mark.parametrize('mode', ['standard', 'admin'])
+def test_each_mode_compiles_only_its_own_commands(system, mode):
+    pipeline = CommandPipeline(system, mode, system.PIPELINE_STAGES)
+
+    assert pipeline.mode == mode
+    assert set(pipeline.handlers) == COMMANDS_BY_MODE[mode] - {'login', 'logout'}
+
+
+def test_stages_that_opt_out_add_nothing(system):
+    create, deposit = (lambda: None), (lambda: None)
+    pipeline = CommandPipeline(system, 'admin', [CommandPipeline.verify_ledger],
+                               {'create': create, 'deposit': deposit})
+
+    assert pipeline.handlers['create'] is create
+    assert pipeline.handlers['deposit'] is not deposit
+
+
+def test_verify_ledger_reports_money_created_by_a_command(system, capsys):
+    manager = system.account_manager
+    pipeline = CommandPipeline(system, 'admin', [CommandPipeline.verify_ledger],
+                               {'deposit': lambda: manager.credit(manager.find_account('00001'), Decimal('5.00'))})
+
+    pipeline.dispatch('deposit')
+    assert "Ledger out of balance" in capsys.readouterr().out
+
+
+def test_pipelines_are_compiled_once_per_mode(system):
+    standard = system._get_pipeline('standard')
+
+    assert system._get_pipeline('standard') is standard
+    assert system._get_pipeline('admin') is not standard
@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+import pytest
+
+from AccountsManager import AccountsManager
+from BankAccount import BankAccount
+from Ledger import Ledger
+from Session import Session
+from TransactionLog import TransactionLog
+from TransactionProcessor import TransactionProcessor
+
+
+@pytest.fixture
+def processor():
+    manager = AccountsManager()
+    manager.add_account(BankAccount('00001', 'john doe', Decimal('100.00')))
+    manager.add_account(BankAccount('00002', 'jane smith', Decimal('50.00')))
+    session = Session()
+    session.login('admin')
+    return TransactionProcessor(manager, session, TransactionLog(), Ledger(manager.total_balance))
+
+
+def test_every_money_movement_is_posted(processor):
+    processor.deposit('00001', Decimal('10.00'))
+    processor.withdrawal('00001', Decimal('20.00'))
+    processor.transfer('00001', '00002', Decimal('5.00'))
+    processor.paybill('00002', 'EC', Decimal('7.00'))
+    processor.delete('jane smith', '00002')
+
+    ledger, manager = processor.ledger, processor.account_manager
+    assert ledger.verify(manager)
+    assert ledger.flows['deposit'] == Decimal('10.00') and ledger.flows['delete'] == Decimal('48.00')
+    assert ledger.paybill_by_company == {'EC': Decimal('7.00')}
+    assert manager.total_balance == Decimal('85.00')
+
+
+def test_create_moves_no_money_into_the_store(processor):
+    assert processor.create('new holder', Decimal('30.00'))
+    assert processor.ledger.verify(processor.account_manager)
+    assert 'create' not in processor.ledger.flows
+    with pytest.raises(ValueError):
+        processor.ledger.post('create', Decimal('30.00'))
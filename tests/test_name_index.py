@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from BankAccount import BankAccount
+from NameIndex import NameIndex
+
+
+def index_of(*names):
+    index = NameIndex()
+    for number, name in enumerate(names, 1):
+        index.add(BankAccount(f"{number:05d}", name, Decimal('0.00')))
+    return index
+
+
+def test_search_ranks_exact_then_prefix_then_fuzzy():
+    index = index_of('john doe', 'john doerr', 'jon doe', 'jane roe')
+
+    assert index.search('john doe') == [('john doe', '00001'), ('john doerr', '00002'), ('jon doe', '00003')]
+
+
+def test_search_only_fuzzy_matches_names_with_the_same_first_character():
+    index = index_of('john doe', 'mohn doe')
+
+    assert index.search('mohn doe') == [('mohn doe', '00002')]
+    assert index.search('johm doe') == [('john doe', '00001')]
+    assert sorted(index.fuzzy('johm doe')) == [(1, 'john doe', '00001'), (2, 'mohn doe', '00002')]
+
+
+def test_fuzzy_skips_names_too_long_to_match():
+    index = index_of('ann', 'anne', 'annette')
+
+    assert index.fuzzy('ann', 1) == [(0, 'ann', '00001'), (1, 'anne', '00002')]
+    assert index.fuzzy('ann', 1, anchored=True) == [(0, 'ann', '00001'), (1, 'anne', '00002')]
+
+
+def levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        previous, row = row, [i]
+        for j, other in enumerate(b, 1):
+            row.append(min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (char != other)))
+    return row[-1]
+
+
+def test_fuzzy_matches_a_brute_force_scan():
+    names = ['ann', 'anne', 'annette', 'ana', 'bob', 'bobby', 'rob', 'robert', 'roberta', 'abe', 'b', 'nan a', 'an na']
+    index = index_of(*names)
+
+    for query in ['ann', 'anna', 'bobb', 'robrt', 'a', 'xyz', 'an a']:
+        for max_distance in range(4):
+            expected = sorted((levenshtein(name, query), name, f"{number:05d}")
+                              for number, name in enumerate(names, 1) if levenshtein(name, query) <= max_distance)
+            assert index.fuzzy(query, max_distance, limit=100) == expected
+            assert index.fuzzy(query, max_distance, limit=100, anchored=True) == \
+                [match for match in expected if match[1][0] == query[0]]
+
+
+def test_changes_after_a_search_are_seen_by_the_next_one():
+    index = index_of('ann lee', 'bob ray')
+    assert index.prefix('a') == [('ann lee', '00001')]
+
+    index.add(BankAccount('00003', 'Amy Fox', Decimal('0.00')))
+    index.remove(BankAccount('00001', 'ann lee', Decimal('0.00')))
+    index.add(BankAccount('00004', 'bob ray', Decimal('0.00')))
+
+    assert index.prefix('a') == [('amy fox', '00003')]
+    assert index.exact('bob ray') == ['00002', '00004']
+    assert index.fuzzy('ann lee', 2) == []
+    assert index.size == 3 and index.names == ['amy fox', 'bob ray']
@@ -0,0 +1,71 @@
+import datetime
+
+from ReplayFilter import ReplayFilter
+
+SESSION = ("04 john doe             00001 00010.00   \n"
+           "01 john doe             00001 00005.00   \n"
+           "00                      00000 00000.00   \n")
+
+
+def test_a_redelivered_file_yields_nothing(tmp_path):
+    daily = tmp_path / 'daily_bank_transactions.txt'
+    daily.write_text(SESSION)
+    replay = ReplayFilter(str(tmp_path / 'replay.db'), capacity=1000)
+    source = ReplayFilter.daily_file_id(str(daily), datetime.date(2026, 10, 19))
+
+    assert len(list(replay.new_records(str(daily), source))) == 2
+    assert list(replay.new_records(str(daily), source)) == []
+    replay.close()
+
+    reopened = ReplayFilter(str(tmp_path / 'replay.db'), capacity=1000)
+    assert list(reopened.new_records(str(daily), source)) == []
+    reopened.close()
+
+
+def test_the_next_days_file_under_the_same_name_is_new(tmp_path):
+    daily = tmp_path / 'daily_bank_transactions.txt'
+    replay = ReplayFilter(str(tmp_path / 'replay.db'), capacity=1000)
+    daily.write_text(SESSION)
+    first = list(replay.new_records(str(daily), ReplayFilter.daily_file_id(str(daily), datetime.date(2026, 10, 19))))
+    daily.write_text(SESSION)
+    second = list(replay.new_records(str(daily), ReplayFilter.daily_file_id(str(daily), datetime.date(2026, 10, 20))))
+    assert first == second == SESSION.splitlines()[:2]
+    replay.close()
+
+
+def test_a_grown_redelivery_yields_only_the_new_records(tmp_path):
+    daily = tmp_path / 'daily_bank_transactions.txt'
+    replay = ReplayFilter(str(tmp_path / 'replay.db'), capacity=1000)
+    source = ReplayFilter.daily_file_id(str(daily), datetime.date(2026, 10, 19))
+    daily.write_text(SESSION)
+    assert len(list(replay.new_records(str(daily), source))) == 2
+
+    grown = SESSION.replace("00                      00000", "06 john doe             00001 00002.00   \n"
+                                                             "00                      00000")
+    daily.write_text(grown + SESSION)
+    assert list(replay.new_records(str(daily), source)) == ["06 john doe             00001 00002.00   ",
+                                                            *SESSION.splitlines()[:2]]
+    replay.close()
+
+
+def test_a_truncated_redelivery_yields_nothing(tmp_path):
+    daily = tmp_path / 'daily_bank_transactions.txt'
+    replay = ReplayFilter(str(tmp_path / 'replay.db'), capacity=1000)
+    source = ReplayFilter.daily_file_id(str(daily), datetime.date(2026, 10, 19))
+    daily.write_text(SESSION + SESSION)
+    assert len(list(replay.new_records(str(daily), source))) == 4
+
+    daily.write_text(SESSION.splitlines(keepends=True)[0])
+    assert list(replay.new_records(str(daily), source)) == []
+    daily.write_text(SESSION + SESSION.splitlines(keepends=True)[0])
+    assert list(replay.new_records(str(daily), source)) == []
+    replay.close()
+
+
+def test_the_filter_stays_exact_across_generations(tmp_path):
+    replay = ReplayFilter(str(tmp_path / 'replay.db'), capacity=10, generations=2)
+    keys = [ReplayFilter.record_key('delivery', sequence, 'record') for sequence in range(25)]
+    assert all(replay.add(key) for key in keys)
+    assert not any(replay.add(key) for key in keys[-5:])
+    assert replay.add(keys[0])           # Dropped with its generation
+    replay.close()
@@ -0,0 +1,48 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from BankingSystem import BankingSystem
+from SessionRecorder import SessionRecorder
+from SessionReplayer import SessionReplayer
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    shutil.copy(REPO / 'current_bank_accounts.txt', tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def record(log, *lines):
+    answers = iter(lines)
+    with SessionRecorder(str(log), source=lambda prompt: next(answers)):
+        system = BankingSystem()
+        system.run()
+        system.close()
+
+
+def test_the_log_records_the_accounts_file_and_the_replay_checks_it(workdir):
+    log = workdir / 'sessions.log'
+    record(log, 'standard', 'john doe', 'deposit', '00001', '10', 'logout')
+    sessions = SessionRecorder.load(str(log))
+    assert sessions[0]['accounts'] == SessionRecorder.accounts_hash('current_bank_accounts.txt')
+
+    report, = SessionReplayer(sessions, speed=0).replay()
+    assert not report['accounts changed'] and not report['diverged'] and report['mismatched outcomes'] == 0
+
+    (workdir / 'current_bank_accounts.txt').write_text("00001 John Doe             A 00005.00\n"
+                                                      "00002 END_OF_FILE          A 00000.00\n")
+    report, = SessionReplayer(sessions, speed=0).replay()
+    assert report['accounts changed']
+
+
+def test_logs_without_an_accounts_hash_still_load(tmp_path):
+    log = tmp_path / 'sessions.log'
+    log.write_text('S\t1760000000.000\nI\t0.000\t1.000\t"logout"\n')
+    session, = SessionRecorder.load(str(log))
+    assert session['accounts'] is None
+    assert not SessionReplayer.compare(session, dict(session, accounts='0' * 32))['accounts changed']
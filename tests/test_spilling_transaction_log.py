@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from FileHandler import FileHandler
+from SpillingTransactionLog import SpillingTransactionLog
+from Transaction import Transaction
+
+
+def transactions(count):
+    return [Transaction('01', f'Holder {i}', f'{i:05d}', Decimal(f'{i}.{i % 100:02d}')) for i in range(1, count + 1)]
+
+
+def fields(items):
+    return [(t.transaction_code, t.holders_name, t.account_num, t.balance, t.misc) for t in items]
+
+
+def test_below_limit_stays_in_memory():
+    log = SpillingTransactionLog(memory_limit=5)
+    log.add_transactions(transactions(4))
+
+    assert log.spill is None and log.spilled == 0
+    assert len(log.transactions) == 4
+
+
+def test_crossing_limit_spills_and_streams_back_in_order():
+    expected = transactions(12)
+    log = SpillingTransactionLog(memory_limit=5)
+    log.add_transactions(expected)
+
+    assert log.spilled == 10
+    assert len(log.transactions) == 2
+    result = log.get_transactions()
+    assert isinstance(result, list)
+    assert fields(result) == fields(expected)
+    assert fields(log.iter_transactions()) == fields(expected)
+    assert list(log.iter_records()) == [t.format() for t in expected]
+    # Streaming does not consume the spill file
+    assert fields(log.get_transactions()) == fields(expected)
+
+
+def test_session_file_contains_spilled_records(tmp_path):
+    expected = transactions(7)
+    log = SpillingTransactionLog(memory_limit=3)
+    log.add_transactions(expected)
+    filename = tmp_path / 'daily.txt'
+    log.write_session_file(str(filename))
+
+    lines = filename.read_text().splitlines()
+    assert lines[:-1] == [t.format() for t in expected]
+    assert lines[-1].startswith(FileHandler.END_OF_SESSION)
+
+
+def test_handoff_moves_spill_and_memory():
+    expected = transactions(8)
+    log = SpillingTransactionLog(memory_limit=3)
+    log.add_transactions(expected)
+    detached = log.handoff()
+
+    assert fields(detached.get_transactions()) == fields(expected)
+    assert detached.memory_limit == 3
+    assert log.get_transactions() == [] and log.spill is None and log.spilled == 0
+
+    more = transactions(4)
+    log.add_transactions(more)
+    assert fields(log.get_transactions()) == fields(more)
+    assert fields(detached.get_transactions()) == fields(expected)
+
+
+def test_clear_discards_spill():
+    log = SpillingTransactionLog(memory_limit=2)
+    log.add_transactions(transactions(5))
+    spill = log.spill
+    log.clear()
+
+    assert spill.closed
+    assert log.get_transactions() == [] and log.spilled == 0
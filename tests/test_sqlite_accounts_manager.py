@@ -0,0 +1,133 @@
+import threading
+from decimal import Decimal
+
+import pytest
+
+from AccountRegistry import AccountRegistry
+from SQLiteAccountsManager import SQLiteAccountsManager
+
+MASTER = ("00001 john doe             A 00100.00\n"
+          "00002 jane roe             D 00050.00\n"
+          "00003 jim poe              A 00010.00\n"
+          "00000 END_OF_FILE          A 00000.00\n")
+
+
+def test_processes_sharing_a_database_never_reserve_the_same_numbers(tmp_path):
+    database = str(tmp_path / 'accounts.db')
+    first, second = SQLiteAccountsManager(database), SQLiteAccountsManager(database)
+
+    assert first.reserve_account_numbers(2) == ['00001', '00002']
+    assert second.reserve_account_numbers(1) == ['00003']
+    assert first.generate_new_account_number() == '00004'
+    first.close()
+    second.close()
+
+
+def test_refresh_picks_up_balances_written_by_another_connection(tmp_path):
+    database = str(tmp_path / 'accounts.db')
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    registry = AccountRegistry(str(accounts), database)
+    assert registry.load()
+    assert registry.account_manager.total_balance == Decimal('160.00')
+
+    other = SQLiteAccountsManager(database)
+    other.credit(other.find_account('00001'), Decimal('25.00'))
+    other.close()
+
+    assert registry.poll() == 1
+    assert registry.account_manager.total_balance == Decimal('185.00')
+    assert registry.ledger.verify(registry.account_manager)
+    assert registry.poll() == 0
+    registry.detach()
+
+
+def test_the_database_is_filled_from_the_accounts_file_only_when_empty(tmp_path):
+    database = str(tmp_path / 'accounts.db')
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    registry = AccountRegistry(str(accounts), database)
+    assert registry.load()
+    registry.account_manager.delete('00003')
+    registry.detach()
+
+    reopened = AccountRegistry(str(accounts), database)
+    assert reopened.load()
+    assert reopened.account_manager.find_account('00003') is None
+    assert reopened.name_index is None
+    reopened.detach()
+
+
+def test_bulk_operations_and_select(tmp_path):
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    manager = SQLiteAccountsManager(str(tmp_path / 'accounts.db'))
+    assert manager.load_accounts(str(accounts))
+
+    assert [account.account_number for account in manager.select(status='A')] == ['00001', '00003']
+    assert [account.account_number for account in manager.select(min_balance=Decimal('50.00'))] == ['00001', '00002']
+    assert [account.account_number for account in manager.disable_accounts(['00001', '00002', '00009'])] == ['00001']
+    assert [account.account_number for account in manager.change_plans(['00001', '00003'])] == ['00001', '00003']
+    assert manager.change_plans(['00001']) == []
+    assert [account.account_number for account in manager.select(status='D', plan='NP')] == ['00001']
+    manager.close()
+
+
+def test_the_connection_can_be_used_from_other_threads(tmp_path):
+    manager = SQLiteAccountsManager(str(tmp_path / 'accounts.db'))
+    numbers = []
+    threads = [threading.Thread(target=lambda: numbers.extend(manager.reserve_account_numbers(5))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(numbers) == [f"{number:05d}" for number in range(1, 21)]
+    manager.close()
+
+
+def test_a_transfer_commits_both_legs_or_neither(tmp_path, monkeypatch):
+    from Session import Session
+    from TransactionLog import TransactionLog
+    from TransactionProcessor import TransactionProcessor
+
+    database = str(tmp_path / 'accounts.db')
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    manager = SQLiteAccountsManager(database)
+    assert manager.load_accounts(str(accounts))
+    session = Session()
+    session.login('admin')
+    processor = TransactionProcessor(manager, session, TransactionLog())
+
+    def fail(account, amount):
+        raise OSError("disk gone")
+    monkeypatch.setattr(manager, 'credit', fail)
+    with pytest.raises(OSError):
+        processor.transfer('00001', '00003', Decimal('40.00'))
+    other = SQLiteAccountsManager(database)
+    assert other.find_account('00001').balance == Decimal('100.00')
+
+    monkeypatch.undo()
+    assert processor.transfer('00001', '00003', Decimal('40.00'))
+    assert other.find_account('00001').balance == Decimal('60.00')
+    assert other.find_account('00003').balance == Decimal('50.00')
+    other.close()
+    manager.close()
+
+
+def test_a_debit_rechecks_the_stored_balance(tmp_path):
+    database = str(tmp_path / 'accounts.db')
+    accounts = tmp_path / 'current_bank_accounts.txt'
+    accounts.write_text(MASTER)
+    manager = SQLiteAccountsManager(database)
+    assert manager.load_accounts(str(accounts))
+    stale = manager.find_account('00001')
+
+    other = SQLiteAccountsManager(database)
+    other.debit(other.find_account('00001'), Decimal('80.00'))
+    other.close()
+
+    with pytest.raises(ValueError):
+        manager.debit(stale, Decimal('50.00'))
+    assert manager.find_account('00001').balance == Decimal('20.00')
+    manager.close()
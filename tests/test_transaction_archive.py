@@ -0,0 +1,46 @@
+import pytest
+
+from TransactionArchive import TransactionArchive
+
+
+def write_daily_file(path, count):
+    records = [f"01 john doe             {i % 100000:05d} 00010.00   \n" for i in range(count)]
+    records.append("00                      00000 00000.00   \n")
+    path.write_text(''.join(records))
+    return path
+
+
+@pytest.mark.parametrize('codec', ['gzip', 'lzma'])
+def test_roll_round_trips_every_daily_file(tmp_path, codec):
+    first = write_daily_file(tmp_path / 'day1.txt', 10)
+    second = write_daily_file(tmp_path / 'day2.txt', 0)
+    archive = TransactionArchive.roll(str(tmp_path / 'segment.arc'), [str(first), str(second)], codec, block_records=3)
+
+    reopened = TransactionArchive(str(tmp_path / 'segment.arc'))
+    assert reopened.codec == codec
+    assert reopened.sources() == ['day1.txt', 'day2.txt']
+    assert reopened.read_source('day1.txt') == first.read_bytes()
+    assert reopened.read_source('day2.txt') == second.read_bytes()
+    assert archive.record_count('day1.txt') == 11
+
+    reopened.extract('day1.txt', str(tmp_path / 'restored.txt'))
+    assert (tmp_path / 'restored.txt').read_bytes() == first.read_bytes()
+
+
+def test_records_are_read_from_the_covering_blocks(tmp_path):
+    daily = write_daily_file(tmp_path / 'day.txt', 10)
+    archive = TransactionArchive.roll(str(tmp_path / 'segment.arc'), [str(daily)], block_records=4)
+    lines = daily.read_text().splitlines()
+
+    assert archive.read_record('day.txt', 5) == lines[5]
+    assert list(archive.iter_records('day.txt', 3, 9)) == lines[3:9]
+    with pytest.raises(IndexError):
+        archive.read_record('day.txt', 11)
+
+
+def test_rejects_files_that_are_not_segments(tmp_path):
+    daily = write_daily_file(tmp_path / 'day.txt', 1)
+    with pytest.raises(ValueError):
+        TransactionArchive(str(daily))
+    with pytest.raises(ValueError):
+        TransactionArchive.roll(str(tmp_path / 'segment.arc'), [str(daily), str(daily)])
@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+from FileHandler import FileHandler
+from SessionFileWriter import SessionFileWriter
+from Transaction import Transaction
+from TransactionIndex import TransactionIndex
+from TransactionLog import TransactionLog
+
+
+def session_log(*deposits):
+    log = TransactionLog()
+    for account, amount in deposits:
+        log.add_transaction(Transaction('04', 'john doe', account, Decimal(amount)))
+    return log
+
+
+def append_session(filename, *deposits):
+    FileHandler.write_file(filename, session_log(*deposits), append=True)
+
+
+def test_every_session_appended_to_the_same_file_keeps_its_postings(tmp_path):
+    daily = str(tmp_path / 'daily_transaction_file.txt')
+    index = TransactionIndex(str(tmp_path / 'index.log'))
+    index.attach()
+    try:
+        append_session(daily, ('00001', '10.00'))
+        append_session(daily, ('00002', '5.00'), ('00001', '20.00'))
+    finally:
+        index.detach()
+
+    assert [record.balance for record in index.records('00001')] == [Decimal('10.00'), Decimal('20.00')]
+    reloaded = TransactionIndex(str(tmp_path / 'index.log'))
+    assert reloaded.postings == index.postings
+    assert [record.balance for record in reloaded.records('00001')] == [Decimal('10.00'), Decimal('20.00')]
+    assert [record.balance for record in reloaded.records('00002')] == [Decimal('5.00')]
+
+
+def test_postings_point_into_the_daily_file_without_copies(tmp_path):
+    daily = tmp_path / 'daily_transaction_file.txt'
+    index = TransactionIndex(str(tmp_path / 'index.log'))
+    index.attach()
+    try:
+        append_session(str(daily), ('00001', '10.00'))
+        append_session(str(daily), ('00001', '20.00'))
+    finally:
+        index.detach()
+
+    width = FileHandler.TRANSACTION_RECORD_LENGTH + 1
+    assert [(path, offset) for _, path, offset in index.lookup('00001')] == [(str(daily), 0), (str(daily), 2 * width)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['daily_transaction_file.txt', 'index.log']
+
+
+def test_first_append_seen_indexes_the_sessions_already_in_the_file(tmp_path):
+    daily = str(tmp_path / 'daily_transaction_file.txt')
+    append_session(daily, ('00001', '10.00'))
+    index = TransactionIndex(str(tmp_path / 'index.log'))
+    index.attach()
+    try:
+        append_session(daily, ('00001', '20.00'))
+    finally:
+        index.detach()
+
+    assert [record.balance for record in index.records('00001')] == [Decimal('10.00'), Decimal('20.00')]
+
+
+def test_a_rewritten_file_replaces_the_postings_of_its_old_records(tmp_path):
+    daily = str(tmp_path / 'daily_transaction_file.txt')
+    index = TransactionIndex(str(tmp_path / 'index.log'))
+    index.attach()
+    try:
+        session_log(('00001', '10.00')).write_session_file(daily)
+        session_log(('00002', '5.00')).write_session_file(daily)
+    finally:
+        index.detach()
+
+    assert index.lookup('00001') == []
+    assert [record.balance for record in TransactionIndex(str(tmp_path / 'index.log')).records('00002')] == \
+        [Decimal('5.00')]
+
+
+def test_reindexing_a_rewritten_file_replaces_its_postings(tmp_path):
+    daily = str(tmp_path / 'day.txt')
+    index = TransactionIndex(str(tmp_path / 'index.log'))
+    session_log(('00001', '10.00')).write_session_file(daily)
+    index.add_file(daily)
+    session_log(('00002', '5.00')).write_session_file(daily)
+    index.add_file(daily)
+
+    assert index.lookup('00001') == []
+    assert len(index.lookup('00002')) == 1
+
+
+def test_failing_listener_does_not_fail_the_write(tmp_path):
+    def broken(filename, start):
+        raise OSError("index unavailable")
+
+    daily = tmp_path / 'daily_transaction_file.txt'
+    writer = SessionFileWriter()
+    FileHandler.write_listeners.append(broken)
+    try:
+        future = writer.submit(str(daily), session_log(('00001', '10.00')))
+        assert future.result(timeout=5) == str(daily)
+    finally:
+        FileHandler.write_listeners.remove(broken)
+        writer.close()
+    assert len(daily.read_text().splitlines()) == 2
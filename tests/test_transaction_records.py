@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+import pytest
+
+from FileHandler import FileHandler
+from Transaction import Transaction
+from TransactionAggregate import TransactionAggregate
+from TransactionSorter import TransactionSorter, _spill_run as spill_run
+
+RECORDS = [Transaction('04', 'john doe', '00002', Decimal('10.00')),
+           Transaction('03', 'jane smith', '00001', Decimal('7.50'), 'EC'),
+           Transaction('01', 'john doe', '00002', Decimal('2.25')),
+           Transaction('00', '', '00000', Decimal('0.00'))]
+
+
+@pytest.fixture
+def daily(tmp_path):
+    path = tmp_path / 'daily.txt'
+    path.write_text(''.join(record.format() + '\n' for record in RECORDS))
+    return path
+
+
+def test_records_are_fixed_width_and_parse_back(daily):
+    lines = daily.read_text().splitlines()
+    assert {len(line) for line in lines} == {FileHandler.TRANSACTION_RECORD_LENGTH}
+    parsed = FileHandler.parse_transaction_line(lines[1])
+    assert (parsed.transaction_code, parsed.holders_name, parsed.account_num, parsed.balance, parsed.misc) == \
+        ('03', 'jane smith', '00001', Decimal('7.50'), 'EC')
+
+
+def test_sorter_groups_records_by_account_in_input_order(daily, tmp_path):
+    output = tmp_path / 'sorted.txt'
+    assert TransactionSorter(memory_budget=2 * TransactionSorter.ENTRY_BYTES).sort([str(daily)], str(output)) == 3
+    accounts = [line[FileHandler.TRANSACTION_ACCOUNT] for line in output.read_text().splitlines()]
+    codes = [line[FileHandler.TRANSACTION_CODE] for line in output.read_text().splitlines()]
+    assert accounts == ['00001', '00002', '00002'] and codes == ['03', '04', '01']
+
+
+
+def many_records(tmp_path, count):
+    path = tmp_path / 'many.txt'
+    records = [Transaction('04', 'holder', f'{(i * 7) % 13:05d}', Decimal(i)).format() for i in range(count)]
+    path.write_text(''.join(record + '\n' for record in records))
+    return path, sorted(records, key=lambda record: record[FileHandler.TRANSACTION_ACCOUNT])
+
+
+def test_memory_budget_counts_the_python_objects_of_each_record():
+    assert TransactionSorter.ENTRY_BYTES > 4 * FileHandler.TRANSACTION_RECORD_LENGTH
+    assert TransactionSorter(memory_budget=10 * TransactionSorter.ENTRY_BYTES).run_records == 10
+    # With workers the budget is shared by the run being read and the runs waiting for a worker
+    assert TransactionSorter(memory_budget=30 * TransactionSorter.ENTRY_BYTES, workers=2).run_records == 10
+
+
+def test_merge_passes_never_open_more_than_the_fan_in(tmp_path, monkeypatch):
+    import builtins
+    import TransactionSorter as sorter_module
+
+    opened, peak = [], [0]
+
+    def tracking_open(*args, **kwargs):
+        file = builtins.open(*args, **kwargs)
+        opened.append(file)
+        peak[0] = max(peak[0], sum(not f.closed for f in opened))
+        return file
+
+    monkeypatch.setattr(sorter_module, 'open', tracking_open, raising=False)
+    source, expected = many_records(tmp_path, 40)
+    runs_dir, output = tmp_path / 'runs', tmp_path / 'sorted.txt'
+    runs_dir.mkdir()
+    sorter = TransactionSorter(memory_budget=TransactionSorter.ENTRY_BYTES, temp_dir=str(runs_dir), max_fan_in=3)
+
+    assert sorter.sort([str(source)], str(output)) == 40
+    assert output.read_text().splitlines() == expected
+    assert peak[0] <= 3 + 1       # the runs being merged plus the file being read or written
+    assert list(runs_dir.iterdir()) == []
+
+
+def failing_spill(run, temp_dir):
+    if any(account == '00012' for account, _, _ in run):
+        raise ValueError("spill failed")
+    return spill_run(run, temp_dir)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_files_are_removed_when_spilling_fails(tmp_path, monkeypatch, workers):
+    import TransactionSorter as sorter_module
+
+    monkeypatch.setattr(sorter_module, '_spill_run', failing_spill)
+    source, _ = many_records(tmp_path, 40)
+    runs_dir = tmp_path / 'runs'
+    runs_dir.mkdir()
+    sorter = TransactionSorter(memory_budget=TransactionSorter.ENTRY_BYTES * (3 if workers > 1 else 1),
+                               workers=workers, temp_dir=str(runs_dir))
+
+    with pytest.raises(ValueError, match="spill failed"):
+        sorter.sort([str(source)], str(tmp_path / 'sorted.txt'))
+    assert list(runs_dir.iterdir()) == []
+
+def test_aggregate_rolls_up_by_code_company_and_holder(daily):
+    aggregate = TransactionAggregate({'00001': 'NP', '00002': 'SP'})
+    aggregate.add_file(str(daily))
+    report = aggregate.report()
+    assert report['code']['04'] == (1, Decimal('10.00'))
+    assert report['company'] == {'EC': (1, Decimal('7.50'))}
+    assert report['holder']['john doe'] == (2, Decimal('12.25'))
+    assert report['plan']['SP'] == (2, Decimal('12.25'))
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def fee_engine(request, monkeypatch):
+    import FeeEngine
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(FeeEngine, 'np', None)
+    return FeeEngine.FeeEngine
+
+
+def fee_columns(jane_balance, john_balance):
+    from AccountColumns import AccountColumns
+    from BankAccount import BankAccount
+
+    return AccountColumns.from_accounts([BankAccount('00001', 'jane smith', Decimal(jane_balance), plan='NP'),
+                                         BankAccount('00002', 'john doe', Decimal(john_balance))])
+
+
+def test_fee_engine_counts_fee_bearing_records_per_account(daily, fee_engine):
+    counts = fee_engine(fee_columns('1.00', '1.00')).count_transactions([str(daily)])
+    assert counts[1] == 1 and counts[2] == 2 and sum(counts[:10]) == 3
+
+
+def test_fee_engine_charges_by_plan_without_overdrawing(daily, fee_engine):
+    columns = fee_columns('1.00', '0.03')
+    engine = fee_engine(columns)
+
+    # jane: one record at 10 cents (non-student); john: two at 5 cents (student), capped at his 3 cent balance
+    assert [int(fee) for fee in engine.compute_fees([str(daily)])] == [10, 3]
+    assert engine.apply([str(daily)]) == 13
+    assert list(columns.balances) == [90, 0]
@@ -0,0 +1,75 @@
+import shutil
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+import TransactionServer
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def address(tmp_path, monkeypatch):
+    shutil.copy(REPO / 'current_bank_accounts.txt', tmp_path)
+    monkeypatch.chdir(tmp_path)
+    server = TransactionServer.create_server(str(tmp_path / 'server.sock'), str(tmp_path / 'current_bank_accounts.txt'))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield str(tmp_path / 'server.sock')
+    server.shutdown()
+    server.server_close()
+    server.admission.close()
+    server.writer.close()
+
+
+def send(address, requests):
+    with TransactionServer.connect(address) as client:
+        client.sendall(''.join(request + '\n' for request in requests).encode())
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('r') as responses:
+            return [response.rstrip('\n') for response in responses]
+
+
+def test_pipelined_requests_get_one_response_each_in_order(address):
+    responses = send(address, ['deposit 1 10', 'login standard john doe', 'deposit 1 10', 'deposit 1 99999.999',
+                               'frobnicate', 'logout'])
+    assert responses[0] == "ERR not logged in"
+    assert responses[1].startswith("OK ")
+    assert responses[2].startswith("OK ")
+    assert responses[3] == "ERR invalid amount '99999.999'"
+    assert responses[4] == "ERR unknown command 'frobnicate'"
+    assert responses[5].startswith("OK ")
+
+
+def test_concurrent_sessions_all_reach_the_daily_file(address, tmp_path):
+    requests = ['login standard john doe'] + ['deposit 1 1'] * 50 + ['logout']
+    responses = {}
+    clients = [threading.Thread(target=lambda i=i: responses.update({i: send(address, requests)})) for i in range(4)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    assert all(response.startswith("OK ") for replies in responses.values() for response in replies)
+
+    lines = (tmp_path / 'daily_bank_transactions.txt').read_text().splitlines()
+    assert len(lines) == 4 * 51
+    assert lines.count("00                      00000 00000.00   ") == 4
+
+
+def test_admin_commands_are_authorized(address):
+    responses = send(address, ['login admin', 'disable 2 jane smith', 'withdrawal 2 1', 'changeplan 1', 'logout'])
+    assert responses[1].startswith("OK ")
+    assert responses[2] == "ERR Account jane smith is disabled"
+    assert responses[3].startswith("OK ")
+
+
+def test_an_overdraft_is_rejected(address):
+    responses = send(address, ['login admin', 'withdrawal 2 99999', 'transfer 1 2 100.01', 'withdrawal 2 250',
+                               'logout'])
+    assert responses[1:4] == ["ERR Insufficient funds", "ERR Insufficient funds", "OK Withdrawal of $250.00 successful"]
+
+
+def test_a_standard_login_reports_the_holder(address):
+    assert send(address, ['login standard john doe'])[0] == "OK Logged in as: john doe"